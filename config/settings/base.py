@@ -111,6 +111,16 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Anonim sharh/aloqa formalari uchun limitlar (reviews.throttling.SubmissionThrottle)
+# 'ip' - get_client_ip() bo'yicha, 'phone' - formadagi telefon raqami bo'yicha (ixtiyoriy)
+SUBMISSION_THROTTLE_RATES = {
+    'review': {'ip': '5/10m', 'phone': '3/h'},
+    'contact': {'ip': '5/10m', 'phone': '5/h'},
+}
+# Ilova oldidagi ishonchli proksilar (nginx, load balancer) soni - get_client_ip()
+# X-Forwarded-For'dan shuncha o'ngdagi manzilni oladi; 0 - faqat REMOTE_ADDR
+TRUSTED_PROXY_COUNT = int(os.getenv('TRUSTED_PROXY_COUNT', 0))
+
 # CORS
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
@@ -120,10 +130,30 @@ CORS_ALLOWED_ORIGINS = [
 # Telegram
 TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
 TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
+TELEGRAM_API_URL = os.getenv('TELEGRAM_API_URL', 'https://api.telegram.org')
+# Barcha workerlar uchun umumiy limit: TELEGRAM_RATE_PERIOD soniyada TELEGRAM_RATE_LIMIT ta xabar
+TELEGRAM_RATE_LIMIT = int(os.getenv('TELEGRAM_RATE_LIMIT', 20))
+TELEGRAM_RATE_PERIOD = 60
+# Relay partiyasida shundan ko'p xabar bo'lsa bitta jamlangan xabar yuboriladi
+TELEGRAM_DIGEST_THRESHOLD = 5
 
 # Celery
 CELERY_BROKER_URL = os.getenv('REDIS_URL', 'redis://localhost:6379')
 CELERY_RESULT_BACKEND = os.getenv('REDIS_URL', 'redis://localhost:6379')
+CELERY_BEAT_SCHEDULE = {
+    'flush-product-views': {
+        'task': 'products.tasks.flush_product_views',
+        'schedule': 60.0,
+    },
+    'relay-notification-outbox': {
+        'task': 'reviews.tasks.relay_notification_outbox',
+        'schedule': 10.0,
+    },
+    'rollup-daily-stats': {
+        'task': 'reviews.tasks.rollup_daily_stats',
+        'schedule': 60 * 60.0,
+    },
+}
 
 # ModelTranslation
 MODELTRANSLATION_DEFAULT_LANGUAGE = 'uz'
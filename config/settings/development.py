@@ -17,6 +17,10 @@ EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'OPTIONS': {
+            # Ko'rishlar hisoblagichi kalitlari tez chiqarib yuborilmasligi uchun
+            'MAX_ENTRIES': 10000,
+        },
     }
 }
 
@@ -3,6 +3,7 @@ from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
 from modeltranslation.admin import TranslationAdmin, TranslationTabularInline
 from .models import Category, Product, ProductImage, ProductSpecification
+from .view_counter import pending_views
 
 
 @admin.register(Category)
@@ -45,6 +46,10 @@ class CategoryAdmin(TranslationAdmin):
         )
 
     products_count.short_description = _("Mahsulotlar soni")
+    products_count.admin_order_field = 'active_products_count'
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_products_count()
 
 
 class ProductImageInline(TranslationTabularInline):
@@ -74,7 +79,7 @@ class ProductSpecificationInline(TranslationTabularInline):
 class ProductAdmin(TranslationAdmin):
     list_display = [
         'name', 'category', 'price', 'old_price', 'discount_badge',
-        'rating_display', 'views_count', 'reviews_count', 'is_active',
+        'rating_display', 'views_count_display', 'reviews_count', 'is_active',
         'is_featured', 'main_image_preview'
     ]
     list_filter = [
@@ -85,7 +90,7 @@ class ProductAdmin(TranslationAdmin):
     prepopulated_fields = {'slug': ('name',)}
     list_editable = ['is_active', 'is_featured', 'price']
     readonly_fields = [
-        'main_image_preview', 'views_count', 'rating',
+        'main_image_preview', 'views_count_display', 'rating',
         'reviews_count', 'discount_percentage', 'created_at', 'updated_at'
     ]
     inlines = [ProductImageInline, ProductSpecificationInline]
@@ -104,7 +109,7 @@ class ProductAdmin(TranslationAdmin):
             'fields': ('is_active', 'is_featured')
         }),
         (_('Statistika'), {
-            'fields': ('views_count', 'rating', 'reviews_count', 'created_at', 'updated_at'),
+            'fields': ('views_count_display', 'rating', 'reviews_count', 'created_at', 'updated_at'),
             'classes': ('collapse',)
         }),
     )
@@ -139,5 +144,12 @@ class ProductAdmin(TranslationAdmin):
 
     rating_display.short_description = _("Reyting")
 
+    def views_count_display(self, obj):
+        # Bazaga hali yozilmagan (keshdagi) ko'rishlar bilan birga
+        return obj.views_count + pending_views([obj.pk]).get(obj.pk, 0)
+
+    views_count_display.short_description = _("Ko'rishlar soni")
+    views_count_display.admin_order_field = 'views_count'
+
     def get_queryset(self, request):
         return super().get_queryset(request).select_related('category')
\ No newline at end of file
@@ -1,6 +1,37 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_save
+
+
+def reinstall_search_index(sender, using, **kwargs):
+    # SQLite'da jadval qayta yaratilganda triggerlar yo'qoladi
+    from django.db import connections
+    from .search import install_search_index
+
+    connection = connections[using]
+    if connection.vendor == 'sqlite' and 'products_product' in connection.introspection.table_names():
+        install_search_index(connection)
 
 
 class ProductsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'products'
+
+    def ready(self):
+        from . import autocomplete, fuzzy_search, images, response_cache
+        from .models import Category, Product, ProductImage, ProductSpecification
+
+        post_migrate.connect(reinstall_search_index, sender=self)
+        post_save.connect(fuzzy_search.product_saved, sender=Product)
+        post_delete.connect(fuzzy_search.product_deleted, sender=Product)
+
+        for model in (Product, Category):
+            post_save.connect(autocomplete.catalog_changed, sender=model)
+            post_delete.connect(autocomplete.catalog_changed, sender=model)
+
+        for model in (Product, Category, ProductImage, ProductSpecification):
+            post_save.connect(response_cache.model_changed, sender=model)
+            post_delete.connect(response_cache.model_changed, sender=model)
+
+        for model in dict.fromkeys(model for model, _field in images.IMAGE_FIELDS):
+            pre_save.connect(images.image_pre_save, sender=model)
+            post_save.connect(images.image_post_save, sender=model)
@@ -0,0 +1,131 @@
+"""Qidiruv maydoni uchun prefiks bo'yicha avtoto'ldirish
+
+Har bir til uchun mahsulot va kategoriya nomlaridan alohida trie quriladi.
+Har bir tugunda shu prefiks uchun eng yaxshi K ta taklif oldindan saqlanadi,
+shuning uchun so'rov faqat prefiks uzunligicha qadam bosadi va bazaga
+murojaat qilmaydi.
+"""
+from django.conf import settings
+
+from .fuzzy_search import normalize
+from .local_index import LocalIndex
+
+SUGGESTIONS_LIMIT = 10
+
+# Trie kalitining maksimal uzunligi (xotirani tejash uchun)
+MAX_KEY_LENGTH = 40
+
+
+class _Node:
+    __slots__ = ('children', 'top')
+
+    def __init__(self):
+        self.children = {}
+        self.top = []
+
+
+class PrefixTrie:
+    def __init__(self, limit=SUGGESTIONS_LIMIT):
+        self.root = _Node()
+        self.limit = limit
+
+    def _offer(self, node, score, entry_id):
+        top = node.top
+        if any(existing == entry_id for _score, existing in top):
+            return
+        if len(top) >= self.limit and score <= top[-1][0]:
+            return
+        top.append((score, entry_id))
+        top.sort(key=lambda item: item[0], reverse=True)
+        del top[self.limit:]
+
+    def insert(self, key, score, entry_id):
+        node = self.root
+        for char in key[:MAX_KEY_LENGTH]:
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = _Node()
+            node = child
+            self._offer(node, score, entry_id)
+
+    def lookup(self, prefix):
+        node = self.root
+        for char in prefix[:MAX_KEY_LENGTH]:
+            node = node.children.get(char)
+            if node is None:
+                return []
+        return [entry_id for _score, entry_id in node.top]
+
+
+def _keys(name):
+    """Nomning har bir so'zidan boshlanadigan kalitlar ("yumshoq divan" -> ..., "divan")"""
+    words = normalize(name)
+    return [' '.join(words[i:]) for i in range(len(words))]
+
+
+class _LanguageTries:
+    def __init__(self):
+        self.products = PrefixTrie()
+        self.categories = PrefixTrie()
+        self.entries = []
+
+    def add(self, trie, name, slug, score):
+        entry_id = len(self.entries)
+        self.entries.append({'name': name, 'slug': slug})
+        for key in _keys(name):
+            trie.insert(key, score, entry_id)
+
+
+class AutocompleteIndex(LocalIndex):
+    version_key = 'autocomplete_index:version'
+
+    def __init__(self):
+        super().__init__()
+        self._tries = {}
+
+    def load(self):
+        from .models import Category, Product
+
+        languages = settings.MODELTRANSLATION_LANGUAGES
+        tries = {language: _LanguageTries() for language in languages}
+        name_fields = [f'name_{language}' for language in languages]
+
+        products = Product.objects.filter(is_active=True).order_by().values(
+            'slug', 'name', 'views_count', 'rating', *name_fields
+        )
+        for row in products.iterator(chunk_size=2000):
+            score = (row['views_count'], row['rating'])
+            for language in languages:
+                name = row[f'name_{language}'] or row['name']
+                tries[language].add(tries[language].products, name, row['slug'], score)
+
+        categories = Category.objects.filter(is_active=True).with_products_count().values(
+            'slug', 'name', 'active_products_count', *name_fields
+        )
+        for row in categories:
+            score = (row['active_products_count'],)
+            for language in languages:
+                name = row[f'name_{language}'] or row['name']
+                tries[language].add(tries[language].categories, name, row['slug'], score)
+
+        return tries
+
+    def install(self, state):
+        self._tries = state
+
+    def suggest(self, prefix, language, limit=SUGGESTIONS_LIMIT):
+        key = ' '.join(normalize(prefix))
+        tries = self._tries.get(language) or self._tries.get(settings.MODELTRANSLATION_DEFAULT_LANGUAGE)
+        if not key or tries is None:
+            return {'products': [], 'categories': []}
+        return {
+            'products': [tries.entries[i] for i in tries.products.lookup(key)[:limit]],
+            'categories': [tries.entries[i] for i in tries.categories.lookup(key)[:limit]],
+        }
+
+
+autocomplete_index = AutocompleteIndex()
+
+
+def catalog_changed(sender, **kwargs):
+    autocomplete_index.mark_stale()
@@ -0,0 +1,682 @@
+"""Yetkazib beruvchi katalogini ommaviy import qilish (slug bo'yicha upsert)
+
+Kirish fayli - CSV, JSON (obyektlar ro'yxati) yoki NDJSON. Ustunlar
+products/exports.py dagi PRODUCT_EXPORT_FIELDS bilan bir xil, ya'ni
+eksport fayli o'zgartirilmasdan qayta import qilinadi:
+
+    slug, category, name_uz, name_en, name_ru, short_description_*,
+    description_*, price, old_price, is_active, is_featured,
+    main_image, images, specifications
+
+Qo'shimcha: category_name_uz/_en/_ru - kategoriya bazada bo'lmasa yaratiladi
+(bo'lsa nomi yangilanadi). images va specifications CSV'da JSON matn
+sifatida beriladi; images oddiy URL / fayl yo'llari ro'yxati ('|' bilan
+ajratilgan) ham bo'lishi mumkin.
+
+Qatorlar bo'laklarga (chunk) bo'linadi. Har bir bo'lak uchun rasmlar avval
+thread pool'da yuklanadi (tranzaksiyadan tashqarida), keyin bitta
+tranzaksiyada Category, Product va ProductSpecification
+bulk_create(update_conflicts=True) bilan upsert qilinadi. Model.save() va
+signallar chaqirilmaydi - import oxirida catalog_bulk_changed() kerak, yangi
+yoki o'zgargan rasmlarni qayta ishlash (variantlar, placeholder -
+products/images.py) esa commit'dan keyin navbatga qo'yiladi.
+
+Faylda bo'lmagan ustunlar yangilanmaydi (views_count, reyting hisoblagichlari
+va h.k. esa hech qachon).
+"""
+import csv
+import io
+import json
+import posixpath
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from urllib.parse import urlparse
+
+import requests
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import IntegrityError, transaction
+from django.utils import translation
+from django.utils.text import slugify
+
+from .exports import localized, unescape_csv_value
+from .images import derived_fields, queue_image_processing
+from .models import Category, Product, ProductImage, ProductSpecification
+from .storage import catalog_image_storage
+
+IMPORT_CHUNK_SIZE = 500
+IMAGE_WORKERS = 8
+IMAGE_TIMEOUT = 30
+MAX_IMAGE_SIZE = 20 * 1024 * 1024
+
+IMPORT_FORMATS = ('csv', 'json', 'ndjson')
+
+TRUE_VALUES = {'1', 'true', 'yes', 'y', 'ha', 't'}
+FALSE_VALUES = {'0', 'false', 'no', 'n', "yo'q", 'yoq', 'f'}
+
+PRODUCT_TEXT_FIELDS = [*localized('name'), *localized('short_description'), *localized('description')]
+CATEGORY_NAME_COLUMNS = {f'category_{field}': field for field in localized('name')}
+
+
+class RowError(Exception):
+    pass
+
+
+def detect_format(path):
+    suffix = Path(path).suffix.lower().lstrip('.')
+    if suffix == 'jsonl':
+        return 'ndjson'
+    return suffix if suffix in IMPORT_FORMATS else None
+
+
+def read_rows(path, file_format):
+    """(qator raqami, dict) oqimi"""
+    with open(path, encoding='utf-8-sig', newline='') as source:
+        if file_format == 'csv':
+            # 1-qator - sarlavha
+            for number, row in enumerate(csv.DictReader(source), start=2):
+                yield number, {
+                    column: unescape_csv_value(value) if isinstance(value, str) else value
+                    for column, value in row.items()
+                }
+        elif file_format == 'ndjson':
+            for number, line in enumerate(source, start=1):
+                if line.strip():
+                    yield number, json.loads(line)
+        else:
+            data = json.load(source)
+            if isinstance(data, dict):
+                data = data.get('results', [])
+            for number, row in enumerate(data, start=1):
+                yield number, row
+
+
+def chunked(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# ============ QATORNI TEKSHIRISH ============
+
+def _text(value):
+    if value is None:
+        return ''
+    return str(value).strip()
+
+
+def _present(row, column):
+    """Ustun faylda bormi (CSV'da bo'sh katak ham 'bor' hisoblanadi)"""
+    return column in row and row[column] is not None
+
+
+def _bool(value, column):
+    if isinstance(value, bool):
+        return value
+    text = _text(value).lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise RowError(f"{column}: mantiqiy qiymat kutilgan ({value!r})")
+
+
+def _price(value, column, required):
+    text = _text(value).replace(' ', '').replace(',', '.')
+    if not text:
+        if required:
+            raise RowError(f"{column}: majburiy maydon")
+        return None
+    try:
+        price = Decimal(text)
+    except InvalidOperation:
+        raise RowError(f"{column}: noto'g'ri narx ({value!r})")
+    field = Product._meta.get_field(column)
+    if not price.is_finite() or price < 0 or price != price.quantize(Decimal(1).scaleb(-field.decimal_places)):
+        raise RowError(f"{column}: noto'g'ri narx ({value!r})")
+    if len(price.quantize(Decimal(1)).as_tuple().digits) > field.max_digits - field.decimal_places:
+        raise RowError(f"{column}: narx juda katta ({value!r})")
+    return price
+
+
+def _checked_text(model, column, value):
+    text = _text(value)
+    field = model._meta.get_field(column)
+    if field.max_length and len(text) > field.max_length:
+        raise RowError(f"{column}: {field.max_length} belgidan uzun")
+    if not text and field.null and not column.endswith(f'_{settings.MODELTRANSLATION_DEFAULT_LANGUAGE}'):
+        # Tarjima qilinmagan til - NULL (aks holda (product, name_en) kabi
+        # unique_together'da bo'sh satrlar to'qnashadi)
+        return None
+    return text
+
+
+def _json_list(value, column):
+    if isinstance(value, list):
+        return value
+    text = _text(value)
+    if not text:
+        return []
+    if text.startswith('['):
+        try:
+            value = json.loads(text)
+        except ValueError:
+            raise RowError(f"{column}: noto'g'ri JSON")
+        if isinstance(value, list):
+            return value
+        raise RowError(f"{column}: ro'yxat kutilgan")
+    return None
+
+
+def _images(value):
+    items = _json_list(value, 'images')
+    if items is None:
+        items = [part.strip() for part in _text(value).split('|') if part.strip()]
+    images = []
+    for item in items:
+        if isinstance(item, str):
+            item = {'url': item}
+        if not isinstance(item, dict) or not _text(item.get('url')):
+            raise RowError("images: har bir element URL yoki {'url': ...} bo'lishi kerak")
+        images.append({
+            'source': _text(item['url']),
+            **{field: _checked_text(ProductImage, field, item.get(field)) for field in localized('alt_text')},
+        })
+    return images
+
+
+def _specifications(value, default_name):
+    items = _json_list(value, 'specifications')
+    if items is None:
+        raise RowError("specifications: JSON ro'yxat kutilgan")
+    specifications = {}
+    for item in items:
+        if not isinstance(item, dict):
+            raise RowError("specifications: har bir element obyekt bo'lishi kerak")
+        spec = {
+            field: _checked_text(ProductSpecification, field, item.get(field))
+            for field in [*localized('name'), *localized('value')]
+        }
+        name = spec[default_name]
+        if not name:
+            raise RowError(f"specifications: {default_name} majburiy")
+        # Bir xil nom takrorlansa oxirgisi olinadi (unique_together)
+        specifications[name] = spec
+    return list(specifications.values())
+
+
+def parse_row(row):
+    """Fayl qatori -> import elementi; xato bo'lsa RowError"""
+    default_language = settings.MODELTRANSLATION_DEFAULT_LANGUAGE
+    default_name = f'name_{default_language}'
+
+    product = {}
+    for field in PRODUCT_TEXT_FIELDS:
+        if _present(row, field):
+            product[field] = _checked_text(Product, field, row[field])
+    if not product.get(default_name):
+        raise RowError(f"{default_name}: majburiy maydon")
+
+    slug = _text(row.get('slug')) or slugify(product[default_name])
+    if not slug or slug != slugify(slug):
+        raise RowError(f"slug: noto'g'ri qiymat ({slug!r})")
+    if len(slug) > Product._meta.get_field('slug').max_length:
+        raise RowError("slug: juda uzun")
+
+    product['price'] = _price(row.get('price'), 'price', required=True)
+    if _present(row, 'old_price'):
+        product['old_price'] = _price(row['old_price'], 'old_price', required=False)
+    for field in ('is_active', 'is_featured'):
+        if _present(row, field) and _text(row[field]) != '':
+            product[field] = _bool(row[field], field)
+
+    category = _text(row.get('category'))
+    if not category:
+        raise RowError("category: majburiy maydon")
+    category_names = {
+        field: _checked_text(Category, field, row[column])
+        for column, field in CATEGORY_NAME_COLUMNS.items()
+        if _present(row, column) and _text(row[column])
+    }
+
+    item = {
+        'slug': slug,
+        'category': category,
+        'category_names': category_names,
+        'product': product,
+        'main_image': _text(row.get('main_image')) or None,
+        'images': None,
+        'specifications': None,
+    }
+    if _present(row, 'images'):
+        item['images'] = _images(row['images'])
+    if _present(row, 'specifications'):
+        item['specifications'] = _specifications(row['specifications'], default_name)
+    return item
+
+
+# ============ RASMLAR ============
+
+class ImageIngestor:
+    """Rasm fayllarini thread pool'da storage'ga yuklash
+
+    Manba - http(s) URL, --images-dir ga nisbiy fayl yo'li yoki allaqachon
+    storage'dagi fayl (MEDIA_URL bilan boshlanuvchi manzil, masalan eksport
+    faylidan). Katalog storage'i (products/storage.py) nomni tarkib xeshidan
+    oladi, shuning uchun qayta importda bir xil rasm qayta yozilmaydi va
+    ProductImage takrorlanmaydi.
+    """
+
+    def __init__(self, images_dir=None, workers=IMAGE_WORKERS, storage=None):
+        self.images_dir = Path(images_dir) if images_dir else None
+        self.storage = storage or catalog_image_storage
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='catalog-image')
+        self._local = threading.local()
+        self._done = {}
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+    def _session(self):
+        # requests.Session thread'lar orasida ulashilmaydi
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def _stored_name(self, source):
+        path = urlparse(source).path
+        if settings.MEDIA_URL and path.startswith(settings.MEDIA_URL):
+            name = path[len(settings.MEDIA_URL):]
+            if self.storage.exists(name):
+                return name
+        return None
+
+    def _local_path(self, source):
+        path = Path(source)
+        if not path.is_absolute() and self.images_dir is not None:
+            path = self.images_dir / path
+        return path
+
+    def check(self, source):
+        """Dry-run uchun: yuklamasdan manbani tekshirish"""
+        if urlparse(source).scheme in ('http', 'https') or self._stored_name(source):
+            return
+        if not self._local_path(source).is_file():
+            raise RowError(f"Rasm topilmadi: {source}")
+
+    def _read(self, source):
+        if urlparse(source).scheme in ('http', 'https'):
+            response = self._session().get(source, timeout=IMAGE_TIMEOUT)
+            response.raise_for_status()
+            return response.content
+        path = self._local_path(source)
+        if path.stat().st_size > MAX_IMAGE_SIZE:
+            raise RowError(f"Rasm juda katta: {source}")
+        return path.read_bytes()
+
+    def _ingest(self, source, upload_to):
+        from PIL import Image
+
+        name = self._stored_name(source)
+        if name is not None:
+            return name
+
+        content = self._read(source)
+        if len(content) > MAX_IMAGE_SIZE:
+            raise RowError(f"Rasm juda katta: {source}")
+        try:
+            with Image.open(io.BytesIO(content)) as image:
+                image.verify()
+        except Exception:
+            raise RowError(f"Rasm fayli emas: {source}")
+
+        # Nom (tarkib xeshi), kichraytirish va EXIF'ni storage o'zi hal qiladi
+        filename = posixpath.basename(urlparse(source).path) or 'image'
+        return self.storage.save(f'{upload_to}{filename}', ContentFile(content))
+
+    def ingest(self, sources):
+        """{(manba, upload_to): storage nomi yoki RowError} - parallel"""
+        results = {}
+        futures = {}
+        for key in sources:
+            if key in self._done:
+                results[key] = self._done[key]
+            elif key not in futures:
+                futures[key] = self.executor.submit(self._ingest, *key)
+        for key, future in futures.items():
+            try:
+                results[key] = future.result()
+            except RowError as exc:
+                results[key] = exc
+            except (OSError, requests.RequestException) as exc:
+                results[key] = RowError(f"Rasm yuklanmadi: {key[0]} ({exc})")
+            if not isinstance(results[key], RowError):
+                self._done[key] = results[key]
+        return results
+
+
+def _upload_to(model, field):
+    return model._meta.get_field(field).upload_to
+
+
+# ============ IMPORT ============
+
+class CatalogImporter:
+    def __init__(self, chunk_size=IMPORT_CHUNK_SIZE, dry_run=False, prune=False, ingestor=None, log=None):
+        self.chunk_size = chunk_size
+        self.dry_run = dry_run
+        self.prune = prune
+        self.ingestor = ingestor
+        self.log = log or (lambda message: None)
+        self.default_language = settings.MODELTRANSLATION_DEFAULT_LANGUAGE
+        self.seen_slugs = set()
+        self.known_categories = {}
+        self.stats = {
+            'rows': 0, 'created': 0, 'updated': 0, 'errors': 0,
+            'categories': 0, 'specifications': 0, 'images': 0,
+        }
+        self.errors = []
+        self.warnings = []
+
+    def run(self, rows):
+        started = time.monotonic()
+        # Asl (tarjimasiz) ustunlarga standart til qiymati yoziladi
+        with translation.override(self.default_language):
+            for chunk in chunked(rows, self.chunk_size):
+                chunk_started = time.monotonic()
+                self.import_chunk(chunk)
+                elapsed = time.monotonic() - chunk_started
+                self.log(
+                    f"{self.stats['rows']} qator: {len(chunk) / elapsed if elapsed else 0:.0f} qator/s"
+                )
+        self.stats['elapsed'] = time.monotonic() - started
+        return self.stats
+
+    def _error(self, number, message):
+        self.stats['errors'] += 1
+        self.errors.append((number, str(message)))
+
+    def parse_chunk(self, chunk):
+        items = []
+        for number, row in chunk:
+            self.stats['rows'] += 1
+            try:
+                if not isinstance(row, dict):
+                    raise RowError("obyekt kutilgan")
+                item = parse_row(row)
+                if item['slug'] in self.seen_slugs:
+                    raise RowError(f"slug takrorlangan: {item['slug']}")
+            except RowError as exc:
+                self._error(number, exc)
+                continue
+            self.seen_slugs.add(item['slug'])
+            item['number'] = number
+            items.append(item)
+        return items
+
+    def resolve_categories(self, items):
+        """Bazada yo'q va nomi berilmagan kategoriyali qatorlarni chiqarib tashlash"""
+        wanted = {item['category'] for item in items} - set(self.known_categories)
+        if wanted:
+            self.known_categories.update(
+                Category.objects.filter(slug__in=wanted).values_list('slug', 'pk')
+            )
+        valid = []
+        for item in items:
+            names = item['category_names']
+            if item['category'] not in self.known_categories and not names.get(f'name_{self.default_language}'):
+                self._error(item['number'], f"Kategoriya topilmadi: {item['category']}")
+                continue
+            valid.append(item)
+        return valid
+
+    def ingest_images(self, items):
+        if self.ingestor is None:
+            # --skip-images: galereyaga tegilmaydi (asosiy rasm ustuni ham yozilmaydi)
+            for item in items:
+                item['images'] = None
+            return
+        main_upload_to = _upload_to(Product, 'main_image')
+        gallery_upload_to = _upload_to(ProductImage, 'image')
+
+        if self.dry_run:
+            for item in items:
+                sources = [item['main_image']] if item['main_image'] else []
+                sources += [image['source'] for image in item['images'] or []]
+                for source in sources:
+                    try:
+                        self.ingestor.check(source)
+                    except RowError as exc:
+                        self.warnings.append((item['number'], str(exc)))
+            return
+
+        sources = set()
+        for item in items:
+            if item['main_image']:
+                sources.add((item['main_image'], main_upload_to))
+            for image in item['images'] or []:
+                sources.add((image['source'], gallery_upload_to))
+        results = self.ingestor.ingest(sources)
+
+        for item in items:
+            if item['main_image']:
+                name = results[(item['main_image'], main_upload_to)]
+                if isinstance(name, RowError):
+                    self.warnings.append((item['number'], str(name)))
+                else:
+                    item['product']['main_image'] = name
+            if item['images'] is not None:
+                images = []
+                for image in item['images']:
+                    name = results[(image['source'], gallery_upload_to)]
+                    if isinstance(name, RowError):
+                        self.warnings.append((item['number'], str(name)))
+                    else:
+                        images.append({**image, 'image': name})
+                item['images'] = images
+
+    def import_chunk(self, chunk):
+        items = self.resolve_categories(self.parse_chunk(chunk))
+        if not items:
+            return
+        existing = {
+            row['slug']: row for row in Product.objects.filter(
+                slug__in=[item['slug'] for item in items]
+            ).values('slug', 'main_image', *derived_fields('main_image'))
+        }
+        self.ingest_images(items)
+        self.keep_derived(items, existing)
+
+        if self.dry_run:
+            self.stats['updated'] += len(existing)
+            self.stats['created'] += len(items) - len(existing)
+            return
+
+        state = self.snapshot()
+        try:
+            self.write(items)
+        except IntegrityError:
+            # Boshqa unique cheklov (masalan, tarjima qilingan xususiyat nomi) -
+            # bo'lak bekor qilindi, xato qatorni topish uchun qatorlar alohida yoziladi
+            self.restore(state)
+            items = self.write_each(items)
+        updated = sum(1 for item in items if item['slug'] in existing)
+        self.stats['updated'] += updated
+        self.stats['created'] += len(items) - updated
+
+    def snapshot(self):
+        """Rollback'da qaytariladigan holat: hisoblagichlar va yaratilgan kategoriyalar"""
+        return dict(self.stats), dict(self.known_categories)
+
+    def restore(self, state):
+        stats, known_categories = state
+        self.stats.update(stats)
+        self.known_categories = known_categories
+
+    def write(self, items):
+        with transaction.atomic():
+            self.upsert_categories(items)
+            product_ids = self.upsert_products(items)
+            self.upsert_specifications(items, product_ids)
+            self.upsert_images(items, product_ids)
+            for item in items:
+                if item.get('image_changed'):
+                    queue_image_processing(Product, product_ids[item['slug']], 'main_image')
+
+    def write_each(self, items):
+        """Qatorlarni alohida savepoint'larda yozish; yozilganlarini qaytaradi"""
+        written = []
+        for item in items:
+            state = self.snapshot()
+            try:
+                self.write([item])
+            except IntegrityError as exc:
+                self.restore(state)
+                self._error(item['number'], f"Bazaga yozib bo'lmadi: {exc}")
+            else:
+                written.append(item)
+        return written
+
+    def keep_derived(self, items, existing):
+        """Asosiy rasm o'zgarmagan bo'lsa variantlar va placeholder saqlanadi, aks holda qayta hisoblanadi"""
+        for item in items:
+            product = item['product']
+            if 'main_image' not in product:
+                continue
+            row = existing.get(item['slug'])
+            changed = row is None or row['main_image'] != product['main_image']
+            for field in derived_fields('main_image'):
+                product[field] = Product._meta.get_field(field).get_default() if changed else row[field]
+            item['image_changed'] = changed
+
+    def upsert_categories(self, items):
+        categories = {}
+        for item in items:
+            names = item['category_names']
+            if names:
+                categories[item['category']] = names
+        if not categories:
+            return
+
+        # Bir xil nomlar to'plami bo'yicha guruhlash: faqat berilgan tillar yangilanadi
+        groups = {}
+        for slug, names in categories.items():
+            groups.setdefault(tuple(sorted(names)), []).append(Category(slug=slug, **names))
+        for fields, objects in groups.items():
+            update_fields = [*fields, 'updated_at']
+            if f'name_{self.default_language}' in fields:
+                update_fields.append('name')
+            Category.objects.bulk_create(
+                objects,
+                update_conflicts=True,
+                unique_fields=['slug'],
+                update_fields=update_fields,
+            )
+        self.stats['categories'] += len(categories)
+
+        self.known_categories.update(
+            Category.objects.filter(slug__in=list(categories)).values_list('slug', 'pk')
+        )
+
+    def upsert_products(self, items):
+        groups = {}
+        for item in items:
+            fields = item['product']
+            groups.setdefault(tuple(sorted(fields)), []).append(
+                Product(slug=item['slug'], category_id=self.known_categories[item['category']], **fields)
+            )
+
+        for fields, objects in groups.items():
+            update_fields = ['category', *fields, 'updated_at']
+            for name in ('name', 'short_description', 'description'):
+                if f'{name}_{self.default_language}' in fields:
+                    update_fields.append(name)
+            Product.objects.bulk_create(
+                objects,
+                update_conflicts=True,
+                unique_fields=['slug'],
+                update_fields=update_fields,
+            )
+
+        # update_conflicts bilan pk har doim ham qaytmaydi - slug bo'yicha olinadi
+        return dict(
+            Product.objects.filter(slug__in=[item['slug'] for item in items]).values_list('slug', 'pk')
+        )
+
+    def upsert_specifications(self, items, product_ids):
+        default_name = f'name_{self.default_language}'
+        specifications = []
+        keep = {}
+        for item in items:
+            if item['specifications'] is None:
+                continue
+            product_id = product_ids[item['slug']]
+            keep[product_id] = [spec[default_name] for spec in item['specifications']]
+            specifications.extend(
+                ProductSpecification(product_id=product_id, sort_order=index, **spec)
+                for index, spec in enumerate(item['specifications'])
+            )
+
+        if specifications:
+            ProductSpecification.objects.bulk_create(
+                specifications,
+                update_conflicts=True,
+                unique_fields=['product', 'name'],
+                update_fields=[*localized('name'), *localized('value'), 'value', 'sort_order'],
+            )
+            self.stats['specifications'] += len(specifications)
+
+        if self.prune:
+            for product_id, names in keep.items():
+                ProductSpecification.objects.filter(product_id=product_id).exclude(name__in=names).delete()
+
+    def upsert_images(self, items, product_ids):
+        """ProductImage'da unique kalit yo'q: (mahsulot, fayl nomi) bo'yicha bulk_update / bulk_create"""
+        wanted = {
+            product_ids[item['slug']]: item['images']
+            for item in items if item['images'] is not None
+        }
+        if not wanted:
+            return
+
+        existing = {}
+        for image in ProductImage.objects.filter(product_id__in=list(wanted)).only('id', 'product_id', 'image'):
+            existing.setdefault((image.product_id, image.image.name), image)
+
+        alt_fields = localized('alt_text')
+        to_create, to_update, keep_ids = [], [], []
+        for product_id, images in wanted.items():
+            for index, data in enumerate(images):
+                values = {field: data[field] for field in alt_fields}
+                image = existing.get((product_id, data['image']))
+                if image is None:
+                    to_create.append(ProductImage(
+                        product_id=product_id, image=data['image'], sort_order=index, **values
+                    ))
+                    continue
+                keep_ids.append(image.pk)
+                for field, value in values.items():
+                    setattr(image, field, value)
+                image.sort_order = index
+                to_update.append(image)
+
+        if self.prune:
+            ProductImage.objects.filter(product_id__in=list(wanted)).exclude(pk__in=keep_ids).delete()
+        if to_update:
+            ProductImage.objects.bulk_update(to_update, [*alt_fields, 'alt_text', 'sort_order'])
+        if to_create:
+            ProductImage.objects.bulk_create(to_create)
+            for image in to_create:
+                # pk qaytmagan bazalarda variantlar generate_image_variants buyrug'i bilan
+                if image.pk is not None:
+                    queue_image_processing(ProductImage, image.pk, 'image')
+        self.stats['images'] += len(to_create)
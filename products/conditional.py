@@ -0,0 +1,71 @@
+"""ETag bilan shartli GET
+
+Validatorlar arzon so'rovlardan olinadi (bitta qatorning updated_at qiymati yoki
+ro'yxat uchun MAX(updated_at) + COUNT) va bog'liq modellarning keshdagi
+versiyalari bilan birlashtiriladi. If-None-Match mos kelsa serializer umuman
+ishlamaydi va 304 qaytariladi.
+
+Last-Modified yuborilmaydi: javob bog'liq qatorlarga ham (rasmlar,
+xususiyatlar, sharhlar) bog'liq, ularning o'zgarishi esa updated_at'ni
+soniya aniqligida siljitmasligi mumkin. get_conditional_response()
+If-None-Match bo'lmasa If-Modified-Since bo'yicha qaror qiladi - eskirgan
+304 bo'lmasligi uchun faqat ETag ishlatiladi.
+"""
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils import translation
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+
+from .response_cache import get_versions
+
+
+class ConditionalGetMixin:
+    validator_models = ()
+
+    def get_validators(self, request, *args, **kwargs):
+        """Validator qismlari ro'yxati yoki None (shartli GET o'chiriladi)"""
+        raise NotImplementedError
+
+    def not_modified(self, request, *args, **kwargs):
+        """304 qaytarilishidan oldin chaqiriladi"""
+
+    def make_etag(self, request, parts):
+        parts = [
+            *parts,
+            request.get_full_path(),
+            translation.get_language() or '',
+            getattr(request, 'accepted_media_type', ''),
+            *get_versions(self.validator_models),
+        ]
+        return quote_etag(hashlib.md5(repr(parts).encode('utf-8')).hexdigest())
+
+    def get(self, request, *args, **kwargs):
+        validators = self.get_validators(request, *args, **kwargs)
+        if validators is None:
+            return super().get(request, *args, **kwargs)
+
+        etag = self.make_etag(request, validators)
+
+        response = get_conditional_response(request, etag=etag)
+        if response is not None:
+            self.not_modified(request, *args, **kwargs)
+            return response
+
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            response['ETag'] = etag
+        return response
+
+
+class ConditionalListMixin(ConditionalGetMixin):
+    """Ro'yxatlar uchun: filtrlangan queryset bo'yicha MAX(updated_at) va COUNT"""
+
+    def get_validators(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        stats = queryset.order_by().aggregate(
+            last_modified=Max('updated_at'),
+            count=Count('pk')
+        )
+        return [stats['count'], stats['last_modified']]
@@ -0,0 +1,188 @@
+"""Katalog eksporti (CSV / NDJSON) - oqim sifatida
+
+Yozuvlar queryset.iterator(chunk_size=...) orqali olinadi (PostgreSQL'da
+server-side cursor), rasmlar va xususiyatlar har bir bo'lak uchun alohida
+prefetch qilinadi. Javob StreamingHttpResponse bilan qatorma-qator
+yuboriladi, shuning uchun xotira jadval hajmiga bog'liq emas.
+"""
+import csv
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+from .models import Product, ProductImage, ProductSpecification
+
+EXPORT_CHUNK_SIZE = 500
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+}
+
+# Excel / LibreOffice shu belgilar bilan boshlangan katakni formula deb
+# bajaradi (CSV injection) - oldiga ' qo'yiladi. ' ning o'zi ham
+# ekranlanadi, shunda unescape_csv_value() asl qiymatni aniq qaytaradi.
+CSV_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+CSV_ESCAPE = "'"
+
+
+class CSVExportRenderer(BaseRenderer):
+    """Faqat kontent muzokarasi uchun (?format=csv yoki Accept: text/csv).
+
+    Eksport javobining o'zi StreamingHttpResponse; bu renderer faqat xato
+    javoblarini (403 va h.k.) JSON matn sifatida chiqaradi.
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return JSONRenderer().render(data)
+
+
+class NDJSONExportRenderer(CSVExportRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+
+EXPORT_RENDERER_CLASSES = [CSVExportRenderer, NDJSONExportRenderer, JSONRenderer]
+
+
+def localized(name):
+    """name -> ['name_uz', 'name_en', 'name_ru']"""
+    return [f'{name}_{language}' for language in settings.MODELTRANSLATION_LANGUAGES]
+
+
+class _Echo:
+    """csv.writer uchun: yozilgan qatorni buferlamasdan qaytaradi"""
+
+    def write(self, value):
+        return value
+
+
+def escape_csv_value(value):
+    if value.startswith((*CSV_FORMULA_PREFIXES, CSV_ESCAPE)):
+        return CSV_ESCAPE + value
+    return value
+
+
+def unescape_csv_value(value):
+    """escape_csv_value() ga teskari (import uchun)"""
+    if value.startswith(CSV_ESCAPE) and value[1:].startswith((*CSV_FORMULA_PREFIXES, CSV_ESCAPE)):
+        return value[1:]
+    return value
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, cls=DjangoJSONEncoder, ensure_ascii=False)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if isinstance(value, str):
+        return escape_csv_value(value)
+    return value
+
+
+def csv_lines(records, fields):
+    writer = csv.writer(_Echo())
+    # Excel kirill harflarini to'g'ri ochishi uchun UTF-8 BOM
+    yield '\ufeff' + writer.writerow(fields)
+    for record in records:
+        yield writer.writerow([_csv_value(record.get(field)) for field in fields])
+
+
+def ndjson_lines(records):
+    for record in records:
+        yield json.dumps(record, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
+
+def export_lines(records, fields, file_format):
+    if file_format == 'ndjson':
+        return ndjson_lines(records)
+    return csv_lines(records, fields)
+
+
+def write_export(lines, path, stdout):
+    """Eksport qatorlarini faylga yoki ('-' bo'lsa) buyruqning stdout'iga yozish; qatorlar sonini qaytaradi"""
+    count = 0
+    if path == '-':
+        for line in lines:
+            stdout.write(line, ending='')
+            count += 1
+        return count
+    with open(path, 'w', encoding='utf-8', newline='') as output:
+        for line in lines:
+            output.write(line)
+            count += 1
+    return count
+
+
+def streaming_export(request, records, fields, filename):
+    """?format=csv|ndjson (standart - csv) bo'yicha oqimli javob"""
+    file_format = request.accepted_renderer.format
+    if file_format not in EXPORT_FORMATS:
+        file_format = 'csv'
+    response = StreamingHttpResponse(
+        export_lines(records, fields, file_format),
+        content_type=EXPORT_FORMATS[file_format]
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{file_format}"'
+    return response
+
+
+# ============ MAHSULOTLAR ============
+
+PRODUCT_EXPORT_FIELDS = [
+    'id', 'slug', 'category',
+    *localized('name'), *localized('short_description'), *localized('description'),
+    'price', 'old_price', 'is_active', 'is_featured',
+    'rating', 'reviews_count', 'views_count',
+    'main_image', 'images', 'specifications',
+    'created_at', 'updated_at',
+]
+
+
+def _file_url(field_file, build_url):
+    if not field_file:
+        return None
+    return build_url(field_file.url) if build_url else field_file.url
+
+
+def product_records(queryset=None, chunk_size=EXPORT_CHUNK_SIZE, build_url=None):
+    """Mahsulotlar (barcha tillar, rasmlar va xususiyatlar bilan) - dict oqimi
+
+    build_url - rasm manzilini to'liq URL'ga aylantirish (masalan,
+    request.build_absolute_uri); berilmasa MEDIA_URL'ga nisbiy manzil.
+    """
+    if queryset is None:
+        queryset = Product.objects.all()
+    queryset = queryset.select_related('category').prefetch_related(
+        Prefetch('images', queryset=ProductImage.objects.order_by('sort_order', 'created_at')),
+        Prefetch('specifications', queryset=ProductSpecification.objects.order_by('sort_order', 'name')),
+    ).order_by('pk')
+
+    computed = {'category', 'main_image', 'images', 'specifications'}
+    plain_fields = [field for field in PRODUCT_EXPORT_FIELDS if field not in computed]
+    for product in queryset.iterator(chunk_size=chunk_size):
+        record = {field: getattr(product, field) for field in plain_fields}
+        record.update({
+            'category': product.category.slug,
+            'main_image': _file_url(product.main_image, build_url),
+            'images': [
+                {'url': _file_url(image.image, build_url), **{
+                    field: getattr(image, field) for field in localized('alt_text')
+                }}
+                for image in product.images.all()
+            ],
+            'specifications': [
+                {field: getattr(spec, field) for field in [*localized('name'), *localized('value')]}
+                for spec in product.specifications.all()
+            ],
+        })
+        yield {field: record[field] for field in PRODUCT_EXPORT_FIELDS}
@@ -0,0 +1,216 @@
+"""Mahsulot nomlari bo'yicha xotiradagi (in-process) noaniq qidiruv indeksi
+
+Lotin/kirill yozuvidagi o'zbekcha, ruscha va xato yozilgan so'rovlar
+("divan", "диван", "dıvan") bitta normal shaklga keltiriladi va so'zlar
+trigrammalari bo'yicha solishtiriladi. Qidiruv bazaga murojaat qilmaydi.
+
+Indeks har bir jarayonda (gunicorn worker) alohida saqlanadi. O'zgarishlar
+signal orqali shu jarayonda darhol qo'llanadi, boshqa jarayonlar esa keshdagi
+versiya kaliti orqali xabar topib, indeksni fonda qayta quradi.
+"""
+import re
+import unicodedata
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import Case, FloatField, Value, When
+from rest_framework.settings import api_settings
+
+from .local_index import LocalIndex
+from .search import FullTextSearchFilter
+
+# Qidiruvda foydalaniladigan tarjima maydonlari va ularning og'irligi
+INDEXED_FIELDS = (
+    ('name', 1.0),
+    ('short_description', 0.5),
+)
+
+# So'zlar o'xshash deb hisoblanadigan minimal trigramma o'xshashligi
+SIMILARITY_THRESHOLD = 0.3
+MAX_RESULTS = 200
+
+# Kirill -> lotin (o'zbek lotin alifbosiga yaqin)
+CYRILLIC_TO_LATIN = {
+    'а': 'a', 'б': 'b', 'в': 'v', 'г': 'g', 'д': 'd', 'е': 'e', 'ё': 'yo',
+    'ж': 'j', 'з': 'z', 'и': 'i', 'й': 'y', 'к': 'k', 'л': 'l', 'м': 'm',
+    'н': 'n', 'о': 'o', 'п': 'p', 'р': 'r', 'с': 's', 'т': 't', 'у': 'u',
+    'ф': 'f', 'х': 'x', 'ц': 'ts', 'ч': 'ch', 'ш': 'sh', 'щ': 'sh', 'ъ': '',
+    'ы': 'i', 'ь': '', 'э': 'e', 'ю': 'yu', 'я': 'ya', 'ў': 'o', 'қ': 'q',
+    'ғ': 'g', 'ҳ': 'h',
+}
+
+# Lotin yozuvidagi o'ziga xos harflar va apostrof variantlari
+LATIN_REPLACEMENTS = {
+    'ı': 'i', 'ʻ': '', 'ʼ': '', '‘': '', '’': '', "'": '', '`': '',
+}
+
+_TRANSLITERATION = str.maketrans({**CYRILLIC_TO_LATIN, **LATIN_REPLACEMENTS})
+_WORD_RE = re.compile(r'[a-z0-9]+')
+
+
+def normalize(text):
+    """Matnni kichik harfli, diakritikasiz lotin so'zlari ro'yxatiga aylantirish"""
+    if not text:
+        return []
+    text = text.lower().translate(_TRANSLITERATION)
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return _WORD_RE.findall(text)
+
+
+def trigrams(word):
+    padded = f'  {word} '
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def product_words(texts):
+    """{maydon: matn} -> {so'z: og'irlik}"""
+    words = {}
+    for field, weight in INDEXED_FIELDS:
+        for language in settings.MODELTRANSLATION_LANGUAGES:
+            for word in normalize(texts.get(f'{field}_{language}')):
+                words[word] = max(words.get(word, 0), weight)
+    return words
+
+
+class FuzzyProductIndex(LocalIndex):
+    version_key = 'fuzzy_product_index:version'
+
+    def __init__(self):
+        super().__init__()
+        self._word_trigrams = {}
+        self._trigram_words = defaultdict(set)
+        self._word_products = defaultdict(dict)
+        self._product_words = {}
+
+    # ============ YANGILASH ============
+
+    def _add(self, product_id, words):
+        self._product_words[product_id] = words
+        for word, weight in words.items():
+            if word not in self._word_trigrams:
+                grams = trigrams(word)
+                self._word_trigrams[word] = grams
+                for gram in grams:
+                    self._trigram_words[gram].add(word)
+            self._word_products[word][product_id] = weight
+
+    def _remove(self, product_id):
+        for word in self._product_words.pop(product_id, {}):
+            products = self._word_products.get(word)
+            if products is None:
+                continue
+            products.pop(product_id, None)
+            if not products:
+                del self._word_products[word]
+                for gram in self._word_trigrams.pop(word, ()):
+                    self._trigram_words[gram].discard(word)
+                    if not self._trigram_words[gram]:
+                        del self._trigram_words[gram]
+
+    def update_product(self, product_id, texts, is_active=True):
+        with self._lock:
+            self._remove(product_id)
+            if is_active:
+                self._add(product_id, product_words(texts))
+
+    def remove_product(self, product_id):
+        with self._lock:
+            self._remove(product_id)
+
+    def load(self):
+        """Faol mahsulotlardan yangi indeks qurish"""
+        from .models import Product
+
+        fields = [
+            f'{field}_{language}'
+            for field, _weight in INDEXED_FIELDS
+            for language in settings.MODELTRANSLATION_LANGUAGES
+        ]
+        fresh = FuzzyProductIndex()
+        rows = Product.objects.filter(is_active=True).order_by().values('pk', *fields)
+        for row in rows.iterator(chunk_size=2000):
+            fresh._add(row['pk'], product_words(row))
+        return fresh
+
+    def install(self, state):
+        self._word_trigrams = state._word_trigrams
+        self._trigram_words = state._trigram_words
+        self._word_products = state._word_products
+        self._product_words = state._product_words
+
+    # ============ QIDIRUV ============
+
+    def search(self, query, limit=MAX_RESULTS):
+        """[(product_id, ball), ...] - eng mosidan boshlab"""
+        query_words = normalize(query)
+        if not query_words:
+            return []
+
+        scores = defaultdict(float)
+        with self._lock:
+            for query_word in query_words:
+                query_grams = trigrams(query_word)
+                shared = defaultdict(int)
+                for gram in query_grams:
+                    for word in self._trigram_words.get(gram, ()):
+                        shared[word] += 1
+
+                best = {}
+                for word, common in shared.items():
+                    similarity = common / (len(query_grams) + len(self._word_trigrams[word]) - common)
+                    if similarity < SIMILARITY_THRESHOLD:
+                        continue
+                    for product_id, weight in self._word_products[word].items():
+                        score = similarity * weight
+                        if score > best.get(product_id, 0):
+                            best[product_id] = score
+
+                for product_id, score in best.items():
+                    scores[product_id] += score
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return ranked[:limit]
+
+
+product_index = FuzzyProductIndex()
+
+
+def product_saved(sender, instance, **kwargs):
+    texts = {
+        f'{field}_{language}': getattr(instance, f'{field}_{language}', None)
+        for field, _weight in INDEXED_FIELDS
+        for language in settings.MODELTRANSLATION_LANGUAGES
+    }
+    product_index.apply_local_change(
+        lambda: product_index.update_product(instance.pk, texts, is_active=instance.is_active)
+    )
+
+
+def product_deleted(sender, instance, **kwargs):
+    product_index.apply_local_change(lambda: product_index.remove_product(instance.pk))
+
+
+class FuzzySearchFilter(FullTextSearchFilter):
+    """Xotiradagi noaniq qidiruv; indeks hali tayyor bo'lmasa yoki hech narsa
+    topilmasa, bazadagi qidiruvga o'tadi"""
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query or not product_index.ensure_fresh():
+            return super().filter_queryset(request, queryset, view)
+
+        results = product_index.search(query)
+        if not results:
+            return super().filter_queryset(request, queryset, view)
+
+        queryset = queryset.filter(pk__in=[product_id for product_id, _score in results]).annotate(
+            search_rank=Case(
+                *[When(pk=product_id, then=Value(score)) for product_id, score in results],
+                default=Value(0.0),
+                output_field=FloatField()
+            )
+        )
+        if not request.query_params.get(api_settings.ORDERING_PARAM):
+            queryset = queryset.order_by('-search_rank', *queryset.query.order_by)
+        return queryset
@@ -0,0 +1,234 @@
+"""Katalog rasmlaridan olinadigan ma'lumotlar: o'lchamli variantlar va placeholder
+
+Variantlar (WebP / JPEG, srcset uchun) asl fayl yonidagi variants/ papkasiga
+yoziladi:
+
+    products/chair.jpg -> products/variants/chair.jpg.320w.webp
+
+va modelning <maydon>_variants JSON ustunida saqlanadi:
+
+    {'webp': {'320': 'products/variants/chair.jpg.320w.webp', ...}, 'jpeg': {...}}
+
+<maydon>_width / <maydon>_height - EXIF orientatsiyasi hisobga olingan asl
+o'lcham, <maydon>_placeholder - kichik (LQIP) WebP rasm data: URI ko'rinishida.
+Frontend ular bilan katta rasm yuklanguncha joyni band qilib, xira ko'rinishni
+qo'shimcha so'rovsiz chiqaradi.
+
+Rasm fayli o'zgarganda (pre_save'da bazadagi nom bilan solishtiriladi) bu
+ustunlar tozalanadi va commit'dan keyin Celery task ularni bitta dekodlashda
+qayta hisoblaydi. Fayl o'zgarmagan bo'lsa bazadagi qiymatlar saqlanib qoladi -
+to'liq save() task yozgan qiymatni eski nusxa bilan ustidan yozib yubormaydi.
+"""
+import base64
+import io
+import logging
+import posixpath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Category, Product, ProductImage
+from .response_cache import bump_versions
+
+logger = logging.getLogger(__name__)
+
+VARIANT_WIDTHS = tuple(sorted(getattr(settings, 'IMAGE_VARIANT_WIDTHS', (320, 640, 960, 1280))))
+VARIANT_FORMATS = ('webp', 'jpeg')
+VARIANT_QUALITY = getattr(settings, 'IMAGE_VARIANT_QUALITY', 80)
+
+VARIANT_EXTENSIONS = {'webp': 'webp', 'jpeg': 'jpg'}
+
+# LQIP: eng uzun tomoni shu o'lchamdagi WebP (~200-400 bayt base64)
+PLACEHOLDER_SIZE = getattr(settings, 'IMAGE_PLACEHOLDER_SIZE', 16)
+PLACEHOLDER_QUALITY = 40
+
+# Rasm maydonidan olinadigan ustunlar: '<maydon>_<qo'shimcha>'
+DERIVED_SUFFIXES = ('variants', 'width', 'height', 'placeholder')
+
+# (model, rasm maydoni) - variantlar '<maydon>_variants' ustunida
+IMAGE_FIELDS = (
+    (Category, 'image'),
+    (Product, 'main_image'),
+    (ProductImage, 'image'),
+)
+
+
+def variants_field(field):
+    return f'{field}_variants'
+
+
+def derived_fields(field):
+    return [f'{field}_{suffix}' for suffix in DERIVED_SUFFIXES]
+
+
+def image_fields(model):
+    return [field for image_model, field in IMAGE_FIELDS if image_model is model]
+
+
+def variant_name(name, width, image_format):
+    directory, filename = posixpath.split(name)
+    return posixpath.join(directory, 'variants', f'{filename}.{width}w.{VARIANT_EXTENSIONS[image_format]}')
+
+
+def _variant_widths(width):
+    """Asl o'lchamdan kichik kengliklar; asl rasm kichik bo'lsa uning o'zi ham"""
+    widths = [value for value in VARIANT_WIDTHS if value < width]
+    if width <= VARIANT_WIDTHS[-1]:
+        widths.append(width)
+    return widths
+
+
+def _prepare(image, image_format):
+    from PIL import Image
+
+    if image.mode == 'P':
+        image = image.convert('RGBA')
+    has_alpha = image.mode in ('RGBA', 'LA') or 'transparency' in image.info
+    if image_format == 'jpeg' and has_alpha:
+        # JPEG'da shaffoflik yo'q - oq fonga
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.convert('RGBA').getchannel('A'))
+        return background
+    if has_alpha:
+        return image.convert('RGBA')
+    return image.convert('RGB')
+
+
+def _encode(image, image_format):
+    buffer = io.BytesIO()
+    if image_format == 'webp':
+        image.save(buffer, 'WEBP', quality=VARIANT_QUALITY, method=4)
+    else:
+        image.save(buffer, 'JPEG', quality=VARIANT_QUALITY, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def _placeholder(image):
+    thumbnail = _prepare(image, 'webp')
+    thumbnail.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+    buffer = io.BytesIO()
+    thumbnail.save(buffer, 'WEBP', quality=PLACEHOLDER_QUALITY)
+    return 'data:image/webp;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii')
+
+
+def process_image(name, storage=None):
+    """Fayl uchun variantlar, o'lcham va placeholder (mavjud variantlar qayta yaratilmaydi)
+
+    {'variants': ..., 'width': ..., 'height': ..., 'placeholder': ...} qaytaradi.
+    Bazaga murojaat qilmaydi - backfill buyrug'i uni alohida jarayonlarda ishlatadi.
+    """
+    from PIL import Image, ImageOps
+
+    storage = storage or default_storage
+    with storage.open(name, 'rb') as source:
+        image = Image.open(source)
+        # EXIF orientatsiyasi 90° bo'lsa eni va bo'yi almashadi
+        rotated = image.getexif().get(0x0112) in (5, 6, 7, 8)
+        width, height = (image.height, image.width) if rotated else image.size
+        widths = _variant_widths(width)
+
+        variants = {
+            image_format: {str(value): variant_name(name, value, image_format) for value in widths}
+            for image_format in VARIANT_FORMATS
+        }
+        missing = [
+            (image_format, int(value), variant)
+            for image_format, names in variants.items()
+            for value, variant in names.items()
+            if not storage.exists(variant)
+        ]
+
+        # JPEG'ni dekodlashda kerakli o'lchamgacha kichraytirish (katta telefon
+        # rasmlari uchun); variantlar tayyor bo'lsa faqat placeholder o'lchamigacha
+        largest = max((value for _format, value, _name in missing), default=PLACEHOLDER_SIZE)
+        image.draft('RGB', (1, largest) if rotated else (largest, 1))
+        image = ImageOps.exif_transpose(image)
+        image.load()
+
+    for image_format, value, variant in missing:
+        resized_height = max(1, round(image.height * value / image.width))
+        resized = image if value == image.width else image.resize((value, resized_height), Image.Resampling.LANCZOS)
+        saved = storage.save(variant, ContentFile(_encode(_prepare(resized, image_format), image_format)))
+        variants[image_format][str(value)] = saved
+
+    return {'variants': variants, 'width': width, 'height': height, 'placeholder': _placeholder(image)}
+
+
+def save_derived(model, pk, field, name, data):
+    """process_image() natijasini yozish - fayl shu orada almashtirilmagan bo'lsa"""
+    updates = {f'{field}_{suffix}': data[suffix] for suffix in DERIVED_SUFFIXES}
+    if any(model_field.name == 'updated_at' for model_field in model._meta.concrete_fields):
+        # ETag validatorlari updated_at'dan olinadi
+        updates['updated_at'] = timezone.now()
+    updated = model.objects.filter(pk=pk, **{field: name}).update(**updates)
+    if updated:
+        bump_versions(model)
+    return updated
+
+
+def process_field(model, pk, field):
+    name = model.objects.filter(pk=pk).values_list(field, flat=True).first()
+    if not name:
+        return 0
+    return save_derived(model, pk, field, name, process_image(name))
+
+
+def queue_image_processing(model, pk, field):
+    """Commit'dan keyin task yuborish; broker ishlamasa saqlash xatosiz tugaydi
+
+    Navbatga tushmagan rasmlarni generate_image_variants buyrug'i keyinroq hisoblaydi.
+    """
+    from .tasks import generate_image_variants
+
+    def send():
+        try:
+            generate_image_variants.delay(model._meta.label_lower, pk, field)
+        except Exception:
+            logger.exception("%s #%s %s variantlari navbatga qo'yilmadi", model._meta.label_lower, pk, field)
+
+    transaction.on_commit(send)
+
+
+# ============ SIGNALLAR ============
+
+def image_pre_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Fayli o'zgargan maydonlar ustunlarini tozalash, qolganlarini bazadan olish"""
+    instance._changed_image_fields = []
+    if raw:
+        return
+    fields = [
+        field for field in image_fields(sender)
+        if update_fields is None or field in update_fields
+    ]
+    if not fields:
+        return
+
+    stored = None
+    if not instance._state.adding and instance.pk is not None:
+        stored = sender.objects.filter(pk=instance.pk).values(
+            *fields, *[name for field in fields for name in derived_fields(field)]
+        ).first()
+
+    for field in fields:
+        name = getattr(instance, field).name or ''
+        changed = stored is None or (stored[field] or '') != name
+        for derived in derived_fields(field):
+            if changed:
+                value = sender._meta.get_field(derived).get_default()
+            else:
+                value = stored[derived]
+            setattr(instance, derived, value)
+        if changed:
+            instance._changed_image_fields.append(field)
+
+
+def image_post_save(sender, instance, raw=False, **kwargs):
+    for field in getattr(instance, '_changed_image_fields', ()):
+        name = getattr(instance, field).name
+        # Model default'i (products/default.jpg) - umumiy placeholder, variantlari kerak emas
+        if name and name != sender._meta.get_field(field).get_default():
+            queue_image_processing(sender, instance.pk, field)
+    instance._changed_image_fields = []
@@ -0,0 +1,94 @@
+"""Jarayon ichidagi (in-process) qidiruv indekslari uchun umumiy asos
+
+Har bir gunicorn worker indeksning o'z nusxasini saqlaydi. Keshdagi versiya
+kaliti barcha jarayonlar uchun umumiy: o'zgarish bo'lganda versiya oshiriladi,
+eskirgan nusxalar esa fonda qayta quriladi (shu vaqtda eski nusxa ishlaydi).
+"""
+import logging
+import threading
+
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+class LocalIndex:
+    version_key = None
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._building = False
+        self.version = None
+        self.is_ready = False
+
+    def load(self):
+        """Bazadan yangi holatni yig'ish (lock ushlanmagan holda)"""
+        raise NotImplementedError
+
+    def install(self, state):
+        """load() natijasini joriy holat sifatida o'rnatish (lock ichida)"""
+        raise NotImplementedError
+
+    def build(self):
+        version = cache.get(self.version_key)
+        state = self.load()
+        with self._lock:
+            self.install(state)
+            self.version = version
+            self.is_ready = True
+
+    def _build_in_background(self):
+        from django.db import connection
+
+        try:
+            self.build()
+        except Exception:
+            logger.exception("%s indeksini qurishda xato", type(self).__name__)
+        finally:
+            self._building = False
+            connection.close()
+
+    def ensure_fresh(self):
+        """Indeks eskirgan bo'lsa fonda qayta qurish; tayyorligini qaytaradi"""
+        if self.is_ready and self.version == cache.get(self.version_key):
+            return True
+        with self._lock:
+            if not self._building:
+                self._building = True
+                threading.Thread(target=self._build_in_background, daemon=True).start()
+        # Eskirgan bo'lsa ham qayta qurilguncha mavjud nusxa ishlatiladi
+        return self.is_ready
+
+    def _increment_version(self):
+        cache.add(self.version_key, 0, timeout=None)
+        try:
+            return cache.incr(self.version_key)
+        except ValueError:
+            cache.set(self.version_key, 1, timeout=None)
+            return 1
+
+    def mark_stale(self):
+        """Barcha jarayonlardagi nusxalarni eskirgan deb belgilash
+
+        Tranzaksiya ichida chaqirilsa, commit'dan keyin bajariladi - aks holda
+        fondagi qayta qurish commit'dan oldingi holatni yangi versiya bilan
+        o'rnatib qo'yishi mumkin, rollback esa behuda qayta qurishga olib keladi.
+        """
+        transaction.on_commit(self._increment_version)
+
+    def apply_local_change(self, apply):
+        """O'zgarishni shu jarayondagi nusxaga commit'dan keyin qo'llash
+
+        Nusxa yangi bo'lsa, versiyasi ham oshiriladi - qayta qurish shart emas.
+        """
+        transaction.on_commit(lambda: self._apply_local_change(apply))
+
+    def _apply_local_change(self, apply):
+        version = self._increment_version()
+        if not self.is_ready:
+            return
+        with self._lock:
+            apply()
+            if self.version == version - 1:
+                self.version = version
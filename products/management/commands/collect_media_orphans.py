@@ -0,0 +1,122 @@
+import os
+import posixpath
+import re
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from products.images import IMAGE_FIELDS
+from products.storage import catalog_image_storage
+
+BATCH_SIZE = 1000
+MIN_AGE_HOURS = 24
+
+# products/variants/<asl fayl>.<en>w.<kengaytma> -> products/<asl fayl>
+VARIANT_RE = re.compile(r'^(?P<source>.+)\.\d+w\.[a-z]+$')
+
+
+def scan(storage, directory):
+    """(nom, asl fayl nomi, DirEntry) - katalog va uning variants/ papkasi, xotirada ro'yxatsiz"""
+    path = storage.path(directory)
+    if not os.path.isdir(path):
+        return
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_file(follow_symlinks=False):
+                name = posixpath.join(directory, entry.name)
+                yield name, name, entry
+
+    variants = os.path.join(path, 'variants')
+    if not os.path.isdir(variants):
+        return
+    with os.scandir(variants) as entries:
+        for entry in entries:
+            match = VARIANT_RE.match(entry.name)
+            if entry.is_file(follow_symlinks=False) and match:
+                yield (
+                    posixpath.join(directory, 'variants', entry.name),
+                    posixpath.join(directory, match['source']),
+                    entry,
+                )
+
+
+def batches(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class Command(BaseCommand):
+    help = (
+        "MEDIA_ROOT'dagi katalog rasmlaridan bazada havolasi yo'qlarini (va ularning "
+        "variantlarini) topish; --delete bilan o'chirish"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--delete', action='store_true', help="Topilgan fayllarni o'chirish (standart - faqat ro'yxat)")
+        parser.add_argument(
+            '--min-age', type=float, default=MIN_AGE_HOURS,
+            help="Shu soatdan yangi fayllarga tegilmaydi (hali saqlanmagan yuklashlar)"
+        )
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1 or options['min_age'] < 0:
+            raise CommandError("--batch-size musbat, --min-age manfiy bo'lmasligi kerak")
+
+        storage = catalog_image_storage
+        # Model default'i (products/default.jpg) bazada yozilmagan bo'lishi mumkin
+        keep = {
+            model._meta.get_field(field).get_default() for model, field in IMAGE_FIELDS
+        } - {None, ''}
+        directories = sorted({
+            model._meta.get_field(field).upload_to.rstrip('/') for model, field in IMAGE_FIELDS
+        })
+
+        totals = {'scanned': 0, 'orphans': 0, 'bytes': 0}
+        for directory in directories:
+            for batch in batches(scan(storage, directory), options['batch_size']):
+                self.collect(storage, batch, keep, options, totals)
+
+        action = "o'chirildi" if options['delete'] else "topildi (o'chirish uchun --delete)"
+        self.stdout.write(self.style.SUCCESS(
+            f"{totals['scanned']} ta fayl tekshirildi: {totals['orphans']} ta keraksiz fayl "
+            f"({totals['bytes'] / 1024 / 1024:.1f} MB) {action}"
+        ))
+
+    def referenced(self, names):
+        found = set()
+        for model, field in IMAGE_FIELDS:
+            found.update(
+                model.objects.filter(**{f'{field}__in': names}).values_list(field, flat=True).distinct()
+            )
+        return found
+
+    def collect(self, storage, batch, keep, options, totals):
+        totals['scanned'] += len(batch)
+        referenced = self.referenced({source for _name, source, _entry in batch} - keep) | keep
+        # mtime havolalar tekshirilgandan keyin olinadi: storage qayta ishlatilgan
+        # faylga tegadi, shuning uchun hali commit bo'lmagan yuklash ham himoyalangan
+        threshold = time.time() - options['min_age'] * 3600
+
+        for name, source, entry in batch:
+            if source in referenced:
+                continue
+            try:
+                stat = os.stat(entry.path)
+            except FileNotFoundError:
+                continue
+            if stat.st_mtime > threshold:
+                continue
+
+            totals['orphans'] += 1
+            totals['bytes'] += stat.st_size
+            if options['delete']:
+                storage.delete(name)
+            if options['verbosity'] > 1:
+                self.stdout.write(name)
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from products.exports import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, PRODUCT_EXPORT_FIELDS, export_lines, product_records, write_export
+
+
+class Command(BaseCommand):
+    help = "Mahsulotlar katalogini CSV / NDJSON faylga eksport qilish (import_catalog bilan qayta import qilinadi)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', dest='file_format', choices=list(EXPORT_FORMATS), default='csv')
+        parser.add_argument('--output', '-o', default='-', help="Fayl yo'li ('-' - stdout)")
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE)
+        parser.add_argument(
+            '--base-url', default='',
+            help="Rasm manzillari uchun sayt manzili (masalan, https://lebem.uz)"
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        if chunk_size < 1:
+            raise CommandError("--chunk-size musbat bo'lishi kerak")
+
+        base_url = options['base_url'].rstrip('/')
+        build_url = (lambda url: base_url + url) if base_url else None
+        records = product_records(chunk_size=chunk_size, build_url=build_url)
+
+        started = time.monotonic()
+        count = write_export(
+            export_lines(records, PRODUCT_EXPORT_FIELDS, options['file_format']), options['output'], self.stdout
+        )
+        if options['file_format'] == 'csv':
+            count -= 1  # sarlavha qatori
+        elapsed = time.monotonic() - started
+        self.stderr.write(self.style.SUCCESS(
+            f"{count} ta mahsulot eksport qilindi ({elapsed:.1f} s)"
+        ))
@@ -0,0 +1,92 @@
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Q
+
+from products.images import IMAGE_FIELDS, process_image, save_derived, variants_field
+
+BATCH_SIZE = 200
+
+
+def _build(name):
+    """Worker jarayonida: (nom, process_image() natijasi yoki None, xato matni)"""
+    try:
+        return name, process_image(name), None
+    except Exception as exc:
+        return name, None, f'{type(exc).__name__}: {exc}'
+
+
+class Command(BaseCommand):
+    help = "Mavjud rasmlar uchun WebP / JPEG variantlari, o'lcham va placeholder'larni hisoblash (process pool)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model', choices=[model._meta.model_name for model, _field in IMAGE_FIELDS],
+            action='append', help="Faqat shu model(lar) (standart - hammasi)"
+        )
+        parser.add_argument('--all', action='store_true', help="Hisoblangan rasmlarni ham qayta ishlash")
+        parser.add_argument('--workers', type=int, default=None, help="Jarayonlar soni (standart - CPU soni)")
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1 or (options['workers'] is not None and options['workers'] < 1):
+            raise CommandError("--batch-size va --workers musbat bo'lishi kerak")
+
+        targets = [
+            (model, field) for model, field in IMAGE_FIELDS
+            if not options['model'] or model._meta.model_name in options['model']
+        ]
+
+        started = time.monotonic()
+        totals = {'processed': 0, 'updated': 0, 'failed': 0}
+        built = {}
+        pool = ProcessPoolExecutor(max_workers=options['workers'], mp_context=multiprocessing.get_context('fork'))
+        with pool:
+            # Workerlar fork orqali sozlangan Django'ni meros oladi; ular bazaga
+            # murojaat qilmaydi, lekin ota jarayon ulanishini ham ulashmasligi kerak.
+            # fork'da barcha workerlar birinchi submit() da ishga tushadi.
+            connections.close_all()
+            pool.submit(int).result()
+            for model, field in targets:
+                self.backfill(pool, model, field, options, built, totals)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"{totals['processed']} ta rasm ({elapsed:.1f} s): "
+            f"{totals['updated']} ta yangilandi, {totals['failed']} ta xato"
+        ))
+
+    def backfill(self, pool, model, field, options, built, totals):
+        queryset = model.objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True})
+        if not options['all']:
+            queryset = queryset.filter(Q(**{variants_field(field): {}}) | Q(**{f'{field}_placeholder': ''}))
+
+        last_pk = 0
+        while True:
+            # pk bo'yicha keyset - yangilangan qatorlar filtrdan chiqib ketsa ham hech biri o'tkazib yuborilmaydi
+            rows = list(
+                queryset.filter(pk__gt=last_pk).order_by('pk').values_list('pk', field)[:options['batch_size']]
+            )
+            if not rows:
+                break
+            last_pk = rows[-1][0]
+
+            # Bir xil fayl (masalan, products/default.jpg) faqat bir marta ishlanadi
+            names = sorted({name for _pk, name in rows if name not in built})
+            for name, data, error in pool.map(_build, names):
+                built[name] = data
+                if error:
+                    self.stderr.write(self.style.WARNING(f"{name}: {error}"))
+
+            for pk, name in rows:
+                totals['processed'] += 1
+                if built[name] is None:
+                    totals['failed'] += 1
+                else:
+                    totals['updated'] += save_derived(model, pk, field, name, built[name])
+
+            if options['verbosity'] > 1:
+                self.stdout.write(f"{model._meta.label} {field}: #{last_pk} gacha")
@@ -0,0 +1,87 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from products.catalog_import import (
+    IMAGE_WORKERS, IMPORT_CHUNK_SIZE, IMPORT_FORMATS,
+    CatalogImporter, ImageIngestor, detect_format, read_rows,
+)
+from products.models import ProductImage, ProductSpecification
+from products.response_cache import bump_versions
+from products.signals import catalog_bulk_changed
+
+# Hisobotda ko'rsatiladigan xatolar soni
+MAX_REPORTED_ERRORS = 50
+
+
+class Command(BaseCommand):
+    help = "Katalogni CSV / JSON / NDJSON fayldan import qilish (slug bo'yicha upsert)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Import fayli")
+        parser.add_argument('--format', dest='file_format', choices=IMPORT_FORMATS, help="Standart - fayl kengaytmasidan")
+        parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE)
+        parser.add_argument('--workers', type=int, default=IMAGE_WORKERS, help="Rasm yuklash uchun thread'lar soni")
+        parser.add_argument(
+            '--images-dir',
+            help="Nisbiy rasm yo'llari uchun papka (standart - import fayli joylashgan papka)"
+        )
+        parser.add_argument('--skip-images', action='store_true', help="Rasmlarni import qilmaslik")
+        parser.add_argument(
+            '--prune', action='store_true',
+            help="Faylda yo'q xususiyat va rasmlarni o'chirish (faqat images / specifications ustuni bor qatorlar uchun)"
+        )
+        parser.add_argument('--dry-run', action='store_true', help="Faqat tekshirish, bazaga yozmaslik")
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.is_file():
+            raise CommandError(f"Fayl topilmadi: {path}")
+        file_format = options['file_format'] or detect_format(path)
+        if file_format is None:
+            raise CommandError("Fayl formatini aniqlab bo'lmadi, --format bering")
+        if options['chunk_size'] < 1 or options['workers'] < 1:
+            raise CommandError("--chunk-size va --workers musbat bo'lishi kerak")
+
+        ingestor = None
+        if not options['skip_images']:
+            ingestor = ImageIngestor(options['images_dir'] or path.parent, workers=options['workers'])
+
+        importer = CatalogImporter(
+            chunk_size=options['chunk_size'],
+            dry_run=options['dry_run'],
+            prune=options['prune'],
+            ingestor=ingestor,
+            log=self.stdout.write if options['verbosity'] > 1 else None,
+        )
+        try:
+            stats = importer.run(read_rows(path, file_format))
+        except (ValueError, UnicodeDecodeError) as exc:
+            raise CommandError(f"Faylni o'qib bo'lmadi: {exc}")
+        finally:
+            if ingestor is not None:
+                ingestor.close()
+            if not options['dry_run'] and importer.stats['rows']:
+                # bulk_create signallarni chaqirmaydi
+                catalog_bulk_changed()
+                bump_versions(ProductImage, ProductSpecification)
+
+        for title, messages, style in (
+            ("Xatolar", importer.errors, self.style.ERROR),
+            ("Ogohlantirishlar", importer.warnings, self.style.WARNING),
+        ):
+            if messages:
+                self.stderr.write(style(f"{title} ({len(messages)}):"))
+                for number, message in messages[:MAX_REPORTED_ERRORS]:
+                    self.stderr.write(f"  {number}-qator: {message}")
+
+        rate = stats['rows'] / stats['elapsed'] if stats['elapsed'] else 0
+        summary = (
+            f"{stats['rows']} qator ({rate:.0f} qator/s, {stats['elapsed']:.1f} s): "
+            f"{stats['created']} ta yangi, {stats['updated']} ta yangilangan, {stats['errors']} ta xato; "
+            f"kategoriyalar: {stats['categories']}, xususiyatlar: {stats['specifications']}, "
+            f"yangi rasmlar: {stats['images']}"
+        )
+        if options['dry_run']:
+            summary = "[dry-run] " + summary
+        self.stdout.write(self.style.SUCCESS(summary) if not stats['errors'] else self.style.WARNING(summary))
@@ -0,0 +1,27 @@
+from django.db import migrations, models
+import products.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0008_image_placeholders'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='category',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=products.storage.CatalogImageStorage(), upload_to='categories/', verbose_name='Rasm'),
+        ),
+        migrations.AlterField(
+            model_name='product',
+            name='main_image',
+            field=models.ImageField(default='products/default.jpg', storage=products.storage.CatalogImageStorage(), upload_to='products/', verbose_name='Asosiy rasm'),
+        ),
+        migrations.AlterField(
+            model_name='productimage',
+            name='image',
+            field=models.ImageField(storage=products.storage.CatalogImageStorage(), upload_to='products/gallery/', verbose_name='Rasm'),
+        ),
+    ]
@@ -1,7 +1,30 @@
 from django.db import models
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 from django.utils.translation import gettext_lazy as _
 from django.core.validators import MinValueValidator, MaxValueValidator
 
+from .storage import catalog_image_storage
+
+
+class CategoryQuerySet(models.QuerySet):
+    def with_products_count(self):
+        """Faol mahsulotlar sonini bitta GROUP BY so'rovi bilan qo'shish"""
+        return self.annotate(
+            active_products_count=Count('products', filter=Q(products__is_active=True))
+        )
+
+
+def active_products_count(category_ref):
+    """Mahsulot qatorlari uchun: category_ref kategoriyasidagi faol mahsulotlar soni (subquery)"""
+    return Coalesce(
+        Subquery(
+            Product.objects.filter(category=OuterRef(category_ref), is_active=True)
+            .order_by().values('category').annotate(count=Count('pk')).values('count')
+        ),
+        0
+    )
+
 
 class Category(models.Model):
     name = models.CharField(max_length=100, verbose_name=_("Nomi"))
@@ -9,10 +32,17 @@ class Category(models.Model):
     description = models.TextField(blank=True, verbose_name=_("Tavsif"))
     image = models.ImageField(
         upload_to='categories/',
+        storage=catalog_image_storage,
         blank=True,
         null=True,
         verbose_name=_("Rasm")
     )
+    image_variants = models.JSONField(default=dict, blank=True, editable=False, verbose_name=_("Rasm variantlari"))
+    # width_field/height_field ishlatilmaydi: ular bo'sh bo'lsa har bir
+    # obyekt yaratilganda faylni ochadi (products/images.py to'ldiradi)
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name=_("Rasm eni"))
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name=_("Rasm bo'yi"))
+    image_placeholder = models.TextField(blank=True, editable=False, verbose_name=_("Rasm placeholder"))
     is_active = models.BooleanField(default=True, verbose_name=_("Faol"))
     sort_order = models.PositiveIntegerField(
         default=0,
@@ -21,6 +51,8 @@ class Category(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Yaratilgan"))
     updated_at = models.DateTimeField(auto_now=True, verbose_name=_("O'zgartirilgan"))
 
+    objects = CategoryQuerySet.as_manager()
+
     class Meta:
         verbose_name = _("Kategoriya")
         verbose_name_plural = _("Kategoriyalar")
@@ -31,6 +63,9 @@ class Category(models.Model):
 
     @property
     def products_count(self):
+        # with_products_count() orqali olingan bo'lsa, qo'shimcha so'rov yo'q
+        if hasattr(self, 'active_products_count'):
+            return self.active_products_count
         return self.products.filter(is_active=True).count()
 
 
@@ -65,12 +100,26 @@ class Product(models.Model):
     )
     main_image = models.ImageField(
         upload_to='products/',
+        storage=catalog_image_storage,
         default='products/default.jpg',   # agar asosiy rasm tanlanmasa
         verbose_name=_("Asosiy rasm")
     )
+    main_image_variants = models.JSONField(
+        default=dict, blank=True, editable=False, verbose_name=_("Asosiy rasm variantlari")
+    )
+    main_image_width = models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name=_("Asosiy rasm eni"))
+    main_image_height = models.PositiveIntegerField(
+        null=True, blank=True, editable=False, verbose_name=_("Asosiy rasm bo'yi")
+    )
+    main_image_placeholder = models.TextField(blank=True, editable=False, verbose_name=_("Asosiy rasm placeholder"))
     is_active = models.BooleanField(default=True, verbose_name=_("Faol"))
     is_featured = models.BooleanField(default=False, verbose_name=_("Tanlanganlar"))
     views_count = models.PositiveIntegerField(default=0, verbose_name=_("Ko'rishlar soni"))
+    reviews_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name=_("Sharhlar soni")
+    )
     rating = models.DecimalField(
         max_digits=3,
         decimal_places=2,
@@ -78,9 +127,28 @@ class Product(models.Model):
         validators=[MinValueValidator(0), MaxValueValidator(5)],
         verbose_name=_("Reyting")
     )
+    # Faol sharhlar baholari yig'indisi: rating = rating_sum / reviews_count
+    rating_sum = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name=_("Baholar yig'indisi")
+    )
+    # Faol sharhlar soni har bir baho bo'yicha (1-5 yulduz)
+    rating_1_count = models.PositiveIntegerField(default=0, editable=False, verbose_name=_("1 yulduzli sharhlar"))
+    rating_2_count = models.PositiveIntegerField(default=0, editable=False, verbose_name=_("2 yulduzli sharhlar"))
+    rating_3_count = models.PositiveIntegerField(default=0, editable=False, verbose_name=_("3 yulduzli sharhlar"))
+    rating_4_count = models.PositiveIntegerField(default=0, editable=False, verbose_name=_("4 yulduzli sharhlar"))
+    rating_5_count = models.PositiveIntegerField(default=0, editable=False, verbose_name=_("5 yulduzli sharhlar"))
     created_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Yaratilgan"))
     updated_at = models.DateTimeField(auto_now=True, verbose_name=_("O'zgartirilgan"))
 
+    RATING_LEVELS = (1, 2, 3, 4, 5)
+    RATING_COUNT_FIELDS = tuple(f'rating_{rating}_count' for rating in RATING_LEVELS)
+
+    # Faqat F() bilan yangilanadigan hisoblagichlar - to'liq save() ularni
+    # eski qiymat bilan ustidan yozib yubormasligi kerak
+    COUNTER_FIELDS = ('views_count', 'reviews_count', 'rating_sum', 'rating', *RATING_COUNT_FIELDS)
+
     class Meta:
         verbose_name = _("Mahsulot")
         verbose_name_plural = _("Mahsulotlar")
@@ -89,16 +157,24 @@ class Product(models.Model):
     def __str__(self):
         return self.name
 
+    @staticmethod
+    def rating_count_field(rating):
+        return f'rating_{rating}_count'
+
+    @property
+    def rating_breakdown(self):
+        """[{'rating': 5, 'count': n}, ..., {'rating': 1, 'count': n}] - bo'sh darajalar ham"""
+        return [
+            {'rating': rating, 'count': getattr(self, self.rating_count_field(rating))}
+            for rating in reversed(self.RATING_LEVELS)
+        ]
+
     @property
     def discount_percentage(self):
         if self.old_price and self.old_price > self.price:
             return round(((self.old_price - self.price) / self.old_price) * 100)
         return 0
 
-    @property
-    def reviews_count(self):
-        return self.reviews.filter(is_active=True).count()
-
     @property
     def gallery_images(self):
         """Asosiy rasmdan tashqari qo‘shimcha rasmlar"""
@@ -109,6 +185,11 @@ class Product(models.Model):
             from django.utils.text import slugify
             import uuid
             self.slug = slugify(self.name) + '-' + str(uuid.uuid4())[:8]
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
         super().save(*args, **kwargs)
 
 
@@ -121,8 +202,13 @@ class ProductImage(models.Model):
     )
     image = models.ImageField(
         upload_to='products/gallery/',
+        storage=catalog_image_storage,
         verbose_name=_("Rasm")
     )
+    image_variants = models.JSONField(default=dict, blank=True, editable=False, verbose_name=_("Rasm variantlari"))
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name=_("Rasm eni"))
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name=_("Rasm bo'yi"))
+    image_placeholder = models.TextField(blank=True, editable=False, verbose_name=_("Rasm placeholder"))
     alt_text = models.CharField(
         max_length=200,
         blank=True,
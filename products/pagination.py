@@ -0,0 +1,161 @@
+"""Sahifalash: odatiy sahifa raqami yoki so'rov bo'yicha keyset (cursor)
+
+?pagination=cursor (yoki ?cursor=...) berilsa COUNT(*) va OFFSET ishlatilmaydi:
+keyingi sahifa (tartiblash maydoni, id) juftligidan keyin keladigan qatorlar
+sifatida olinadi. Bu cheksiz aylantiriladigan (infinite scroll) ro'yxatlar uchun.
+"""
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+# Keyset sahifalash qo'llab-quvvatlanadigan tartiblash maydonlari
+KEYSET_ORDERING_FIELDS = ('price', 'created_at', 'rating', 'views_count')
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _row_value(row, name):
+    # Proyeksiyali ro'yxatlarda qatorlar dict (values()) bo'ladi
+    return row[name] if isinstance(row, dict) else getattr(row, name)
+
+
+class KeysetPagination(BasePagination):
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering_fields = KEYSET_ORDERING_FIELDS
+    invalid_cursor_message = 'Noto\'g\'ri cursor'
+
+    def __init__(self, page_size):
+        self.page_size = page_size
+
+    def get_keyset_ordering(self, queryset):
+        """('-created_at', '-id') kabi juftlik yoki None (keyset imkonsiz)"""
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        if not ordering:
+            ordering = ['-pk']
+        field = ordering[0]
+        if not isinstance(field, str):
+            return None
+
+        name = field.lstrip('-')
+        tie_breaker = '-id' if field.startswith('-') else 'id'
+        if name in ('id', 'pk'):
+            return (tie_breaker,)
+        if name not in self.ordering_fields:
+            return None
+        if ordering[1:] and ordering[1:] != [tie_breaker]:
+            # Ikkinchi tartiblash maydoni boshqa - keyset natijasi farq qiladi
+            return None
+        return (field, tie_breaker)
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            return json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, position):
+        data = json.dumps(position, separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+    def _after(self, ordering, position):
+        """Cursor pozitsiyasidan keyin keladigan qatorlar sharti"""
+        if len(ordering) == 1:
+            lookup = 'lt' if ordering[0].startswith('-') else 'gt'
+            return Q(**{f'id__{lookup}': position[-1]})
+
+        field, tie_breaker = ordering
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        id_lookup = 'lt' if tie_breaker.startswith('-') else 'gt'
+        value, last_id = position
+        return Q(**{f'{name}__{lookup}': value}) | Q(**{name: value, f'id__{id_lookup}': last_id})
+
+    def paginate_queryset(self, queryset, request, view=None, ordering=None):
+        self.request = request
+        ordering = ordering or self.get_keyset_ordering(queryset)
+        page_size = self.get_page_size(request)
+
+        position = self.decode_cursor(request)
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            if not isinstance(position, list) or len(position) != len(ordering):
+                raise NotFound(self.invalid_cursor_message)
+            queryset = queryset.filter(self._after(ordering, position))
+
+        rows = list(queryset[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        rows = rows[:page_size]
+
+        self.next_position = None
+        if self.has_next and rows:
+            last = rows[-1]
+            self.next_position = [
+                _encode_value(_row_value(last, field.lstrip('-'))) for field in ordering
+            ]
+        return rows
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+
+class CatalogPagination(PageNumberPagination):
+    """Odatiy PageNumberPagination; ?pagination=cursor bilan keyset rejimi"""
+    mode_query_param = 'pagination'
+    keyset_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.wants_keyset(request):
+            keyset = self.keyset_class(self.page_size)
+            ordering = keyset.get_keyset_ordering(queryset)
+            if ordering is not None:
+                self.keyset = keyset
+                return keyset.paginate_queryset(queryset, request, view, ordering=ordering)
+        # Keyset imkonsiz (masalan, qidiruv mosligi bo'yicha tartib) - oddiy sahifalash
+        return super().paginate_queryset(queryset, request, view)
+
+    def wants_keyset(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or KeysetPagination.cursor_query_param in request.query_params
+        )
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
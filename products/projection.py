@@ -0,0 +1,202 @@
+"""Faqat o'qiladigan ro'yxatlar uchun ustunlar proyeksiyasi
+
+Ro'yxat serializerlari (ProductListSerializer va h.k.) uchun to'liq model
+obyektlari o'rniga faqat serializer chiqaradigan ustunlar values() bilan
+olinadi: tarjima maydonlaridan faqat joriy til va uning fallback tillari,
+description_* kabi katta TEXT ustunlarsiz. Chegirma foizi va kategoriyadagi
+mahsulotlar soni SQL'da hisoblanadi.
+
+Qiymatlar serializer maydonlarining o'z to_representation() metodlaridan
+o'tkaziladi, tarjima fallback'i modeltranslation deskriptori orqali
+aniqlanadi - natija oddiy serializer chiqaradigan javob bilan bir xil.
+Serializerda proyeksiya qilib bo'lmaydigan maydon bo'lsa build() None
+qaytaradi va view oddiy yo'lga o'tadi.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.db.models import Case, F, Q, Value, When
+from django.db.models.fields.files import FieldFile
+from django.db.models.functions import Cast, Mod, Round
+from django.db.models.lookups import Exact, GreaterThan
+from modeltranslation.translator import NotRegistered, translator
+from modeltranslation.utils import build_localized_fieldname, get_language, resolution_order
+from rest_framework.response import Response
+from rest_framework.serializers import BaseSerializer, ModelSerializer
+
+from .models import Category, Product, active_products_count
+from .pagination import KEYSET_ORDERING_FIELDS
+from .renderers import LIST_RENDERER_CLASSES
+
+ANNOTATION_PREFIX = 'projected_'
+
+
+def _cents(field):
+    return Cast(Round(F(field) * 100), models.BigIntegerField())
+
+
+def discount_percentage_expression(prefix=''):
+    """Product.discount_percentage ning SQL ekvivalenti
+
+    round(((old_price - price) / old_price) * 100) - Python Decimal'ni juftga
+    yaxlitlaydi (ROUND_HALF_EVEN), shuning uchun butun sonli tiyinlarda:
+    q = 100 * (old - price) // old, qoldiq yarmidan katta bo'lsa yoki aynan
+    yarmi bo'lib q toq bo'lsa +1.
+    """
+    old, price = _cents(f'{prefix}old_price'), _cents(f'{prefix}price')
+    scaled = (old - price) * 100
+    quotient = Cast(scaled / old, models.BigIntegerField())
+    double_remainder = (scaled - quotient * old) * 2
+    round_up = GreaterThan(double_remainder, old) | (
+        Exact(double_remainder, old) & Exact(Mod(quotient, 2), 1)
+    )
+    return Case(
+        When(
+            Q(**{f'{prefix}old_price__gt': F(f'{prefix}price')}),
+            then=quotient + Case(When(round_up, then=Value(1)), default=Value(0))
+        ),
+        default=Value(0),
+        output_field=models.IntegerField()
+    )
+
+
+# Model xossalari (property) uchun SQL ifodalari: (model, xossa) -> ifoda(bog'lanish prefiksi)
+PROPERTY_EXPRESSIONS = {
+    (Product, 'discount_percentage'): discount_percentage_expression,
+    (Category, 'products_count'): lambda prefix: active_products_count(f'{prefix}pk'),
+}
+
+
+class ProjectionUnsupported(Exception):
+    pass
+
+
+def _translated_fields(model):
+    try:
+        return set(translator.get_options_for_model(model).fields)
+    except NotRegistered:
+        return set()
+
+
+class ListProjection:
+    def __init__(self, serializer, prefix=''):
+        self.model = serializer.Meta.model
+        self.prefix = prefix
+        self.columns = set()
+        self.annotations = {}
+        self.translated = _translated_fields(self.model)
+        self._instance = None
+        self.readers = [
+            (field.field_name, field, *self._reader(field))
+            for field in serializer._readable_fields
+        ]
+
+    @classmethod
+    def build(cls, serializer_class, context=None):
+        """Serializer uchun proyeksiya yoki None (qo'llab-quvvatlanmaydi)"""
+        serializer = serializer_class(context=context or {})
+        if not isinstance(serializer, ModelSerializer):
+            return None
+        try:
+            return cls(serializer)
+        except ProjectionUnsupported:
+            return None
+
+    def _column(self, name):
+        column = f'{self.prefix}{name}'
+        self.columns.add(column)
+        return column
+
+    def _reader(self, field):
+        """(qatordan qiymat o'qiydigan funksiya, tayyor ko'rinishmi) juftligi"""
+        source = field.source
+        if source == '*' or '.' in source:
+            raise ProjectionUnsupported(source)
+
+        if isinstance(field, BaseSerializer):
+            if not isinstance(field, ModelSerializer) or self.prefix:
+                raise ProjectionUnsupported(source)
+            nested = ListProjection(field, prefix=f'{source}__')
+            self.columns |= nested.columns
+            self.annotations.update(nested.annotations)
+            pk_column = self._column(f'{source}__pk')
+            return (lambda row: None if row[pk_column] is None else nested.render_row(row)), True
+
+        expression = PROPERTY_EXPRESSIONS.get((self.model, source))
+        if expression is not None:
+            # Annotatsiya nomi model xossasi bilan to'qnashmasligi kerak
+            annotation = f"{ANNOTATION_PREFIX}{self.prefix.replace('__', '_')}{source}"
+            self.annotations[annotation] = expression(self.prefix)
+            return (lambda row: row[annotation]), False
+
+        try:
+            model_field = self.model._meta.get_field(source)
+        except FieldDoesNotExist:
+            raise ProjectionUnsupported(source)
+        if model_field.is_relation or not model_field.concrete:
+            raise ProjectionUnsupported(source)
+
+        if source in self.translated:
+            return self._translated_reader(source), False
+
+        column = self._column(model_field.attname)
+        if isinstance(model_field, models.FileField):
+            return (lambda row: FieldFile(None, model_field, row[column])), False
+        return (lambda row: row[column]), False
+
+    def _translated_reader(self, name):
+        """Tarjima maydoni: joriy til + fallback tillari ustunlari, qiymat deskriptor orqali"""
+        descriptor = self.model.__dict__[name]
+        languages = resolution_order(get_language(), getattr(descriptor, 'fallback_languages', None))
+        columns = [
+            (build_localized_fieldname(name, language), self._column(build_localized_fieldname(name, language)))
+            for language in languages
+        ]
+
+        def read(row):
+            instance = self.get_instance()
+            for attname, column in columns:
+                instance.__dict__[attname] = row[column]
+            return descriptor.__get__(instance, self.model)
+        return read
+
+    def get_instance(self):
+        # Deskriptor uchun bitta yordamchi obyekt (bazaga murojaat qilmaydi)
+        if self._instance is None:
+            self._instance = self.model()
+        return self._instance
+
+    def values(self, queryset, extra=()):
+        if self.annotations:
+            queryset = queryset.annotate(**self.annotations)
+        return queryset.values(*sorted(self.columns | set(extra)), *self.annotations)
+
+    def render_row(self, row):
+        data = {}
+        for name, field, read, rendered in self.readers:
+            value = read(row)
+            if value is None or rendered:
+                data[name] = value
+            else:
+                data[name] = field.to_representation(value)
+        return data
+
+    def render(self, rows):
+        return [self.render_row(row) for row in rows]
+
+
+class ProjectedListMixin:
+    """ListAPIView uchun proyeksiyali list(); filtrlar va sahifalash o'zgarmaydi"""
+    renderer_classes = LIST_RENDERER_CLASSES
+    # Keyset cursor pozitsiyasi uchun kerak bo'ladigan qo'shimcha ustunlar
+    projection_extra = ('id', *KEYSET_ORDERING_FIELDS)
+
+    def list(self, request, *args, **kwargs):
+        projection = ListProjection.build(self.get_serializer_class(), self.get_serializer_context())
+        if projection is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = projection.values(self.filter_queryset(self.get_queryset()), self.projection_extra)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(projection.render(page))
+        return Response(projection.render(queryset))
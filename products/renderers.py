@@ -0,0 +1,32 @@
+"""Tezkor JSON renderer (orjson)
+
+JSONRenderer bilan bir xil baytlar: ixcham ajratuvchilar, ensure_ascii=False,
+U+2028/U+2029 escape qilinadi. Float qiymatlar Python'dagidan boshqacha
+formatlanishi mumkin, shuning uchun faqat floatsiz javoblar (ro'yxatlar)
+uchun ishlatiladi. orjson o'rnatilmagan yoki qiymatni kodlay olmasa
+odatiy JSONRenderer ishlaydi.
+"""
+from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None or data is None or not self.compact or self.ensure_ascii
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default)
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+
+
+LIST_RENDERER_CLASSES = [FastJSONRenderer, BrowsableAPIRenderer]
@@ -0,0 +1,150 @@
+"""Katalog endpointlari uchun javob keshi (versiyali invalidatsiya bilan)
+
+Har bir model uchun keshda versiya kaliti saqlanadi. Kesh kaliti endpoint
+nomi, til, so'rov parametrlari va bog'liq modellar versiyalaridan tuziladi.
+Model o'zgarganda (post_save/post_delete yoki queryset.update() dan keyin
+bump_versions()) versiya oshadi va eski javoblar o'z-o'zidan ishlatilmay qoladi.
+
+Javob bilan birga uning ETag'i ham keshlanadi: kesh topilganda validator
+so'rovlari bajarilmaydi, If-None-Match esa saqlangan ETag bilan tekshiriladi.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import translation
+from django.utils.cache import get_conditional_response
+from rest_framework.response import Response
+
+VERSION_KEY = 'catalog_version:{}'
+# {'data': ..., 'etag': ...} - oldingi (faqat data) formatdan farqlash uchun v2
+RESPONSE_KEY = 'catalog_response:v2:{}:{}'
+
+DEFAULT_TIMEOUT = getattr(settings, 'CATALOG_CACHE_TIMEOUT', 60 * 60)
+
+
+def _version_key(model):
+    return VERSION_KEY.format(model._meta.label_lower)
+
+
+def _bump(models):
+    for model in models:
+        try:
+            cache.incr(_version_key(model))
+        except ValueError:
+            # Kalit yo'q - get_versions() keyingi so'rovda yangisini yaratadi
+            pass
+
+
+def bump_versions(*models):
+    """Modellarga bog'liq barcha keshlangan javoblarni eskirtirish
+
+    Tranzaksiya ichida chaqirilsa, commit'dan keyin bajariladi - aks holda
+    parallel so'rov eski ma'lumotni yangi versiya bilan keshlab qo'yishi mumkin.
+    """
+    transaction.on_commit(lambda: _bump(models))
+
+
+def get_versions(models):
+    keys = [_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # Kalit keshdan chiqib ketgan bo'lsa eski javoblar bilan to'qnashmasligi
+            # uchun 0 emas, vaqtga asoslangan boshlang'ich qiymat
+            cache.add(key, int(time.time() * 1000), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def response_cache_key(name, request, models, extra=()):
+    query = sorted(
+        (key, value)
+        for key, values in request.query_params.lists()
+        for value in values
+    )
+    parts = [
+        request.build_absolute_uri('/'),
+        translation.get_language() or '',
+        getattr(request, 'accepted_media_type', ''),
+        repr(query),
+        repr(extra),
+        repr(get_versions(models)),
+    ]
+    digest = hashlib.md5('|'.join(parts).encode('utf-8')).hexdigest()
+    return RESPONSE_KEY.format(name, digest)
+
+
+def get_or_set_data(name, request, models, compute, timeout=None, extra=()):
+    """Keshdagi serializatsiya qilingan ma'lumot yoki compute() natijasi"""
+    key = response_cache_key(name, request, models, extra)
+    data = cache.get(key)
+    if data is None:
+        data = compute()
+        cache.set(key, data, DEFAULT_TIMEOUT if timeout is None else timeout)
+    return data
+
+
+def get_or_set_response(name, request, models, compute, timeout=None, extra=()):
+    """Keshdagi javob ma'lumotlarini qaytarish yoki compute() bilan hisoblash"""
+    if request.method != 'GET':
+        return compute()
+
+    key = response_cache_key(name, request, models, extra)
+    cached = cache.get(key)
+    if cached is not None:
+        etag = cached['etag']
+        if etag:
+            not_modified = get_conditional_response(request, etag=etag)
+            if not_modified is not None:
+                return not_modified
+        response = Response(cached['data'])
+        if etag:
+            response['ETag'] = etag
+        return response
+
+    response = compute()
+    if response.status_code == 200:
+        cache.set(
+            key, {'data': response.data, 'etag': response.get('ETag')},
+            DEFAULT_TIMEOUT if timeout is None else timeout
+        )
+    return response
+
+
+def cache_response(*models, timeout=None):
+    """@api_view funksiyalari uchun dekorator (api_view'dan keyin qo'yiladi)"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(request, *args, **kwargs):
+            return get_or_set_response(
+                func.__name__, request, models,
+                lambda: func(request, *args, **kwargs),
+                timeout=timeout, extra=(args, sorted(kwargs.items()))
+            )
+        return wrapper
+    return decorator
+
+
+class CachedResponseMixin:
+    """ListAPIView/RetrieveAPIView uchun javob keshi
+
+    ConditionalGetMixin'dan oldin qo'yiladi - kesh topilsa validator so'rovlari
+    bajarilmaydi, ETag keshdan olinadi.
+    """
+    cache_models = ()
+    cache_timeout = None
+
+    def get(self, request, *args, **kwargs):
+        return get_or_set_response(
+            type(self).__name__, request, self.cache_models,
+            lambda: super(CachedResponseMixin, self).get(request, *args, **kwargs),
+            timeout=self.cache_timeout, extra=sorted(kwargs.items())
+        )
+
+
+def model_changed(sender, **kwargs):
+    bump_versions(sender)
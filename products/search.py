@@ -0,0 +1,244 @@
+"""Mahsulotlar uchun ma'lumotlar bazasining to'liq matnli qidiruvi
+
+Postgres: uz/en/ru ustunlaridan yig'iladigan generated tsvector ustuni + GIN indeks.
+SQLite (development): FTS5 shadow jadvali, triggerlar orqali sinxronlanadi.
+Ikkala holatda ham indeks bazaning o'zi tomonidan yangilanadi, shuning uchun
+save() ham, queryset.update() ham uni eskirtirmaydi.
+"""
+import re
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+from rest_framework.settings import api_settings
+
+SEARCH_LANGUAGES = tuple(settings.MODELTRANSLATION_LANGUAGES)
+
+# (ustun, og'irlik) - og'irlik Postgres setweight() va SQLite bm25() uchun
+SEARCH_COLUMNS = (
+    ('name', 'A'),
+    ('short_description', 'B'),
+    ('description', 'C'),
+)
+
+# Postgres text search konfiguratsiyalari (o'zbek tili uchun stemmer yo'q)
+PG_SEARCH_CONFIGS = {
+    'uz': 'simple',
+    'en': 'english',
+    'ru': 'russian',
+}
+
+BM25_WEIGHTS = {'A': 10.0, 'B': 4.0, 'C': 1.0}
+
+PRODUCT_TABLE = 'products_product'
+SEARCH_VECTOR_COLUMN = 'search_vector'
+SEARCH_INDEX_NAME = 'products_product_search_idx'
+FTS_TABLE = 'products_product_fts'
+
+_fts_available = {}
+
+
+def _search_columns():
+    return [
+        (f'{column}_{language}', weight, language)
+        for column, weight in SEARCH_COLUMNS
+        for language in SEARCH_LANGUAGES
+    ]
+
+
+def _pg_configs():
+    configs = []
+    for language in SEARCH_LANGUAGES:
+        config = PG_SEARCH_CONFIGS.get(language, 'simple')
+        if config not in configs:
+            configs.append(config)
+    return configs
+
+
+# ============ INDEKSNI O'RNATISH ============
+
+def _install_postgresql(cursor):
+    vector = ' || '.join(
+        f"setweight(to_tsvector('{PG_SEARCH_CONFIGS.get(language, 'simple')}', "
+        f"coalesce({column}, '')), '{weight}')"
+        for column, weight, language in _search_columns()
+    )
+    cursor.execute(
+        f'ALTER TABLE {PRODUCT_TABLE} ADD COLUMN IF NOT EXISTS {SEARCH_VECTOR_COLUMN} '
+        f'tsvector GENERATED ALWAYS AS ({vector}) STORED'
+    )
+    cursor.execute(
+        f'CREATE INDEX IF NOT EXISTS {SEARCH_INDEX_NAME} '
+        f'ON {PRODUCT_TABLE} USING GIN ({SEARCH_VECTOR_COLUMN})'
+    )
+
+
+def _install_sqlite(cursor):
+    columns = [column for column, _weight, _language in _search_columns()]
+    column_list = ', '.join(columns)
+    new_values = ', '.join(f'new.{column}' for column in columns)
+    old_values = ', '.join(f'old.{column}' for column in columns)
+
+    cursor.execute(
+        f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5('
+        f"{column_list}, content='{PRODUCT_TABLE}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2')"
+    )
+    cursor.execute(
+        f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {PRODUCT_TABLE} BEGIN '
+        f'INSERT INTO {FTS_TABLE}(rowid, {column_list}) VALUES (new.id, {new_values}); '
+        f'END'
+    )
+    cursor.execute(
+        f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {PRODUCT_TABLE} BEGIN '
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); "
+        f'END'
+    )
+    cursor.execute(
+        f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON {PRODUCT_TABLE} BEGIN '
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); "
+        f'INSERT INTO {FTS_TABLE}(rowid, {column_list}) VALUES (new.id, {new_values}); '
+        f'END'
+    )
+    # Jadval qayta yaratilgan (SQLite migratsiyalari) bo'lsa ham indeks to'g'ri bo'lsin
+    cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def install_search_index(connection):
+    """Qidiruv indeksini o'rnatish (idempotent)"""
+    _fts_available.pop(connection.alias, None)
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            _install_postgresql(cursor)
+        elif connection.vendor == 'sqlite':
+            _install_sqlite(cursor)
+
+
+def uninstall_search_index(connection):
+    _fts_available.pop(connection.alias, None)
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(f'DROP INDEX IF EXISTS {SEARCH_INDEX_NAME}')
+            cursor.execute(f'ALTER TABLE {PRODUCT_TABLE} DROP COLUMN IF EXISTS {SEARCH_VECTOR_COLUMN}')
+        elif connection.vendor == 'sqlite':
+            for suffix in ('ai', 'ad', 'au'):
+                cursor.execute(f'DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}')
+            cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+def is_search_index_available(using='default'):
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        return True
+    if connection.vendor != 'sqlite':
+        return False
+    if using not in _fts_available:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s",
+                [FTS_TABLE]
+            )
+            _fts_available[using] = cursor.fetchone() is not None
+    return _fts_available[using]
+
+
+# ============ QIDIRUV ============
+
+def search_terms(query):
+    """So'rovdan so'zlarni ajratish (tsquery/MATCH sintaksisidan tozalangan)"""
+    return re.findall(r'[^\W_]+', query.lower())
+
+
+def _postgresql_expressions(terms):
+    query_text = ' & '.join(f'{term}:*' for term in terms)
+    configs = _pg_configs()
+    tsquery = ' || '.join(f"to_tsquery('{config}', %s)" for config in configs)
+    params = [query_text] * len(configs)
+    vector = f'{PRODUCT_TABLE}.{SEARCH_VECTOR_COLUMN}'
+
+    match = RawSQL(f'{vector} @@ ({tsquery})', params, output_field=BooleanField())
+    rank = RawSQL(f'ts_rank({vector}, ({tsquery}))', params, output_field=FloatField())
+    return match, rank
+
+
+def _sqlite_expressions(terms):
+    match_text = ' '.join(f'"{term}"*' for term in terms)
+    weights = ', '.join(str(BM25_WEIGHTS[weight]) for _column, weight, _language in _search_columns())
+
+    match = RawSQL(
+        f'{PRODUCT_TABLE}.id IN (SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s)',
+        [match_text],
+        output_field=BooleanField()
+    )
+    # bm25() qanchalik manfiy bo'lsa, shunchalik mos - ishorasini almashtiramiz
+    rank = RawSQL(
+        f'COALESCE((SELECT -bm25({FTS_TABLE}, {weights}) FROM {FTS_TABLE} '
+        f'WHERE {FTS_TABLE} MATCH %s AND rowid = {PRODUCT_TABLE}.id), 0)',
+        [match_text],
+        output_field=FloatField()
+    )
+    return match, rank
+
+
+def search_products(queryset, query):
+    """Mahsulotlarni qidirish va search_rank bilan annotatsiya qilish"""
+    from .models import Category
+
+    terms = search_terms(query)
+    if not terms:
+        return queryset
+
+    if connections[queryset.db].vendor == 'postgresql':
+        match, rank = _postgresql_expressions(terms)
+    else:
+        match, rank = _sqlite_expressions(terms)
+
+    condition = Q(match)
+
+    # Kategoriya nomi bo'yicha moslik (kategoriyalar jadvali kichik)
+    category_ids = list(
+        Category.objects.filter(
+            reduce(or_, [Q(**{f'name_{language}__icontains': query}) for language in SEARCH_LANGUAGES])
+        ).values_list('pk', flat=True)
+    )
+    if category_ids:
+        condition |= Q(category_id__in=category_ids)
+
+    return queryset.filter(condition).annotate(search_rank=rank)
+
+
+def filter_by_search(queryset, query):
+    """Qidiruv indeksi bo'lsa u orqali, bo'lmasa icontains bilan filtrlash"""
+    if search_terms(query) and is_search_index_available(queryset.db):
+        return search_products(queryset, query)
+    return queryset.filter(
+        Q(name__icontains=query)
+        | Q(description__icontains=query)
+        | Q(short_description__icontains=query)
+        | Q(category__name__icontains=query)
+    )
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """To'liq matnli qidiruv; indeks mavjud bo'lmasa oddiy SearchFilter ishlaydi
+
+    OrderingFilter'dan keyin qo'yilishi kerak: ordering parametri berilmagan
+    bo'lsa natijalar mosligi bo'yicha saralanadi.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+
+        if not search_terms(query) or not is_search_index_available(queryset.db):
+            return super().filter_queryset(request, queryset, view)
+
+        queryset = search_products(queryset, query)
+        if not request.query_params.get(api_settings.ORDERING_PARAM):
+            queryset = queryset.order_by('-search_rank', *queryset.query.order_by)
+        return queryset
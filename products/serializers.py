@@ -1,7 +1,24 @@
+from django.core.files.storage import default_storage
 from rest_framework import serializers
 from .models import Category, Product, ProductImage, ProductSpecification
 
 
+class ImageVariantsField(serializers.ReadOnlyField):
+    """{'webp': [{'width': 320, 'url': ...}, ...], 'jpeg': [...]} - srcset uchun"""
+
+    def to_representation(self, value):
+        request = self.context.get('request')
+        data = {}
+        for image_format, names in (value or {}).items():
+            data[image_format] = []
+            for width, name in sorted(names.items(), key=lambda item: int(item[0])):
+                url = default_storage.url(name)
+                if request is not None:
+                    url = request.build_absolute_uri(url)
+                data[image_format].append({'width': int(width), 'url': url})
+        return data
+
+
 class CategorySerializer(serializers.ModelSerializer):
     products_count = serializers.ReadOnlyField()
 
@@ -15,6 +32,22 @@ class CategorySerializer(serializers.ModelSerializer):
 
 class CategoryListSerializer(serializers.ModelSerializer):
     products_count = serializers.ReadOnlyField()
+    image_variants = ImageVariantsField()
+
+    class Meta:
+        model = Category
+        fields = [
+            'id', 'name', 'slug', 'image', 'image_variants', 'image_width', 'image_height',
+            'image_placeholder', 'products_count'
+        ]
+
+
+class ProductCategorySerializer(serializers.ModelSerializer):
+    """Mahsulot ichidagi kategoriya
+
+    Ro'yxatlarda products_count proyeksiya subquery'sidan olinadi (projection.py).
+    """
+    products_count = serializers.ReadOnlyField()
 
     class Meta:
         model = Category
@@ -22,9 +55,13 @@ class CategoryListSerializer(serializers.ModelSerializer):
 
 
 class ProductImageSerializer(serializers.ModelSerializer):
+    image_variants = ImageVariantsField()
+
     class Meta:
         model = ProductImage
-        fields = ['id', 'image', 'alt_text']
+        fields = [
+            'id', 'image', 'image_variants', 'image_width', 'image_height', 'image_placeholder', 'alt_text'
+        ]
 
 
 class ProductSpecificationSerializer(serializers.ModelSerializer):
@@ -34,15 +71,17 @@ class ProductSpecificationSerializer(serializers.ModelSerializer):
 
 
 class ProductListSerializer(serializers.ModelSerializer):
-    category = CategoryListSerializer(read_only=True)
+    category = ProductCategorySerializer(read_only=True)
     discount_percentage = serializers.ReadOnlyField()
     main_image = serializers.ImageField(read_only=True)
+    main_image_variants = ImageVariantsField()
 
     class Meta:
         model = Product
         fields = [
             'id', 'name', 'slug', 'short_description', 'price',
-            'old_price', 'discount_percentage', 'main_image',
+            'old_price', 'discount_percentage', 'main_image', 'main_image_variants',
+            'main_image_width', 'main_image_height', 'main_image_placeholder',
             'category', 'rating', 'reviews_count', 'is_featured'
         ]
 
@@ -53,19 +92,21 @@ class ProductDetailSerializer(serializers.ModelSerializer):
     specifications = ProductSpecificationSerializer(many=True, read_only=True)
     discount_percentage = serializers.ReadOnlyField()
     reviews_count = serializers.ReadOnlyField()
+    main_image_variants = ImageVariantsField()
 
     class Meta:
         model = Product
         fields = [
             'id', 'name', 'slug', 'description', 'short_description',
-            'price', 'old_price', 'discount_percentage', 'main_image',
+            'price', 'old_price', 'discount_percentage', 'main_image', 'main_image_variants',
+            'main_image_width', 'main_image_height', 'main_image_placeholder',
             'category', 'images', 'specifications', 'rating',
             'reviews_count', 'views_count', 'is_featured', 'created_at'
         ]
 
 
 class ProductSearchSerializer(serializers.ModelSerializer):
-    category = CategoryListSerializer(read_only=True)
+    category = ProductCategorySerializer(read_only=True)
     discount_percentage = serializers.ReadOnlyField()
 
     class Meta:
@@ -0,0 +1,11 @@
+from .autocomplete import autocomplete_index
+from .fuzzy_search import product_index
+from .models import Category, Product
+from .response_cache import bump_versions
+
+
+def catalog_bulk_changed():
+    """queryset.update() kabi signalsiz o'zgarishlardan keyin chaqiriladi"""
+    product_index.mark_stale()
+    autocomplete_index.mark_stale()
+    bump_versions(Product, Category)
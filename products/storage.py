@@ -0,0 +1,121 @@
+"""Katalog rasmlari uchun tarkib bo'yicha manzillanadigan (content-addressed) storage
+
+Yuklangan fayl nomi uning SHA-256 xeshidan olinadi:
+
+    products/IMG_2031.JPG -> products/3f1c...e9a0.jpg
+
+shuning uchun bir xil rasm bir necha mahsulotga yuklansa ham diskda bitta
+fayl bo'ladi. Fayl yozishdan oldin normallashtiriladi: IMAGE_MAX_DIMENSION
+dan katta rasm kichraytiriladi, EXIF / XMP olib tashlanadi (orientatsiya
+piksellarga qo'llanadi). Kichik va metama'lumotsiz rasmlar qayta
+kodlanmaydi - asl baytlar yoziladi.
+
+Fayllar ulashilgani uchun obyekt o'chirilganda fayl o'chirilmaydi; keraksiz
+fayllarni collect_media_orphans buyrug'i yig'adi. Mavjud faylga qayta
+murojaat bo'lganda uning mtime yangilanadi - buyruqning --min-age himoyasi
+hali commit qilinmagan yangi havolalarni ham qamraydi.
+"""
+import hashlib
+import io
+import os
+import posixpath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+IMAGE_MAX_DIMENSION = getattr(settings, 'IMAGE_MAX_DIMENSION', 2560)
+IMAGE_UPLOAD_QUALITY = getattr(settings, 'IMAGE_UPLOAD_QUALITY', 90)
+
+# Qayta kodlanadigan formatlar -> fayl kengaytmasi (GIF va boshqalar o'zgarishsiz)
+NORMALIZED_FORMATS = {'JPEG': 'jpg', 'PNG': 'png', 'WEBP': 'webp'}
+IMAGE_EXTENSIONS = {**NORMALIZED_FORMATS, 'GIF': 'gif'}
+
+# Bular bo'lsa rasm qayta kodlanadi (EXIF, XMP, izohlar)
+METADATA_KEYS = ('exif', 'xmp', 'XML:com.adobe.xmp', 'comment', 'photoshop')
+
+HASH_LENGTH = 32
+
+
+def content_hash(content):
+    digest = hashlib.sha256()
+    content.seek(0)
+    for chunk in content.chunks():
+        digest.update(chunk)
+    content.seek(0)
+    return digest.hexdigest()[:HASH_LENGTH]
+
+
+def _encode(image, image_format):
+    options = {}
+    if image.info.get('icc_profile'):
+        options['icc_profile'] = image.info['icc_profile']
+    if image_format == 'JPEG':
+        options.update(quality=IMAGE_UPLOAD_QUALITY, optimize=True, progressive=True)
+    elif image_format == 'WEBP':
+        options.update(quality=IMAGE_UPLOAD_QUALITY, method=4)
+    else:
+        options.update(optimize=True)
+        if 'transparency' in image.info:
+            options['transparency'] = image.info['transparency']
+    buffer = io.BytesIO()
+    image.save(buffer, image_format, **options)
+    return buffer.getvalue()
+
+
+def normalize_image(content):
+    """(yoziladigan fayl, kengaytma) - kichraytirilgan va metama'lumotsiz
+
+    Rasm bo'lmasa yoki o'zgartirish kerak bo'lmasa asl fayl qaytadi,
+    kengaytma esa aniqlanmasa None.
+    """
+    from PIL import Image, ImageOps
+
+    try:
+        image = Image.open(content)
+        image_format = image.format
+    except Exception:
+        content.seek(0)
+        return content, None
+
+    extension = IMAGE_EXTENSIONS.get(image_format)
+    if image_format not in NORMALIZED_FORMATS or getattr(image, 'n_frames', 1) > 1:
+        content.seek(0)
+        return content, extension
+
+    too_large = max(image.size) > IMAGE_MAX_DIMENSION
+    has_metadata = bool(image.getexif()) or any(key in image.info for key in METADATA_KEYS)
+    if not (too_large or has_metadata):
+        content.seek(0)
+        return content, extension
+
+    if too_large:
+        # JPEG'ni dekodlashning o'zida kichraytirish (telefon rasmlari uchun)
+        image.draft(image.mode, (IMAGE_MAX_DIMENSION, IMAGE_MAX_DIMENSION))
+    image = ImageOps.exif_transpose(image)
+    image.thumbnail((IMAGE_MAX_DIMENSION, IMAGE_MAX_DIMENSION), Image.Resampling.LANCZOS)
+    return ContentFile(_encode(image, image_format)), extension
+
+
+@deconstructible
+class CatalogImageStorage(FileSystemStorage):
+    """MEDIA_ROOT'dagi FileSystemStorage: nom - tarkib xeshi, bir xil fayllar bitta"""
+
+    def _save(self, name, content):
+        directory, filename = posixpath.split(name)
+        digest = content_hash(content)
+        content, extension = normalize_image(content)
+        extension = extension or os.path.splitext(filename)[1].lstrip('.').lower()
+        name = posixpath.join(directory, f'{digest}.{extension}' if extension else digest)
+
+        if self.exists(name):
+            # Havola yangilandi - collect_media_orphans uni yangi fayl deb biladi
+            os.utime(self.path(name))
+            return name
+        # Bir vaqtda ikkita bir xil yuklashda ikkinchisi get_available_name()
+        # qo'shimchasi bilan yoziladi - ikki nusxa, lekin ikkalasi ham to'g'ri
+        return super()._save(name, content)
+
+
+catalog_image_storage = CatalogImageStorage()
@@ -0,0 +1,27 @@
+import logging
+
+from celery import shared_task
+from django.apps import apps
+
+from .view_counter import flush_views
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def flush_product_views():
+    """Keshdagi ko'rishlar sonini bazaga yozish"""
+    return flush_views()
+
+
+@shared_task
+def generate_image_variants(model_label, pk, field):
+    """Rasm uchun WebP / JPEG variantlari, o'lcham va placeholder'ni hisoblash"""
+    from .images import process_field
+
+    try:
+        return process_field(apps.get_model(model_label), pk, field)
+    except OSError:
+        # Fayl yo'q yoki rasm emas - qayta urinishdan foyda yo'q
+        logger.exception("%s #%s %s variantlarini yaratib bo'lmadi", model_label, pk, field)
+        return 0
@@ -1,3 +1,224 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import DatabaseError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .models import Category, Product
+from .view_counter import flush_views, pending_views, record_view
+
+
+def image_file(name='divan.png', color='red'):
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new('RGB', (8, 8), color).save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+class ImageProcessingQueueTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls.media_override = override_settings(MEDIA_ROOT=cls.media_root)
+        cls.media_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.media_override.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+        super().tearDownClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name='Divanlar', slug='divanlar')
+
+    def create_product(self, **kwargs):
+        return Product.objects.create(
+            category=self.category, name='Divan', slug='divan', description='Tavsif', price=1000, **kwargs
+        )
+
+    def test_save_succeeds_when_broker_is_down(self):
+        with mock.patch(
+            'products.tasks.generate_image_variants.delay', side_effect=ConnectionError('broker')
+        ) as delay, self.assertLogs('products.images', 'ERROR'):
+            with self.captureOnCommitCallbacks(execute=True):
+                product = self.create_product(main_image=image_file())
+
+        delay.assert_called_once_with('products.product', product.pk, 'main_image')
+        self.assertTrue(Product.objects.filter(pk=product.pk).exists())
+
+    def test_default_image_is_not_queued(self):
+        with mock.patch('products.tasks.generate_image_variants.delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                product = self.create_product()
+
+        self.assertEqual(product.main_image.name, Product._meta.get_field('main_image').get_default())
+        delay.assert_not_called()
+
+    def test_unchanged_image_is_not_queued(self):
+        product = self.create_product(main_image=image_file())
+
+        with mock.patch('products.tasks.generate_image_variants.delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                product.name = 'Yangi divan'
+                product.save()
+                product.main_image = image_file('boshqa.png', color='blue')
+                product.save(update_fields=['main_image'])
+
+        delay.assert_called_once_with('products.product', product.pk, 'main_image')
+
+
+class CachedConditionalListTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='Divanlar', slug='divanlar')
+        Product.objects.create(
+            category=category, name='Divan', slug='divan', description='Tavsif',
+            price=1000, is_featured=True
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cache_hit_serves_stored_etag_without_queries(self):
+        for name in ('products:category-list', 'products:featured-products'):
+            with self.subTest(name=name):
+                url = reverse(name)
+                first = self.client.get(url)
+                self.assertEqual(first.status_code, 200)
+                self.assertTrue(first.has_header('ETag'))
+
+                with self.assertNumQueries(0):
+                    cached = self.client.get(url)
+                    not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+
+                self.assertEqual(cached['ETag'], first['ETag'])
+                self.assertEqual(cached.json(), first.json())
+                self.assertEqual(not_modified.status_code, 304)
+
+    def test_change_invalidates_cached_etag(self):
+        url = reverse('products:category-list')
+        etag = self.client.get(url)['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name='Stollar', slug='stollar')
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+class ViewCounterFlushTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='Divanlar', slug='divanlar')
+        cls.products = [
+            Product.objects.create(
+                category=category, name=f'Divan {n}', slug=f'divan-{n}', description='Tavsif', price=1000
+            )
+            for n in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def views_count(self, product):
+        return Product.objects.values_list('views_count', flat=True).get(pk=product.pk)
+
+    def test_flush_writes_pending_views(self):
+        first, second, _third = self.products
+        for _ in range(3):
+            record_view(first.pk)
+        record_view(second.pk)
+
+        # Max(pk) + savepoint ichida bitta UPDATE - katalog aylanib chiqilmaydi
+        with self.assertNumQueries(4), self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(flush_views(), 4)
+
+        self.assertEqual(self.views_count(first), 3)
+        self.assertEqual(self.views_count(second), 1)
+        self.assertEqual(pending_views([first.pk, second.pk]), {})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(flush_views(), 0)
+
+    def test_views_recorded_before_commit_are_kept(self):
+        product = self.products[0]
+        record_view(product.pk)
+        record_view(product.pk)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.assertEqual(flush_views(), 2)
+        # UPDATE va commit orasida kelgan ko'rish; commit'gacha keshdan ayirilmaydi
+        record_view(product.pk)
+        self.assertEqual(pending_views([product.pk]), {product.pk: 3})
+        for callback in callbacks:
+            callback()
+
+        self.assertEqual(pending_views([product.pk]), {product.pk: 1})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(flush_views(), 1)
+        self.assertEqual(self.views_count(product), 3)
+
+    def test_failed_update_keeps_views_for_next_flush(self):
+        product = self.products[0]
+        record_view(product.pk)
+
+        with mock.patch('django.db.models.query.QuerySet.update', side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                flush_views()
+
+        self.assertEqual(pending_views([product.pk]), {product.pk: 1})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(flush_views(), 1)
+        self.assertEqual(self.views_count(product), 1)
+
+
+class ProductCategoryCountTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def create_category(self, n, active=2, inactive=1):
+        category = Category.objects.create(name=f'Kategoriya {n}', slug=f'kategoriya-{n}')
+        for m in range(active + inactive):
+            Product.objects.create(
+                category=category, name=f'Mahsulot {n}-{m}', slug=f'mahsulot-{n}-{m}',
+                description='Tavsif', price=1000, is_featured=True, is_active=m < active
+            )
+        return category
+
+    def get_rows(self, name):
+        response = self.client.get(reverse(name))
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        return data['results'] if isinstance(data, dict) else data
+
+    def test_nested_category_has_active_products_count(self):
+        self.create_category(1, active=2)
+        self.create_category(2, active=3)
+
+        for name in ('products:product-list', 'products:featured-products', 'products:latest-products'):
+            with self.subTest(name=name):
+                counts = {row['category']['slug']: row['category']['products_count'] for row in self.get_rows(name)}
+                self.assertEqual(counts, {'kategoriya-1': 2, 'kategoriya-2': 3})
+
+    def test_products_count_does_not_add_queries_per_category(self):
+        url = reverse('products:product-list')
+        self.create_category(1)
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(url)
+
+        for n in range(2, 6):
+            self.create_category(n)
+        cache.clear()
+        with CaptureQueriesContext(connection) as many:
+            self.client.get(url)
+
+        self.assertEqual(len(many), len(few))
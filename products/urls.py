@@ -15,6 +15,7 @@ urlpatterns = [
     # ============ PRODUCT URLs ============
     path('products/', views.ProductListView.as_view(), name='product-list'),
     path('products/search/', views.ProductSearchView.as_view(), name='product-search'),
+    path('products/autocomplete/', views.product_autocomplete, name='product-autocomplete'),
     path('products/featured/', views.FeaturedProductsView.as_view(), name='featured-products'),
     path('products/popular/', views.popular_products, name='popular-products'),
     path('products/latest/', views.latest_products, name='latest-products'),
@@ -24,6 +25,9 @@ urlpatterns = [
     # ============ UTILITY URLs ============
     path('filters-info/', views.product_filters_info, name='filters-info'),
 
+    # ============ EXPORT URLs ============
+    path('export/products/', views.export_products, name='export-products'),
+
     # ============ BULK DELETE URLs ============
     path('bulk-delete/products/', views.bulk_delete_products, name='bulk-delete-products'),
     path('bulk-delete/categories/', views.bulk_delete_categories, name='bulk-delete-categories'),
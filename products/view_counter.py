@@ -0,0 +1,142 @@
+"""Mahsulot ko'rishlarini keshda yig'ib, bazaga davriy yozish (write-behind)
+
+Har bir mahsulotning yozilmagan deltasi alohida kalitda. Qaysi mahsulotlarda
+delta borligini flush_views() butun katalogni aylanmasdan bilishi uchun
+record_view() delta 0 dan 1 ga o'tganda mahsulot guruhini (DIRTY_CHUNK_SIZE
+ta ketma-ket id) "iflos" deb belgilaydi. flush_views():
+
+1. iflos guruh belgilarini o'chirib, faqat ularning deltalarini o'qiydi;
+2. deltalarni bitta UPDATE bilan bazaga yozadi;
+3. commit'dan keyin deltalarni keshdan ayiradi - shu orada kelgan ko'rishlar
+   kalitda qoladi va guruh qayta belgilanadi.
+
+Baza xatosida belgilar tiklanadi, keshdagi deltalarga tegilmaydi. Kesh
+tozalangandan (yoki belgilar kiritilishidan) keyingi birinchi flush barcha
+guruhlarni bir marta tekshiradi.
+"""
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models import Case, F, Max, Value, When
+
+VIEWS_KEY = 'product_views:{}'
+DIRTY_KEY = 'product_views:dirty:{}'
+DIRTY_TRACKED_KEY = 'product_views:dirty_tracked'
+FLUSH_LOCK_KEY = 'product_views:flush_lock'
+
+DIRTY_CHUNK_SIZE = 500
+# Task to'xtab qolsa ham keyingi flush shu vaqtdan keyin ishlay oladi
+FLUSH_LOCK_TIMEOUT = 5 * 60
+
+
+def _views_key(product_id):
+    return VIEWS_KEY.format(product_id)
+
+
+def _dirty_key(chunk):
+    return DIRTY_KEY.format(chunk)
+
+
+def mark_dirty(product_ids):
+    """Mahsulotlar guruhlarini keyingi flush_views() uchun belgilash"""
+    chunks = {product_id // DIRTY_CHUNK_SIZE for product_id in product_ids}
+    if chunks:
+        cache.set_many({_dirty_key(chunk): True for chunk in chunks}, timeout=None)
+
+
+def record_view(product_id):
+    """Ko'rishni keshda atomik oshirish, bazaga yozilmagan deltani qaytaradi"""
+    key = _views_key(product_id)
+    cache.add(key, 0, timeout=None)
+    try:
+        count = cache.incr(key)
+    except ValueError:
+        # Kalit add() va incr() orasida o'chirilgan bo'lsa
+        cache.set(key, 1, timeout=None)
+        count = 1
+    if count == 1:
+        mark_dirty([product_id])
+    return count
+
+
+def pending_views(product_ids):
+    """Bazaga hali yozilmagan ko'rishlar: {product_id: delta}"""
+    keys = {_views_key(product_id): product_id for product_id in product_ids}
+    if not keys:
+        return {}
+    values = cache.get_many(list(keys))
+    return {keys[key]: value for key, value in values.items() if value}
+
+
+def pop_dirty_views():
+    """Iflos guruhlar belgisini olib tashlab, ulardagi deltalar: {product_id: delta}"""
+    from .models import Product
+
+    last_id = Product.objects.aggregate(last_id=Max('pk'))['last_id']
+    if last_id is None:
+        return {}
+
+    deltas = {}
+    chunk_keys = [_dirty_key(chunk) for chunk in range(last_id // DIRTY_CHUNK_SIZE + 1)]
+    # Belgilar hali yo'q (birinchi ishga tushish yoki kesh tozalangan) - hammasi iflos
+    track_all = cache.add(DIRTY_TRACKED_KEY, True, timeout=None)
+    for start in range(0, len(chunk_keys), DIRTY_CHUNK_SIZE):
+        batch = chunk_keys[start:start + DIRTY_CHUNK_SIZE]
+        dirty = batch if track_all else list(cache.get_many(batch))
+        if not dirty:
+            continue
+        # Belgi deltalar o'qilishidan oldin o'chiriladi: keyin kelgan 0 -> 1
+        # ko'rish guruhni qayta belgilaydi
+        cache.delete_many(dirty)
+        for key in dirty:
+            chunk = int(key.rsplit(':', 1)[1])
+            product_ids = range(chunk * DIRTY_CHUNK_SIZE, (chunk + 1) * DIRTY_CHUNK_SIZE)
+            deltas.update(
+                (product_id, delta) for product_id, delta in pending_views(product_ids).items() if delta > 0
+            )
+    return deltas
+
+
+def settle_views(deltas):
+    """Bazaga yozilgan deltalarni keshdan ayirish; qolgan ko'rishlar keyingi flush'ga"""
+    remaining = []
+    for product_id, delta in deltas.items():
+        try:
+            if cache.decr(_views_key(product_id), delta) > 0:
+                remaining.append(product_id)
+        except ValueError:
+            # Kalit keshdan chiqarib yuborilgan - delta bazaga yozilgan
+            pass
+    mark_dirty(remaining)
+
+
+def flush_views():
+    """Yig'ilgan deltalarni bitta UPDATE bilan bazaga yozish"""
+    from .models import Product
+
+    if not cache.add(FLUSH_LOCK_KEY, True, timeout=FLUSH_LOCK_TIMEOUT):
+        # Boshqa flush ishlayapti - deltalar ikki marta yozilmasin
+        return 0
+
+    try:
+        deltas = pop_dirty_views()
+        if not deltas:
+            return 0
+
+        try:
+            with transaction.atomic():
+                Product.objects.filter(pk__in=list(deltas)).update(
+                    views_count=F('views_count') + Case(
+                        *[When(pk=product_id, then=Value(delta)) for product_id, delta in deltas.items()],
+                        default=Value(0),
+                        output_field=models.PositiveIntegerField()
+                    )
+                )
+                transaction.on_commit(lambda: settle_views(deltas))
+        except Exception:
+            # Bazaga yozilmadi - deltalar keshda, keyingi flush qayta urinadi
+            mark_dirty(deltas)
+            raise
+    finally:
+        cache.delete(FLUSH_LOCK_KEY)
+
+    return sum(deltas.values())
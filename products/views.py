@@ -1,34 +1,108 @@
-from django.db.models import Q, F, Min, Max
+from django.db.models import Q, F, Min, Max, Count, Prefetch
+from django.utils import translation
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db import models
 from rest_framework import generics, filters, status
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, renderer_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 
-from .models import Category, Product
+from .conditional import ConditionalGetMixin, ConditionalListMixin
+from .models import Category, Product, ProductImage, ProductSpecification, active_products_count
+from .response_cache import CachedResponseMixin, cache_response, get_or_set_data
+from .pagination import CatalogPagination
+from .projection import ListProjection, ProjectedListMixin
+from .renderers import LIST_RENDERER_CLASSES
+from .autocomplete import SUGGESTIONS_LIMIT, autocomplete_index
+from .exports import EXPORT_RENDERER_CLASSES, PRODUCT_EXPORT_FIELDS, product_records, streaming_export
+from .fuzzy_search import FuzzySearchFilter
+from .search import FullTextSearchFilter, filter_by_search
+from .signals import catalog_bulk_changed
+from .view_counter import pending_views, record_view
 from .serializers import (
     CategorySerializer, CategoryListSerializer, ProductListSerializer,
     ProductDetailSerializer, ProductSearchSerializer
 )
 
 
+# Ommabop mahsulotlar ko'rishlar soniga bog'liq - qisqa muddat keshlanadi
+POPULAR_CACHE_TIMEOUT = 60
+
+# Mahsulot tafsilotlari keshi; kategoriyadagi mahsulotlar soni shu muddatgacha eskirishi mumkin
+DETAIL_CACHE_TIMEOUT = 10 * 60
+
+
+# Narx gistogrammasi ustunlari soni (standart va maksimal)
+PRICE_HISTOGRAM_BUCKETS = 10
+MAX_PRICE_HISTOGRAM_BUCKETS = 20
+
+# Reyting bo'yicha facet chegaralari ("4 va undan yuqori" va h.k.)
+RATING_FACET_THRESHOLDS = (4, 3, 2, 1)
+
+
+def filter_products(queryset, params, exclude=()):
+    """Mahsulotlar ro'yxati filtrlari
+
+    exclude - facet hisoblashda o'tkazib yuboriladigan parametrlar
+    (masalan, kategoriya facet'i uchun category_slug).
+    """
+    # Category bo'yicha filter
+    category_slug = params.get('category_slug')
+    if category_slug and 'category_slug' not in exclude:
+        queryset = queryset.filter(category__slug=category_slug)
+
+    # Narx oralig'i bo'yicha filter
+    if 'price' not in exclude:
+        min_price = params.get('min_price')
+        max_price = params.get('max_price')
+
+        if min_price:
+            queryset = queryset.filter(price__gte=min_price)
+        if max_price:
+            queryset = queryset.filter(price__lte=max_price)
+
+    # Chegirma bor mahsulotlar
+    has_discount = params.get('has_discount')
+    if has_discount == 'false' and 'has_discount' not in exclude:
+        queryset = queryset.filter(
+            Q(old_price__lte=F('price')) | Q(old_price=0)
+        )
+
+    # Reyting bo'yicha filter
+    min_rating = params.get('min_rating')
+    if min_rating and 'min_rating' not in exclude:
+        queryset = queryset.filter(rating__gte=min_rating)
+
+    return queryset
+
+
 # ============ CATEGORY VIEWS ============
 
-class CategoryListView(generics.ListAPIView):
+class CategoryListView(CachedResponseMixin, ConditionalListMixin, generics.ListAPIView):
     """Kategoriyalar ro'yxati"""
-    queryset = Category.objects.filter(is_active=True)
+    cache_models = (Category, Product)
+    validator_models = (Product,)
+    queryset = Category.objects.filter(is_active=True).with_products_count()
     serializer_class = CategoryListSerializer
 
     def get_queryset(self):
         return super().get_queryset().order_by('sort_order', 'name')
 
 
-class CategoryDetailView(generics.RetrieveAPIView):
+class CategoryDetailView(ConditionalGetMixin, generics.RetrieveAPIView):
     """Kategoriya tafsilotlari"""
-    queryset = Category.objects.filter(is_active=True)
+    queryset = Category.objects.filter(is_active=True).with_products_count()
     serializer_class = CategorySerializer
     lookup_field = 'slug'
+    validator_models = (Product,)
+
+    def get_validators(self, request, *args, **kwargs):
+        row = Category.objects.filter(
+            is_active=True, slug=kwargs.get('slug')
+        ).values_list('pk', 'updated_at').first()
+        if row is None:
+            return None
+        return list(row)
 
 
 class CategoryDeleteView(generics.DestroyAPIView):
@@ -77,6 +151,7 @@ class CategoryForceDeleteView(generics.DestroyAPIView):
 
         # Mahsulotlarni soft delete
         products.update(is_active=False)
+        catalog_bulk_changed()
 
         # Kategoriyani soft delete
         instance.is_active = False
@@ -93,62 +168,80 @@ class CategoryForceDeleteView(generics.DestroyAPIView):
 
 # ============ PRODUCT VIEWS ============
 
-class ProductListView(generics.ListAPIView):
+class ProductListView(ConditionalListMixin, ProjectedListMixin, generics.ListAPIView):
     """Mahsulotlar ro'yxati"""
+    validator_models = (Category, Product)
     queryset = Product.objects.filter(is_active=True).select_related('category')
     serializer_class = ProductListSerializer
-    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, filters.SearchFilter]
+    pagination_class = CatalogPagination
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, FullTextSearchFilter]
     filterset_fields = ['category', 'is_featured']
     search_fields = ['name', 'description', 'short_description']
     ordering_fields = ['price', 'created_at', 'rating', 'views_count']
     ordering = ['-created_at']
 
     def get_queryset(self):
-        queryset = super().get_queryset()
-
-        # Category bo'yicha filter
-        category_slug = self.request.query_params.get('category_slug')
-        if category_slug:
-            queryset = queryset.filter(category__slug=category_slug)
-
-        # Narx oralig'i bo'yicha filter
-        min_price = self.request.query_params.get('min_price')
-        max_price = self.request.query_params.get('max_price')
-
-        if min_price:
-            queryset = queryset.filter(price__gte=min_price)
-        if max_price:
-            queryset = queryset.filter(price__lte=max_price)
-
-        # Chegirma bor mahsulotlar
-        has_discount = self.request.query_params.get('has_discount')
-        if has_discount == 'false':
-            queryset = queryset.filter(
-                Q(old_price__lte=F('price')) | Q(old_price=0)
-            )
-
-        # Reyting bo'yicha filter
-        min_rating = self.request.query_params.get('min_rating')
-        if min_rating:
-            queryset = queryset.filter(rating__gte=min_rating)
-
-        return queryset
-
-
-class ProductDetailView(generics.RetrieveAPIView):
-    """Mahsulot tafsilotlari"""
-    queryset = Product.objects.filter(is_active=True).select_related('category')
+        return filter_products(super().get_queryset(), self.request.query_params)
+
+
+class ProductDetailView(ConditionalGetMixin, generics.RetrieveAPIView):
+    """Mahsulot tafsilotlari
+
+    Serializatsiya qilingan javob (views_count'siz) har bir til uchun keshlanadi.
+    Kesh kaliti ETag bilan bir xil validatorlardan tuziladi: mahsulot
+    qatoridagi updated_at/reviews_count/rating (sharhlar ham shularni
+    o'zgartiradi) va rasmlar, xususiyatlar, kategoriyalar versiyalari.
+    """
+    queryset = Product.objects.filter(is_active=True).select_related('category').prefetch_related(
+        Prefetch('images', queryset=ProductImage.objects.order_by('sort_order', 'created_at')),
+        Prefetch('specifications', queryset=ProductSpecification.objects.order_by('sort_order', 'name')),
+    ).annotate(
+        category_products_count=active_products_count('category')
+    )
     serializer_class = ProductDetailSerializer
     lookup_field = 'slug'
+    # Sharhlar faolligi mahsulot qatoridagi updated_at/reviews_count/rating'ni
+    # o'zgartiradi; rasmlar, xususiyatlar va kategoriya versiyalar orqali
+    validator_models = (Category, ProductImage, ProductSpecification)
+
+    def get_validators(self, request, *args, **kwargs):
+        row = Product.objects.filter(
+            is_active=True, slug=kwargs.get('slug')
+        ).values_list('pk', 'updated_at', 'reviews_count', 'rating', 'views_count').first()
+        if row is None:
+            return None
+        self._validated_pk = row[0]
+        self._views_count = row[-1]
+        # views_count validatorga kirmaydi - aks holda har bir ko'rish ETag'ni o'zgartiradi
+        self._validator_parts = list(row[:-1])
+        return self._validator_parts
+
+    def not_modified(self, request, *args, **kwargs):
+        # 304 javobi ham ko'rish hisoblanadi
+        record_view(self._validated_pk)
+
+    def get_object(self):
+        instance = super().get_object()
+        # Kategoriya serializeri products_count'ni shu annotatsiyadan oladi
+        instance.category.active_products_count = instance.category_products_count
+        return instance
+
+    def get_serialized(self, request):
+        return get_or_set_data(
+            'ProductDetail', request, self.validator_models,
+            lambda: dict(self.get_serializer(self.get_object()).data),
+            timeout=DETAIL_CACHE_TIMEOUT, extra=self._validator_parts
+        )
 
     def retrieve(self, request, *args, **kwargs):
-        instance = self.get_object()
-        # Ko'rishlar sonini oshirish
-        instance.views_count += 1
-        instance.save(update_fields=['views_count'])
+        if not hasattr(self, '_validated_pk'):
+            # Validator qatori topilmadi - odatiy 404
+            self.get_object()
 
-        serializer = self.get_serializer(instance)
-        return Response(serializer.data)
+        data = dict(self.get_serialized(request))
+        # Ko'rishlar sonini keshda oshirish (bazaga davriy task yozadi)
+        data['views_count'] = self._views_count + record_view(self._validated_pk)
+        return Response(data)
 
 
 class ProductDeleteView(generics.DestroyAPIView):
@@ -174,7 +267,7 @@ class ProductDeleteView(generics.DestroyAPIView):
         # Mahsulot sharhlarini ham o'chirish (agar reviews app bilan bog'langan bo'lsa)
         if reviews_count > 0:
             try:
-                Review.objects.filter(product=instance).update(is_active=False)
+                Review.objects.filter(product=instance).set_active(False)
             except:
                 pass
 
@@ -187,16 +280,20 @@ class ProductDeleteView(generics.DestroyAPIView):
         )
 
 
-class FeaturedProductsView(generics.ListAPIView):
+class FeaturedProductsView(CachedResponseMixin, ConditionalListMixin, ProjectedListMixin, generics.ListAPIView):
     """Tanlanган mahsulotlar"""
+    cache_models = (Product, Category)
+    validator_models = (Category, Product)
     queryset = Product.objects.filter(is_active=True, is_featured=True).select_related('category')
     serializer_class = ProductListSerializer
     ordering = ['-created_at']
 
 
-class CategoryProductsView(generics.ListAPIView):
+class CategoryProductsView(ConditionalListMixin, ProjectedListMixin, generics.ListAPIView):
     """Kategoriya bo'yicha mahsulotlar"""
+    validator_models = (Category, Product)
     serializer_class = ProductListSerializer
+    pagination_class = CatalogPagination
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     ordering_fields = ['price', 'created_at', 'rating']
     ordering = ['price']  # Default: arzon narxdan boshlab
@@ -210,10 +307,11 @@ class CategoryProductsView(generics.ListAPIView):
         ).select_related('category')
 
 
-class ProductSearchView(generics.ListAPIView):
+class ProductSearchView(ConditionalListMixin, ProjectedListMixin, generics.ListAPIView):
     """Mahsulot qidiruvi"""
+    validator_models = (Category, Product)
     serializer_class = ProductSearchSerializer
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [filters.OrderingFilter, FuzzySearchFilter]
     search_fields = ['name', 'description', 'short_description', 'category__name']
     ordering_fields = ['price', 'created_at', 'rating']
     ordering = ['price']
@@ -224,39 +322,185 @@ class ProductSearchView(generics.ListAPIView):
 
 # ============ API VIEW FUNCTIONS ============
 
+def _price_histogram(products, buckets):
+    """Narx gistogrammasi - shartli agregatsiya bilan ikki so'rovda"""
+    bounds = products.aggregate(low=Min('price'), high=Max('price'))
+    low, high = bounds['low'], bounds['high']
+    if low is None:
+        return []
+    if low == high:
+        return [{'min': low, 'max': high, 'count': products.count()}]
+
+    width = (high - low) / buckets
+    edges = [low + width * i for i in range(buckets)] + [high]
+    aggregates = {}
+    for i in range(buckets):
+        condition = Q(price__gte=edges[i])
+        # Oxirgi ustun maksimal narxni ham o'z ichiga oladi
+        condition &= Q(price__lte=high) if i == buckets - 1 else Q(price__lt=edges[i + 1])
+        aggregates[f'bucket_{i}'] = Count('pk', filter=condition)
+
+    counts = products.aggregate(**aggregates)
+    return [
+        {
+            'min': round(edges[i], 2),
+            'max': round(edges[i + 1], 2),
+            'count': counts[f'bucket_{i}'],
+        }
+        for i in range(buckets)
+    ]
+
+
 @api_view(['GET'])
+@cache_response(Product, Category)
 def product_filters_info(request):
-    """Mahsulot filterlash uchun ma'lumotlar"""
+    """Mahsulot filterlash uchun ma'lumotlar va joriy filtr holati uchun facetlar
+
+    ProductListView bilan bir xil filtrlarni qabul qiladi. Har bir facet o'z
+    filtrisiz hisoblanadi (masalan, kategoriya sonlari category_slug'siz).
+    """
+    params = request.query_params
     products = Product.objects.filter(is_active=True)
 
+    search = params.get('search', '').strip()
+    if search:
+        products = filter_by_search(products, search)
+
+    try:
+        buckets = int(params.get('price_buckets', PRICE_HISTOGRAM_BUCKETS))
+    except ValueError:
+        buckets = PRICE_HISTOGRAM_BUCKETS
+    buckets = max(1, min(buckets, MAX_PRICE_HISTOGRAM_BUCKETS))
+
     price_range = products.aggregate(
         min_price=Min('price'),
         max_price=Max('price')
     )
 
+    # Kategoriyalar bo'yicha sonlar (bitta GROUP BY)
+    category_counts = dict(
+        filter_products(products, params, exclude=('category_slug',))
+        .order_by()
+        .values_list('category_id')
+        .annotate(count=Count('pk'))
+    )
+
+    # Reyting bo'yicha sonlar (shartli agregatsiya, bitta so'rov)
+    rating_counts = filter_products(products, params, exclude=('min_rating',)).aggregate(**{
+        f'rating_{threshold}': Count('pk', filter=Q(rating__gte=threshold))
+        for threshold in RATING_FACET_THRESHOLDS
+    })
+
+    categories = CategoryListSerializer(
+        Category.objects.filter(is_active=True).with_products_count(),
+        many=True
+    ).data
+
     return Response({
         'price_range': price_range,
-        'categories': CategoryListSerializer(
-            Category.objects.filter(is_active=True),
-            many=True
-        ).data
+        'categories': categories,
+        'total': filter_products(products, params).count(),
+        'facets': {
+            'categories': [
+                {
+                    'id': category['id'],
+                    'slug': category['slug'],
+                    'name': category['name'],
+                    'count': category_counts.get(category['id'], 0),
+                }
+                for category in categories
+            ],
+            'price_histogram': _price_histogram(
+                filter_products(products, params, exclude=('price',)), buckets
+            ),
+            'ratings': [
+                {'min_rating': threshold, 'count': rating_counts[f'rating_{threshold}']}
+                for threshold in RATING_FACET_THRESHOLDS
+            ],
+        },
     })
 
 
 @api_view(['GET'])
+def product_autocomplete(request):
+    """Qidiruv uchun avtoto'ldirish (mahsulot va kategoriya nomlari)"""
+    query = request.query_params.get('q', '').strip()
+    language = request.query_params.get('lang') or translation.get_language() or ''
+    language = language.split('-')[0]
+
+    try:
+        limit = min(int(request.query_params.get('limit', SUGGESTIONS_LIMIT)), SUGGESTIONS_LIMIT)
+    except ValueError:
+        limit = SUGGESTIONS_LIMIT
+
+    if not query:
+        return Response({'products': [], 'categories': []})
+
+    if autocomplete_index.ensure_fresh():
+        return Response(autocomplete_index.suggest(query, language, limit))
+
+    # Indeks hali qurilmagan - bazadan oddiy prefiks qidiruvi
+    return Response({
+        'products': list(
+            Product.objects.filter(is_active=True, name__istartswith=query)
+            .order_by('-views_count', '-rating')
+            .values('name', 'slug')[:limit]
+        ),
+        'categories': list(
+            Category.objects.filter(is_active=True, name__istartswith=query)
+            .values('name', 'slug')[:limit]
+        ),
+    })
+
+
+@api_view(['GET'])
+@renderer_classes(LIST_RENDERER_CLASSES)
+@cache_response(Product, Category, timeout=POPULAR_CACHE_TIMEOUT)
 def popular_products(request):
     """Ommabop mahsulotlar (ko'p ko'rilganlar)"""
-    products = Product.objects.filter(is_active=True).order_by('-views_count')[:10]
-    serializer = ProductListSerializer(products, many=True)
-    return Response(serializer.data)
+    projection = ListProjection.build(ProductListSerializer)
+    candidates = list(projection.values(
+        Product.objects.filter(is_active=True).order_by('-views_count'),
+        extra=('id', 'views_count')
+    )[:30])
+    # Bazaga hali yozilmagan ko'rishlarni ham hisobga olib saralash
+    deltas = pending_views([row['id'] for row in candidates])
+    candidates.sort(key=lambda row: row['views_count'] + deltas.get(row['id'], 0), reverse=True)
+    return Response(projection.render(candidates[:10]))
 
 
 @api_view(['GET'])
+@renderer_classes(LIST_RENDERER_CLASSES)
+@cache_response(Product, Category)
 def latest_products(request):
     """Yangi mahsulotlar"""
-    products = Product.objects.filter(is_active=True).order_by('-created_at')[:10]
-    serializer = ProductListSerializer(products, many=True)
-    return Response(serializer.data)
+    projection = ListProjection.build(ProductListSerializer)
+    products = projection.values(Product.objects.filter(is_active=True).order_by('-created_at'))[:10]
+    return Response(projection.render(products))
+
+
+# ============ EXPORT VIEWS ============
+
+@api_view(['GET'])
+@renderer_classes(EXPORT_RENDERER_CLASSES)
+def export_products(request):
+    """Mahsulotlar eksporti (CSV / NDJSON, barcha tillar, rasmlar va xususiyatlar)"""
+    if not request.user.is_authenticated or not request.user.is_staff:
+        return Response(
+            {'error': 'Ruxsat berilmagan'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    queryset = Product.objects.all()
+    if request.query_params.get('is_active') in ('true', 'false'):
+        queryset = queryset.filter(is_active=request.query_params['is_active'] == 'true')
+
+    return streaming_export(
+        request,
+        product_records(queryset, build_url=request.build_absolute_uri),
+        PRODUCT_EXPORT_FIELDS,
+        'products'
+    )
 
 
 # ============ BULK DELETE VIEWS ============
@@ -282,13 +526,14 @@ def bulk_delete_products(request):
         id__in=product_ids,
         is_active=True
     ).update(is_active=False)
+    catalog_bulk_changed()
 
     # Bog'liq sharhlarni ham o'chirish (agar reviews app bor bo'lsa)
     try:
         from reviews.models import Review
         Review.objects.filter(
             product_id__in=product_ids
-        ).update(is_active=False)
+        ).set_active(False)
     except ImportError:
         pass
 
@@ -321,7 +566,7 @@ def bulk_delete_categories(request):
     if not force_delete:
         # Kategoriyalar ichida mahsulot bor-yo'qligini tekshirish
         categories_with_products = categories.filter(
-            product__is_active=True
+            products__is_active=True
         ).distinct()
 
         if categories_with_products.exists():
@@ -344,6 +589,8 @@ def bulk_delete_categories(request):
 
     # Kategoriyalarni soft delete
     updated_count = categories.update(is_active=False)
+    # update() signal yubormaydi - kategoriyalar ro'yxati, facetlar va mahsulotlar keshi
+    catalog_bulk_changed()
 
     return Response({
         'message': f'{updated_count} ta kategoriya o\'chirildi',
@@ -1,8 +1,9 @@
 from django.contrib import admin
+from django.utils import timezone
 from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
 from modeltranslation.admin import TranslationAdmin
-from .models import Review, ContactMessage
+from .models import Review, ContactMessage, NotificationOutbox
 
 
 @admin.register(Review)
@@ -52,27 +53,14 @@ class ReviewAdmin(TranslationAdmin):
     actions = ['make_active', 'make_inactive']
 
     def make_active(self, request, queryset):
-        updated = queryset.update(is_active=True)
-        # Update product ratings for activated reviews
-        for review in queryset:
-            review.update_product_rating()
+        # Mahsulot reytingi va sharhlar soni set_active() ichida yangilanadi
+        updated = queryset.set_active(True)
         self.message_user(request, f'{updated} ta sharh faollashtirildi.')
 
     make_active.short_description = _("Tanlangan sharhlarni faollashtirish")
 
     def make_inactive(self, request, queryset):
-        updated = queryset.update(is_active=False)
-        # Update product ratings after deactivation
-        products = set(review.product for review in queryset)
-        for product in products:
-            # Recalculate rating for each affected product
-            from django.db.models import Avg
-            avg_rating = product.reviews.filter(is_active=True).aggregate(
-                avg=Avg('rating')
-            )['avg']
-            product.rating = round(avg_rating, 2) if avg_rating else 0.00
-            product.save(update_fields=['rating'])
-
+        updated = queryset.set_active(False)
         self.message_user(request, f'{updated} ta sharh o\'chirildi.')
 
     make_inactive.short_description = _("Tanlangan sharhlarni o'chirish")
@@ -137,4 +125,26 @@ class ContactMessageAdmin(TranslationAdmin):
         updated = queryset.update(is_read=False)
         self.message_user(request, f'{updated} ta xabar o\'qilmagan deb belgilandi.')
 
-    mark_as_unread.short_description = _("O'qilmagan deb belgilash")
\ No newline at end of file
+    mark_as_unread.short_description = _("O'qilmagan deb belgilash")
+
+
+@admin.register(NotificationOutbox)
+class NotificationOutboxAdmin(admin.ModelAdmin):
+    list_display = ['id', 'message_type', 'status', 'attempts', 'created_at', 'sent_at']
+    list_filter = ['status', 'message_type']
+    readonly_fields = [
+        'message_type', 'idempotency_key', 'payload', 'attempts',
+        'last_error', 'created_at', 'sent_at'
+    ]
+
+    actions = ['retry']
+
+    def retry(self, request, queryset):
+        updated = queryset.exclude(status=NotificationOutbox.STATUS_SENT).update(
+            status=NotificationOutbox.STATUS_PENDING,
+            attempts=0,
+            available_at=timezone.now()
+        )
+        self.message_user(request, f'{updated} ta bildirishnoma qayta navbatga qo\'yildi.')
+
+    retry.short_description = _("Qayta yuborish")
@@ -1,6 +1,19 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class ReviewsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'reviews'
+
+    def ready(self):
+        from products.models import Product
+        from products.response_cache import model_changed
+        from .models import ContactMessage, Review
+        from .stats import mark_day_dirty
+
+        post_save.connect(model_changed, sender=Review)
+        post_delete.connect(model_changed, sender=Review)
+        # DailyStat: o'chirilgan qatorlar kunini qayta hisoblash
+        for model in (Review, ContactMessage, Product):
+            post_delete.connect(mark_day_dirty, sender=model, dispatch_uid=f'daily_stats_{model._meta.label_lower}')
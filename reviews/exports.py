@@ -0,0 +1,32 @@
+"""Sharhlar va aloqa xabarlari eksporti (products.exports bilan bir xil oqim)"""
+from products.exports import EXPORT_CHUNK_SIZE, localized
+
+from .models import ContactMessage, Review
+
+REVIEW_EXPORT_FIELDS = [
+    'id', 'product', 'name', 'phone', 'rating', *localized('comment'),
+    'is_active', 'ip_address', 'created_at', 'updated_at',
+]
+
+CONTACT_EXPORT_FIELDS = [
+    'id', 'name', 'phone', 'email', 'subject', *localized('message'),
+    'is_read', 'ip_address', 'created_at',
+]
+
+
+def review_records(queryset=None, chunk_size=EXPORT_CHUNK_SIZE):
+    if queryset is None:
+        queryset = Review.objects.all()
+    queryset = queryset.select_related('product').order_by('pk')
+
+    for review in queryset.iterator(chunk_size=chunk_size):
+        record = {field: getattr(review, field) for field in REVIEW_EXPORT_FIELDS if field != 'product'}
+        record['product'] = review.product.slug
+        yield {field: record[field] for field in REVIEW_EXPORT_FIELDS}
+
+
+def contact_records(queryset=None, chunk_size=EXPORT_CHUNK_SIZE):
+    if queryset is None:
+        queryset = ContactMessage.objects.all()
+    rows = queryset.order_by('pk').values(*CONTACT_EXPORT_FIELDS)
+    yield from rows.iterator(chunk_size=chunk_size)
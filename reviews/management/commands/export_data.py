@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from products.exports import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, export_lines, write_export
+from reviews.exports import CONTACT_EXPORT_FIELDS, REVIEW_EXPORT_FIELDS, contact_records, review_records
+
+
+class Command(BaseCommand):
+    help = "Sharhlar yoki aloqa xabarlarini CSV / NDJSON faylga eksport qilish (mahsulotlar - export_catalog)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', choices=['reviews', 'contacts'])
+        parser.add_argument('--format', dest='file_format', choices=list(EXPORT_FORMATS), default='csv')
+        parser.add_argument('--output', '-o', default='-', help="Fayl yo'li ('-' - stdout)")
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        if chunk_size < 1:
+            raise CommandError("--chunk-size musbat bo'lishi kerak")
+
+        if options['model'] == 'reviews':
+            records, fields = review_records(chunk_size=chunk_size), REVIEW_EXPORT_FIELDS
+        else:
+            records, fields = contact_records(chunk_size=chunk_size), CONTACT_EXPORT_FIELDS
+
+        started = time.monotonic()
+        count = write_export(export_lines(records, fields, options['file_format']), options['output'], self.stdout)
+        if options['file_format'] == 'csv':
+            count -= 1  # sarlavha qatori
+        elapsed = time.monotonic() - started
+        self.stderr.write(self.style.SUCCESS(
+            f"{count} ta yozuv eksport qilindi ({elapsed:.1f} s)"
+        ))
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+from django.db import models, transaction
+from django.db.models import Case, Count, F, FloatField, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce
+
+from products.models import Product
+from products.response_cache import bump_versions
+from reviews.models import Review
+
+
+class Command(BaseCommand):
+    help = "Mahsulotlarning sharh hisoblagichlari va reytingini faol sharhlardan qaytadan hisoblash"
+
+    def handle(self, *args, **options):
+        active_reviews = Review.objects.filter(
+            product=OuterRef('pk'),
+            is_active=True
+        ).order_by().values('product')
+
+        rating_counts = {
+            Product.rating_count_field(rating): Coalesce(
+                Subquery(active_reviews.filter(rating=rating).annotate(count=Count('id')).values('count')),
+                0
+            )
+            for rating in Product.RATING_LEVELS
+        }
+
+        with transaction.atomic():
+            updated = Product.objects.update(
+                **rating_counts,
+                reviews_count=Coalesce(
+                    Subquery(active_reviews.annotate(count=Count('id')).values('count')),
+                    0
+                ),
+                rating_sum=Coalesce(
+                    Subquery(active_reviews.annotate(total=Sum('rating')).values('total')),
+                    0
+                ),
+            )
+            Product.objects.update(
+                rating=Case(
+                    When(reviews_count__gt=0, then=Cast(F('rating_sum'), FloatField()) / F('reviews_count')),
+                    default=Value(0),
+                    output_field=models.DecimalField(max_digits=3, decimal_places=2)
+                )
+            )
+            bump_versions(Product)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{updated} ta mahsulot hisoblagichi qayta hisoblandi"
+        ))
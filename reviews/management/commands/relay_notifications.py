@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from reviews.notifications import is_configured
+from reviews.outbox import BATCH_SIZE, relay_outbox
+
+
+class Command(BaseCommand):
+    help = "Outbox'dagi Telegram bildirishnomalarini yuborish"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--max-batches', type=int, default=None)
+
+    def handle(self, *args, **options):
+        if not is_configured():
+            self.stdout.write(self.style.WARNING("TELEGRAM_BOT_TOKEN yoki TELEGRAM_CHAT_ID sozlanmagan"))
+            return
+
+        result = relay_outbox(options['batch_size'], options['max_batches'])
+        message = f"{result['sent']} ta yuborildi, {result['failed']} ta xato"
+        if result['retry_after']:
+            message += f" (Telegram {result['retry_after']} soniya kutishni so'radi)"
+        self.stdout.write(self.style.SUCCESS(message))
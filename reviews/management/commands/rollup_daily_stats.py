@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from reviews.models import DailyStat
+from reviews.stats import rollup_daily_stats
+
+
+class Command(BaseCommand):
+    help = "Dashboard uchun kunlik statistikani (DailyStat) hisoblash"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild', action='store_true',
+            help="Mavjud rollup'ni o'chirib, barcha kunlarni qaytadan hisoblash"
+        )
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            DailyStat.objects.all().delete()
+
+        days = rollup_daily_stats()
+        self.stdout.write(self.style.SUCCESS(f"{days} kunlik statistika hisoblandi"))
@@ -0,0 +1,27 @@
+from django.db import migrations
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_reviews_count(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    Review = apps.get_model('reviews', 'Review')
+
+    active_reviews = Review.objects.filter(
+        product=OuterRef('pk'),
+        is_active=True
+    ).order_by().values('product').annotate(count=Count('id')).values('count')
+
+    Product.objects.update(reviews_count=Coalesce(Subquery(active_reviews), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_product_reviews_count'),
+        ('reviews', '0002_contactmessage_alter_review_options_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_reviews_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+from django.db import migrations, models
+from django.db.models import Case, Count, F, FloatField, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce
+
+
+def populate_rating_sum(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    Review = apps.get_model('reviews', 'Review')
+
+    active_reviews = Review.objects.filter(
+        product=OuterRef('pk'),
+        is_active=True
+    ).order_by().values('product')
+
+    Product.objects.update(
+        reviews_count=Coalesce(Subquery(active_reviews.annotate(count=Count('id')).values('count')), 0),
+        rating_sum=Coalesce(Subquery(active_reviews.annotate(total=Sum('rating')).values('total')), 0),
+    )
+    Product.objects.update(
+        rating=Case(
+            When(reviews_count__gt=0, then=Cast(F('rating_sum'), FloatField()) / F('reviews_count')),
+            default=Value(0),
+            output_field=models.DecimalField(max_digits=3, decimal_places=2)
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0005_product_rating_sum'),
+        ('reviews', '0003_populate_product_reviews_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_rating_sum, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_populate_product_rating_sum'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('message_type', models.CharField(max_length=20, verbose_name='Xabar turi')),
+                ('payload', models.JSONField(verbose_name="Ma'lumotlar")),
+                ('idempotency_key', models.CharField(editable=False, max_length=100, unique=True, verbose_name='Idempotentlik kaliti')),
+                ('status', models.CharField(choices=[('pending', 'Kutilmoqda'), ('sent', 'Yuborilgan'), ('failed', 'Xato')], default='pending', max_length=10, verbose_name='Holat')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Urinishlar soni')),
+                ('last_error', models.TextField(blank=True, verbose_name='Oxirgi xato')),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Yuborish vaqti')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Yaratilgan')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Yuborilgan')),
+            ],
+            options={
+                'verbose_name': 'Bildirishnoma (outbox)',
+                'verbose_name_plural': 'Bildirishnomalar (outbox)',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['status', 'available_at'], name='reviews_not_status_fe167c_idx')],
+            },
+        ),
+    ]
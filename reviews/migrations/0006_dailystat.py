@@ -0,0 +1,28 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_notificationoutbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Sana')),
+                ('metric', models.CharField(choices=[('reviews', 'Sharhlar'), ('contacts', 'Aloqa xabarlari'), ('products', 'Yangi mahsulotlar'), ('rollup', 'Hisoblangan kun')], max_length=20, verbose_name='Metrika')),
+                ('key', models.CharField(blank=True, max_length=20, verbose_name='Kalit')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Soni')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name="O'zgartirilgan")),
+            ],
+            options={
+                'verbose_name': 'Kunlik statistika',
+                'verbose_name_plural': 'Kunlik statistika',
+                'ordering': ['date'],
+                'constraints': [models.UniqueConstraint(fields=('date', 'metric', 'key'), name='reviews_dailystat_unique')],
+            },
+        ),
+    ]
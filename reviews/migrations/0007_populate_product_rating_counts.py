@@ -0,0 +1,31 @@
+from django.db import migrations
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_rating_counts(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    Review = apps.get_model('reviews', 'Review')
+
+    counts = {}
+    for rating in range(1, 6):
+        active_reviews = Review.objects.filter(
+            product=OuterRef('pk'),
+            is_active=True,
+            rating=rating
+        ).order_by().values('product').annotate(count=Count('id')).values('count')
+        counts[f'rating_{rating}_count'] = Coalesce(Subquery(active_reviews), 0)
+
+    Product.objects.update(**counts)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0006_product_rating_counts'),
+        ('reviews', '0006_dailystat'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_rating_counts, migrations.RunPython.noop),
+    ]
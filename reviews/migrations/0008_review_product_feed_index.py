@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0006_product_rating_counts'),
+        ('reviews', '0007_populate_product_rating_counts'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['product', 'is_active', '-created_at', '-id'], name='reviews_product_feed_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='review',
+            name='reviews_rev_product_db53d5_idx',
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_review_product_feed_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='dailystat',
+            name='metric',
+            field=models.CharField(choices=[('reviews', 'Sharhlar'), ('contacts', 'Aloqa xabarlari'), ('products', 'Yangi mahsulotlar'), ('rollup', 'Hisoblangan kun'), ('dirty', 'Qayta hisoblanadigan kun')], max_length=20, verbose_name='Metrika'),
+        ),
+    ]
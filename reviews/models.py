@@ -1,7 +1,142 @@
-from django.db import models
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import models, transaction
+from django.db.models import Case, Count, F, FloatField, Value, When
+from django.db.models.functions import Cast
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.core.validators import MinValueValidator, MaxValueValidator, RegexValidator
 from products.models import Product
+from products.response_cache import bump_versions
+
+
+# recompute_review_counters() dagi bitta UPDATE ga sig'adigan mahsulotlar soni
+RECOMPUTE_BATCH_SIZE = 500
+
+
+def add_review_delta(deltas, product_id, rating, count):
+    """deltas: {product_id: {baho: +n/-n}} - sharh faollashsa +1, o'chsa -1"""
+    by_rating = deltas.setdefault(product_id, {})
+    by_rating[rating] = by_rating.get(rating, 0) + count
+
+
+def apply_review_deltas(deltas):
+    """Mahsulot hisoblagichlariga (reviews_count, rating_sum, rating, rating_N_count)
+    atomik F() deltalarini qo'llash"""
+    changed = False
+    for product_id, by_rating in deltas.items():
+        if not any(by_rating.values()):
+            continue
+        count = sum(by_rating.values())
+        total = sum(rating * n for rating, n in by_rating.items())
+        rating_counts = {
+            Product.rating_count_field(rating): F(Product.rating_count_field(rating)) + n
+            for rating, n in by_rating.items() if n
+        }
+        Product.objects.filter(pk=product_id).update(
+            **rating_counts,
+            reviews_count=F('reviews_count') + count,
+            rating_sum=F('rating_sum') + total,
+            # UPDATE ichida o'ng tomondagi F() eski qiymatlarni ko'radi
+            rating=Case(
+                When(
+                    reviews_count__gt=-count,
+                    then=Cast(F('rating_sum') + total, FloatField()) / (F('reviews_count') + count)
+                ),
+                default=Value(0),
+                output_field=models.DecimalField(max_digits=3, decimal_places=2)
+            ),
+            updated_at=timezone.now()
+        )
+        changed = True
+    if changed:
+        # update() signal yubormaydi - mahsulot javoblari keshini eskirtirish
+        bump_versions(Product)
+
+
+def _average_rating(total, count):
+    if not count:
+        return Decimal('0.00')
+    return (Decimal(total) / Decimal(count)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+
+def recompute_review_counters(product_ids):
+    """Mahsulotlar hisoblagichlarini faol sharhlardan to'plam sifatida qayta hisoblash
+
+    Barcha mahsulotlar uchun bitta GROUP BY (mahsulot, baho) agregat va bitta bulk_update
+    (UPDATE ... SET ... = CASE WHEN ...) - ommaviy moderatsiya uchun.
+    """
+    product_ids = set(product_ids)
+    if not product_ids:
+        return 0
+
+    with transaction.atomic():
+        # Parallel F() deltalari mutlaq qiymatlar bilan ustidan yozilmasligi uchun
+        list(
+            Product.objects.select_for_update()
+            .filter(pk__in=product_ids)
+            .order_by('pk')
+            .values_list('pk', flat=True)
+        )
+        stats = {}
+        for row in (
+            Review.objects.filter(product_id__in=product_ids, is_active=True)
+            .order_by()
+            .values('product_id', 'rating')
+            .annotate(count=Count('id'))
+        ):
+            stats.setdefault(row['product_id'], {})[row['rating']] = row['count']
+
+        now = timezone.now()
+        products = []
+        for product_id in product_ids:
+            by_rating = stats.get(product_id, {})
+            count = sum(by_rating.values())
+            total = sum(rating * n for rating, n in by_rating.items())
+            products.append(Product(
+                pk=product_id,
+                reviews_count=count,
+                rating_sum=total,
+                rating=_average_rating(total, count),
+                updated_at=now,
+                **{
+                    Product.rating_count_field(rating): by_rating.get(rating, 0)
+                    for rating in Product.RATING_LEVELS
+                }
+            ))
+        Product.objects.bulk_update(
+            products,
+            ['reviews_count', 'rating_sum', 'rating', *Product.RATING_COUNT_FIELDS, 'updated_at'],
+            batch_size=RECOMPUTE_BATCH_SIZE
+        )
+        bump_versions(Product)
+    return len(products)
+
+
+class ReviewQuerySet(models.QuerySet):
+    def set_active(self, is_active):
+        """Sharhlar holatini o'zgartirish va mahsulot hisoblagichlarini yangilash"""
+        with transaction.atomic():
+            # Holati haqiqatan o'zgaradigan sharhlarni qulflab olamiz
+            rows = list(
+                self.exclude(is_active=is_active)
+                .select_for_update()
+                .values_list('pk', 'product_id')
+            )
+            if not rows:
+                return 0
+
+            updated = self.model.objects.filter(
+                pk__in=[review_id for review_id, _product_id in rows]
+            ).update(is_active=is_active, updated_at=timezone.now())
+            recompute_review_counters(product_id for _review_id, product_id in rows)
+            bump_versions(self.model)
+        return updated
+
+    def delete(self):
+        with transaction.atomic():
+            self.set_active(False)
+            return super().delete()
 
 
 class Review(models.Model):
@@ -37,12 +172,18 @@ class Review(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Yaratilgan"))
     updated_at = models.DateTimeField(auto_now=True, verbose_name=_("O'zgartirilgan"))
 
+    objects = ReviewQuerySet.as_manager()
+
     class Meta:
         verbose_name = _("Sharh")
         verbose_name_plural = _("Sharhlar")
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=['product', 'is_active']),
+            # Mahsulot sharhlari lentasi: filtr + tartib (va keyset cursor) bitta indeksdan
+            models.Index(
+                fields=['product', 'is_active', '-created_at', '-id'],
+                name='reviews_product_feed_idx'
+            ),
             models.Index(fields=['-created_at']),
         ]
 
@@ -50,20 +191,44 @@ class Review(models.Model):
         return f"{self.name} - {self.product.name} ({self.rating}⭐)"
 
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        if self.is_active:  # faqat faol sharhlar hisobga olinadi
-            self.update_product_rating()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and set(update_fields) & {'is_active', 'rating', 'product', 'product_id'}:
+            # DailyStat rollup'i (reviews/stats.py) o'zgargan kunlarni updated_at orqali topadi
+            kwargs['update_fields'] = {*update_fields, 'updated_at'}
+
+        with transaction.atomic():
+            previous = None
+            if not self._state.adding:
+                # Bazadagi oldingi holat (qulf bilan) - hisoblagich deltasi uchun
+                previous = Review.objects.select_for_update().filter(
+                    pk=self.pk
+                ).values_list('product_id', 'is_active', 'rating').first()
+
+            super().save(*args, **kwargs)
 
-    def update_product_rating(self):
-        """Update the product's average rating"""
-        from django.db.models import Avg
-        avg_rating = self.product.reviews.filter(is_active=True).aggregate(
-            avg=Avg('rating')
-        )['avg']
+            # update_fields berilgan bo'lsa, bazada faqat o'sha maydonlar o'zgargan
+            update_fields = kwargs.get('update_fields')
+            product_id, is_active, rating = self.product_id, self.is_active, self.rating
+            if previous and update_fields is not None:
+                update_fields = set(update_fields)
+                if not update_fields & {'product', 'product_id'}:
+                    product_id = previous[0]
+                if 'is_active' not in update_fields:
+                    is_active = previous[1]
+                if 'rating' not in update_fields:
+                    rating = previous[2]
 
-        if avg_rating:
-            self.product.rating = round(avg_rating, 2)
-            self.product.save(update_fields=['rating'])
+            deltas = {}
+            if previous and previous[1]:
+                add_review_delta(deltas, previous[0], previous[2], -1)
+            if is_active:
+                add_review_delta(deltas, product_id, rating, 1)
+            apply_review_deltas(deltas)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            Review.objects.filter(pk=self.pk).set_active(False)
+            return super().delete(*args, **kwargs)
 
 
 class ContactMessage(models.Model):
@@ -108,4 +273,105 @@ class ContactMessage(models.Model):
         ordering = ['-created_at']
 
     def __str__(self):
-        return f"{self.name} - {self.get_subject_display()}"
\ No newline at end of file
+        return f"{self.name} - {self.get_subject_display()}"
+
+
+class DailyStat(models.Model):
+    """Kunlik statistika (dashboard uchun): kun + metrika + kalit -> son
+
+    reviews - kun va baho bo'yicha faol sharhlar, contacts - kun va mavzu
+    bo'yicha aloqa xabarlari, products - kun bo'yicha yangi mahsulotlar.
+    rollup metrikasi shu kun to'liq hisoblanganini bildiradi, dirty esa
+    hisoblangan kundagi qator o'chirilganini (kun qayta hisoblanadi).
+    """
+    METRIC_REVIEWS = 'reviews'
+    METRIC_CONTACTS = 'contacts'
+    METRIC_PRODUCTS = 'products'
+    METRIC_ROLLUP = 'rollup'
+    METRIC_DIRTY = 'dirty'
+    METRIC_CHOICES = [
+        (METRIC_REVIEWS, _('Sharhlar')),
+        (METRIC_CONTACTS, _('Aloqa xabarlari')),
+        (METRIC_PRODUCTS, _('Yangi mahsulotlar')),
+        (METRIC_ROLLUP, _('Hisoblangan kun')),
+        (METRIC_DIRTY, _('Qayta hisoblanadigan kun')),
+    ]
+    # Son emas, rollup holatini bildiruvchi metrikalar
+    SERVICE_METRICS = (METRIC_ROLLUP, METRIC_DIRTY)
+
+    date = models.DateField(verbose_name=_("Sana"))
+    metric = models.CharField(max_length=20, choices=METRIC_CHOICES, verbose_name=_("Metrika"))
+    key = models.CharField(max_length=20, blank=True, verbose_name=_("Kalit"))
+    count = models.PositiveIntegerField(default=0, verbose_name=_("Soni"))
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_("O'zgartirilgan"))
+
+    class Meta:
+        verbose_name = _("Kunlik statistika")
+        verbose_name_plural = _("Kunlik statistika")
+        ordering = ['date']
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'metric', 'key'], name='reviews_dailystat_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.metric}:{self.key} = {self.count}"
+
+
+class NotificationOutbox(models.Model):
+    """Telegram xabarlari uchun tranzaksion outbox
+
+    Yozuv sharh/aloqa xabari bilan bitta tranzaksiyada yaratiladi; relay
+    (Celery beat yoki relay_notifications buyrug'i) ularni partiyalab yuboradi.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, _('Kutilmoqda')),
+        (STATUS_SENT, _('Yuborilgan')),
+        (STATUS_FAILED, _('Xato')),
+    ]
+
+    message_type = models.CharField(max_length=20, verbose_name=_("Xabar turi"))
+    payload = models.JSONField(verbose_name=_("Ma'lumotlar"))
+    idempotency_key = models.CharField(
+        max_length=100,
+        unique=True,
+        editable=False,
+        verbose_name=_("Idempotentlik kaliti")
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING,
+        verbose_name=_("Holat")
+    )
+    attempts = models.PositiveIntegerField(default=0, verbose_name=_("Urinishlar soni"))
+    last_error = models.TextField(blank=True, verbose_name=_("Oxirgi xato"))
+    available_at = models.DateTimeField(default=timezone.now, verbose_name=_("Yuborish vaqti"))
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Yaratilgan"))
+    sent_at = models.DateTimeField(blank=True, null=True, verbose_name=_("Yuborilgan"))
+
+    class Meta:
+        verbose_name = _("Bildirishnoma (outbox)")
+        verbose_name_plural = _("Bildirishnomalar (outbox)")
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'available_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.message_type} #{self.pk} ({self.status})"
+
+    @classmethod
+    def enqueue(cls, message_type, key, payload):
+        """Joriy tranzaksiya ichida bildirishnoma yozish (broker chaqirilmaydi)
+
+        key - manba obyektga bog'liq kalit (masalan, 'review:15'); bir xil kalit
+        bilan qayta chaqirilsa ikkinchi xabar yaratilmaydi.
+        """
+        entry, _created = cls.objects.get_or_create(
+            idempotency_key=f'{message_type}:{key}',
+            defaults={'message_type': message_type, 'payload': payload}
+        )
+        return entry
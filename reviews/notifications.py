@@ -0,0 +1,105 @@
+"""Telegram xabarlari: matnni tayyorlash va yuborish
+
+Bir necha soniya ichida ko'p xabar to'plansa (DIGEST_THRESHOLD dan ortiq),
+ular bitta jamlangan (digest) xabarga birlashtiriladi.
+"""
+from html import escape
+
+from django.conf import settings
+
+from utils.telegram_bot import TelegramError, get_client
+
+FOOTER = "📅 <i>Lebem.uz mebel do'koni</i>"
+NOT_SPECIFIED = "Ko'rsatilmagan"
+
+DIGEST_THRESHOLD = getattr(settings, 'TELEGRAM_DIGEST_THRESHOLD', 5)
+
+# Telegram xabarining maksimal uzunligi
+MAX_MESSAGE_LENGTH = 4096
+PREVIEW_LENGTH = 80
+
+
+def is_configured():
+    return bool(settings.TELEGRAM_BOT_TOKEN and settings.TELEGRAM_CHAT_ID)
+
+
+def _clean(data):
+    return {key: escape(str(value)) if value not in (None, '') else '' for key, value in data.items()}
+
+
+def _preview(text):
+    text = ' '.join(text.split())
+    return text if len(text) <= PREVIEW_LENGTH else text[:PREVIEW_LENGTH] + '...'
+
+
+def format_message(message_type, data):
+    data = _clean(data)
+    if message_type == 'review':
+        return f"""
+🌟 <b>Yangi sharh keldi!</b>
+
+👤 <b>Ism:</b> {data['name']}
+📱 <b>Telefon:</b> {data['phone']}
+🛒 <b>Mahsulot:</b> {data['product']}
+⭐ <b>Baho:</b> {data['rating']}/5
+💬 <b>Izoh:</b> {data['comment']}
+
+{FOOTER}
+        """
+    if message_type == 'contact':
+        return f"""
+📩 <b>Yangi aloqa xabari!</b>
+
+👤 <b>Ism:</b> {data['name']}
+📱 <b>Telefon:</b> {data['phone']}
+📧 <b>Email:</b> {data.get('email') or NOT_SPECIFIED}
+📝 <b>Mavzu:</b> {data['subject']}
+💬 <b>Xabar:</b> {data['message']}
+
+{FOOTER}
+        """
+    raise TelegramError(f"Noma'lum xabar turi: {message_type}")
+
+
+def _digest_line(message_type, data):
+    if message_type == 'review':
+        text = f"⭐ {data['rating']}/5 · {data['product']} · {data['name']} ({data['phone']}): {data['comment']}"
+    elif message_type == 'contact':
+        text = f"📩 {data['subject']} · {data['name']} ({data['phone']}): {data['message']}"
+    else:
+        raise TelegramError(f"Noma'lum xabar turi: {message_type}")
+    return escape(_preview(text))
+
+
+def format_digest(items):
+    """[(message_type, data), ...] -> [(matn, qamrab olingan elementlar soni), ...]
+
+    Har bir matn Telegram uzunlik chegarasiga sig'adi; elementlar tartibi saqlanadi.
+    """
+    reviews = sum(1 for message_type, _data in items if message_type == 'review')
+    contacts = len(items) - reviews
+    header = (
+        f"🔔 <b>{len(items)} ta yangi xabar</b> "
+        f"(sharhlar: {reviews}, aloqa: {contacts})\n"
+    )
+
+    messages = []
+    current, count = header, 0
+    for message_type, data in items:
+        line = '\n' + _digest_line(message_type, data)
+        if count and len(current) + len(line) + len(FOOTER) + 2 > MAX_MESSAGE_LENGTH:
+            messages.append((f"{current}\n\n{FOOTER}", count))
+            current, count = header, 0
+        current += line
+        count += 1
+    messages.append((f"{current}\n\n{FOOTER}", count))
+    return messages
+
+
+def send_message(text, max_wait=0):
+    """Xabarni yuborish; muvaffaqiyatsiz bo'lsa TelegramError"""
+    get_client().send_message(settings.TELEGRAM_CHAT_ID, text, max_wait=max_wait)
+
+
+def send_notification(message_type, data, max_wait=0):
+    send_message(format_message(message_type, data), max_wait=max_wait)
@@ -0,0 +1,178 @@
+"""Bildirishnomalar outbox'ini Telegramga uzatish (relay)
+
+Sharh/aloqa xabari va NotificationOutbox yozuvi bitta tranzaksiyada saqlanadi,
+shuning uchun so'rov davomida broker yoki Telegram chaqirilmaydi va commit
+bo'lgan har bir xabar albatta yuboriladi. Relay yozuvlarni qisqa tranzaksiyada
+select_for_update(skip_locked=True) bilan partiyalab "ijaraga" oladi
+(available_at'ni lease muddatiga suradi va commit qiladi) - bir nechta relay
+parallel ishlasa ham bitta yozuvni faqat bittasi yuboradi. HTTP so'rovlar va
+limit kutishlari tranzaksiyadan tashqarida bajariladi, natijalar esa keyin
+alohida yoziladi. Relay yiqilsa, yozuvlar lease tugagach qayta olinadi.
+
+Partiyada DIGEST_THRESHOLD dan ko'p yozuv bo'lsa, ular bitta jamlangan xabar
+sifatida yuboriladi. Telegram 429 (retry_after) qaytarsa, qolgan yozuvlar
+shuncha vaqtga kechiktiriladi va urinish sifatida hisoblanmaydi.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from utils.telegram_bot import DEFAULT_TIMEOUT, TelegramRetryAfter
+
+from .models import NotificationOutbox
+from .notifications import (
+    DIGEST_THRESHOLD, TelegramError, format_digest, is_configured,
+    send_message, send_notification
+)
+
+BATCH_SIZE = getattr(settings, 'NOTIFICATION_OUTBOX_BATCH_SIZE', 20)
+MAX_ATTEMPTS = getattr(settings, 'NOTIFICATION_OUTBOX_MAX_ATTEMPTS', 10)
+
+# Umumiy yuborish limitidan ruxsat kutishning maksimal vaqti (soniya)
+MAX_TOKEN_WAIT = 5
+
+# Olingan yozuvlar shu vaqt boshqa relaylarga ko'rinmaydi: har bir xabar uchun
+# eng uzoq kutish + HTTP timeout va zaxira
+LEASE_MARGIN = 60
+
+# Qayta urinishlar orasidagi kutish: 30s, 1m, 2m, ... ko'pi bilan 1 soat
+RETRY_BASE_DELAY = 30
+RETRY_MAX_DELAY = 60 * 60
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=min(RETRY_BASE_DELAY * 2 ** (attempts - 1), RETRY_MAX_DELAY))
+
+
+def _mark_sent(entry):
+    entry.attempts += 1
+    entry.status = NotificationOutbox.STATUS_SENT
+    entry.sent_at = timezone.now()
+    entry.last_error = ''
+
+
+def _mark_failed(entry, error):
+    entry.attempts += 1
+    entry.last_error = str(error)
+    if entry.attempts >= MAX_ATTEMPTS:
+        entry.status = NotificationOutbox.STATUS_FAILED
+    else:
+        entry.available_at = timezone.now() + retry_delay(entry.attempts)
+
+
+def _send_digest(entries):
+    position = 0
+    items = [(entry.message_type, entry.payload) for entry in entries]
+    for text, count in format_digest(items):
+        chunk = entries[position:position + count]
+        try:
+            send_message(text, max_wait=MAX_TOKEN_WAIT)
+        except TelegramRetryAfter:
+            raise
+        except TelegramError as exc:
+            for entry in chunk:
+                _mark_failed(entry, exc)
+        else:
+            for entry in chunk:
+                _mark_sent(entry)
+        position += count
+
+
+def _send_each(entries):
+    for entry in entries:
+        try:
+            send_notification(entry.message_type, entry.payload, max_wait=MAX_TOKEN_WAIT)
+        except TelegramRetryAfter:
+            raise
+        except TelegramError as exc:
+            _mark_failed(entry, exc)
+        else:
+            _mark_sent(entry)
+
+
+def lease_duration(count):
+    return timedelta(seconds=count * (MAX_TOKEN_WAIT + DEFAULT_TIMEOUT) + LEASE_MARGIN)
+
+
+def claim_batch(batch_size=BATCH_SIZE):
+    """Navbatdagi yozuvlarni olish va lease muddatiga band qilish (qisqa tranzaksiya)"""
+    now = timezone.now()
+    with transaction.atomic():
+        entries = list(
+            NotificationOutbox.objects
+            .select_for_update(skip_locked=True)
+            .filter(status=NotificationOutbox.STATUS_PENDING, available_at__lte=now)
+            .order_by('id')[:batch_size]
+        )
+        if entries:
+            NotificationOutbox.objects.filter(pk__in=[entry.pk for entry in entries]).update(
+                available_at=now + lease_duration(len(entries))
+            )
+    return entries
+
+
+def relay_batch(batch_size=BATCH_SIZE):
+    """Bitta partiyani yuborish
+
+    (yuborilgan, xato, retry_after) qaytaradi; retry_after - Telegram kutishni
+    talab qilgan soniyalar yoki None.
+    """
+    retry_after = None
+    entries = claim_batch(batch_size)
+    if not entries:
+        return 0, 0, None
+
+    # Tranzaksiyasiz: yozuvlar lease bilan band, qatorlar qulflanmagan
+    attempts = {entry.pk: entry.attempts for entry in entries}
+    now = timezone.now()
+    try:
+        if len(entries) > DIGEST_THRESHOLD:
+            _send_digest(entries)
+        else:
+            _send_each(entries)
+    except TelegramRetryAfter as exc:
+        retry_after = exc.retry_after
+        now = timezone.now() + timedelta(seconds=retry_after)
+    finally:
+        for entry in entries:
+            if entry.status == NotificationOutbox.STATUS_PENDING and entry.attempts == attempts[entry.pk]:
+                # Hali yuborilmagan - urinish hisoblanmaydi, lease bekor qilinadi
+                entry.available_at = now
+        NotificationOutbox.objects.bulk_update(
+            entries,
+            ['status', 'attempts', 'last_error', 'available_at', 'sent_at']
+        )
+
+    sent = sum(1 for entry in entries if entry.status == NotificationOutbox.STATUS_SENT)
+    failed = sum(
+        1 for entry in entries
+        if entry.status != NotificationOutbox.STATUS_SENT and entry.attempts > attempts[entry.pk]
+    )
+    return sent, failed, retry_after
+
+
+def relay_outbox(batch_size=BATCH_SIZE, max_batches=None):
+    """Navbatdagi barcha yozuvlarni partiyalab yuborish
+
+    Partiyada hech narsa yuborilmasa to'xtaydi (Telegram ishlamayotgan bo'lsa
+    bir xil xatoni aylantirib o'tirmaslik uchun).
+    """
+    result = {'sent': 0, 'failed': 0, 'retry_after': None}
+    if not is_configured():
+        return result
+
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        sent, failed, retry_after = relay_batch(batch_size)
+        result['sent'] += sent
+        result['failed'] += failed
+        batches += 1
+        if retry_after is not None:
+            result['retry_after'] = retry_after
+            break
+        if not sent:
+            break
+
+    return result
@@ -0,0 +1,228 @@
+"""Admin dashboard statistikasi: kunlik rollup jadvali (DailyStat) + jonli delta
+
+rollup_daily_stats() (Celery beat) yopilgan kunlarni bir marta GROUP BY bilan
+hisoblab DailyStat'ga yozadi. Har ishga tushganda faqat quyidagi kunlar qayta
+hisoblanadi:
+- hali hisoblanmagan kunlar (oxirgi rollup kunidan bugungacha);
+- oxirgi REFRESH_DAYS kun (kechikib moderatsiya qilingan sharhlar uchun);
+- oxirgi ishga tushishdan keyin holati o'zgargan sharhlar yaratilgan kunlar;
+- qatori butunlay o'chirilgan (post_delete -> mark_day_dirty) kunlar - o'chirilgan
+  qatordan updated_at qolmaydi.
+
+Dashboard faqat DailyStat'ni va oxirgi hisoblangan kundan keyingi qatorlarni
+(odatda faqat bugun) o'qiydi.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from products.models import Product
+
+from .models import ContactMessage, DailyStat, Review
+
+REFRESH_DAYS = getattr(settings, 'DAILY_STATS_REFRESH_DAYS', 7)
+
+# Dashboard uchun standart va maksimal davr (kun)
+DEFAULT_RANGE_DAYS = 30
+MAX_RANGE_DAYS = 3 * 366
+
+
+def day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min), timezone.get_current_timezone())
+
+
+def _by_day(queryset, key_field=None):
+    """{(sana, kalit): son} - created_at mahalliy vaqt zonasidagi kun bo'yicha"""
+    fields = ['day', key_field] if key_field else ['day']
+    rows = (
+        queryset.order_by()
+        .annotate(day=TruncDate('created_at', tzinfo=timezone.get_current_timezone()))
+        .values(*fields)
+        .annotate(count=Count('pk'))
+    )
+    return {
+        (row['day'], str(row[key_field]) if key_field else ''): row['count']
+        for row in rows
+    }
+
+
+def collect(start=None, end=None):
+    """[start, end) oralig'idagi qatorlar: {(sana, metrika, kalit): son}"""
+    period = {}
+    if start is not None:
+        period['created_at__gte'] = start
+    if end is not None:
+        period['created_at__lt'] = end
+
+    counts = {}
+    sources = (
+        (DailyStat.METRIC_REVIEWS, Review.objects.filter(is_active=True, **period), 'rating'),
+        (DailyStat.METRIC_CONTACTS, ContactMessage.objects.filter(**period), 'subject'),
+        (DailyStat.METRIC_PRODUCTS, Product.objects.filter(**period), None),
+    )
+    for metric, queryset, key_field in sources:
+        for (day, key), count in _by_day(queryset, key_field).items():
+            counts[(day, metric, key)] = count
+    return counts
+
+
+def rolled_up_until():
+    """Oxirgi to'liq hisoblangan kun va oxirgi rollup vaqti"""
+    stats = DailyStat.objects.filter(metric=DailyStat.METRIC_ROLLUP).aggregate(
+        last_day=Max('date'),
+        last_run=Max('updated_at')
+    )
+    return stats['last_day'], stats['last_run']
+
+
+def days_to_rollup():
+    today = timezone.localdate()
+    last_day, last_run = rolled_up_until()
+
+    if last_day is None:
+        first = [
+            value for value in (
+                Review.objects.aggregate(first=Min('created_at'))['first'],
+                ContactMessage.objects.aggregate(first=Min('created_at'))['first'],
+                Product.objects.aggregate(first=Min('created_at'))['first'],
+            ) if value is not None
+        ]
+        if not first:
+            return []
+        start = timezone.localdate(min(first))
+    else:
+        start = min(last_day + timedelta(days=1), today - timedelta(days=REFRESH_DAYS))
+
+    days = {start + timedelta(days=n) for n in range((today - start).days)}
+
+    if last_run is not None:
+        changed = (
+            Review.objects.filter(updated_at__gte=last_run, created_at__lt=day_start(today))
+            .order_by()
+            .annotate(day=TruncDate('created_at', tzinfo=timezone.get_current_timezone()))
+            .values_list('day', flat=True)
+            .distinct()
+        )
+        days.update(changed)
+
+    days.update(
+        DailyStat.objects.filter(metric=DailyStat.METRIC_DIRTY, date__lt=today).values_list('date', flat=True)
+    )
+    return sorted(days)
+
+
+def rollup_daily_stats():
+    """Yopilgan kunlarni DailyStat'ga yozish; hisoblangan kunlar sonini qaytaradi"""
+    started = timezone.now()
+    days = days_to_rollup()
+    if not days:
+        return 0
+
+    wanted = set(days)
+    counts = collect(day_start(days[0]), day_start(days[-1] + timedelta(days=1)))
+
+    rows = [
+        DailyStat(date=day, metric=metric, key=key, count=count)
+        for (day, metric, key), count in counts.items()
+        if day in wanted
+    ]
+    rows.extend(DailyStat(date=day, metric=DailyStat.METRIC_ROLLUP) for day in days)
+
+    with transaction.atomic():
+        DailyStat.objects.filter(date__in=days).exclude(metric=DailyStat.METRIC_DIRTY).delete()
+        # Hisoblash paytida belgilangan kunlar keyingi ishga tushishda qayta hisoblanadi
+        DailyStat.objects.filter(
+            date__in=days, metric=DailyStat.METRIC_DIRTY, updated_at__lt=started
+        ).delete()
+        DailyStat.objects.bulk_create(rows, batch_size=1000)
+    return len(days)
+
+
+def mark_day_dirty(sender, instance, **kwargs):
+    """post_delete: yopilgan kundagi qator o'chirilsa shu kunni qayta hisoblashga belgilash
+
+    Belgi o'chirish bilan bir tranzaksiyada yoziladi.
+    """
+    if instance.created_at is None:
+        return
+    day = timezone.localdate(instance.created_at)
+    if day >= timezone.localdate():
+        return
+    DailyStat.objects.bulk_create(
+        [DailyStat(date=day, metric=DailyStat.METRIC_DIRTY)],
+        update_conflicts=True,
+        unique_fields=['date', 'metric', 'key'],
+        update_fields=['updated_at'],
+    )
+
+
+def dashboard_stats(date_from, date_to):
+    """Dashboard ma'lumotlari: umumiy sonlar va [date_from, date_to] bo'yicha kunlik qatorlar"""
+    last_day, _last_run = rolled_up_until()
+    live_start = day_start(last_day + timedelta(days=1)) if last_day else None
+    live = collect(live_start)
+
+    totals = defaultdict(int)
+    for row in (
+        DailyStat.objects.exclude(metric__in=DailyStat.SERVICE_METRICS)
+        .values('metric', 'key')
+        .annotate(total=Sum('count'))
+    ):
+        totals[(row['metric'], row['key'])] += row['total']
+
+    daily = defaultdict(int)
+    for row in DailyStat.objects.filter(date__range=(date_from, date_to)).exclude(
+        metric__in=DailyStat.SERVICE_METRICS
+    ).values('date', 'metric', 'count'):
+        daily[(row['date'], row['metric'])] += row['count']
+
+    for (day, metric, key), count in live.items():
+        totals[(metric, key)] += count
+        if date_from <= day <= date_to:
+            daily[(day, metric)] += count
+
+    series = []
+    day = date_from
+    while day <= date_to:
+        series.append({
+            'date': day.isoformat(),
+            'reviews': daily[(day, DailyStat.METRIC_REVIEWS)],
+            'contacts': daily[(day, DailyStat.METRIC_CONTACTS)],
+            'products': daily[(day, DailyStat.METRIC_PRODUCTS)],
+        })
+        day += timedelta(days=1)
+
+    def metric_totals(metric):
+        return {key: count for (name, key), count in totals.items() if name == metric and count}
+
+    by_rating = metric_totals(DailyStat.METRIC_REVIEWS)
+    by_subject = metric_totals(DailyStat.METRIC_CONTACTS)
+
+    return {
+        'range': {'from': date_from.isoformat(), 'to': date_to.isoformat()},
+        'reviews': {
+            'total': sum(by_rating.values()),
+            'recent': sum(item['reviews'] for item in series),
+            'by_rating': [
+                {'rating': int(rating), 'count': count}
+                for rating, count in sorted(by_rating.items(), key=lambda item: int(item[0]), reverse=True)
+            ],
+        },
+        'contact_messages': {
+            'total': sum(by_subject.values()),
+            'recent': sum(item['contacts'] for item in series),
+            'by_subject': [
+                {'subject': subject, 'count': count}
+                for subject, count in sorted(by_subject.items(), key=lambda item: item[1], reverse=True)
+            ],
+        },
+        'products': {
+            'recent': sum(item['products'] for item in series),
+        },
+        'daily': series,
+    }
@@ -1,51 +1,41 @@
 from celery import shared_task
-import requests
-from django.conf import settings
 
+from utils.telegram_bot import TelegramRetryAfter
 
-@shared_task
-def send_telegram_notification(message_type, data):
-    """Telegram orqali xabar yuborish"""
-    if not settings.TELEGRAM_BOT_TOKEN or not settings.TELEGRAM_CHAT_ID:
+from .notifications import TelegramError, is_configured, send_notification
+from .outbox import relay_outbox
+from .stats import rollup_daily_stats as rollup_stats
+
+
+@shared_task(bind=True, max_retries=5)
+def send_telegram_notification(self, message_type, data):
+    """Telegram orqali xabar yuborish (outbox'siz, to'g'ridan-to'g'ri)"""
+    if not is_configured():
         return False
 
-    url = f"https://api.telegram.org/bot{settings.TELEGRAM_BOT_TOKEN}/sendMessage"
-
-    if message_type == 'review':
-        message = f"""
-🌟 <b>Yangi sharh keldi!</b>
-
-👤 <b>Ism:</b> {data['name']}
-📱 <b>Telefon:</b> {data['phone']}
-🛒 <b>Mahsulot:</b> {data['product']}
-⭐ <b>Baho:</b> {data['rating']}/5
-💬 <b>Izoh:</b> {data['comment']}
-
-📅 <i>Lebem.uz mebel do'koni</i>
-        """
-    elif message_type == 'contact':
-        message = f"""
-📩 <b>Yangi aloqa xabari!</b>
-
-👤 <b>Ism:</b> {data['name']}
-📱 <b>Telefon:</b> {data['phone']}
-📧 <b>Email:</b> {data.get('email', 'Ko\'rsatilmagan')}
-📝 <b>Mavzu:</b> {data['subject']}
-💬 <b>Xabar:</b> {data['message']}
-
-📅 <i>Lebem.uz mebel do'koni</i>
-        """
-    else:
+    try:
+        send_notification(message_type, data)
+    except TelegramRetryAfter as exc:
+        raise self.retry(exc=exc, countdown=exc.retry_after)
+    except TelegramError:
         return False
+    return True
 
-    payload = {
-        'chat_id': settings.TELEGRAM_CHAT_ID,
-        'text': message,
-        'parse_mode': 'HTML'
-    }
 
-    try:
-        response = requests.post(url, data=payload, timeout=10)
-        return response.status_code == 200
-    except requests.exceptions.RequestException:
-        return False
\ No newline at end of file
+@shared_task(bind=True, max_retries=3)
+def relay_notification_outbox(self):
+    """Outbox'dagi bildirishnomalarni Telegramga yuborish
+
+    Telegram kutishni talab qilsa, beat navbatini kutmasdan retry_after
+    o'tgach qayta ishga tushadi.
+    """
+    result = relay_outbox()
+    if result['retry_after'] is not None:
+        raise self.retry(countdown=result['retry_after'])
+    return result
+
+
+@shared_task
+def rollup_daily_stats():
+    """Yopilgan kunlar statistikasini DailyStat jadvaliga yozish"""
+    return rollup_stats()
@@ -0,0 +1,125 @@
+"""Sharh va aloqa xabarlari uchun sliding-window cheklovi
+
+Har bir endpoint (view.throttle_scope) uchun SUBMISSION_THROTTLE_RATES
+sozlamasida IP va ixtiyoriy ravishda telefon raqami bo'yicha limitlar beriladi:
+
+    SUBMISSION_THROTTLE_RATES = {
+        'review': {'ip': '5/10m', 'phone': '3/h'},
+    }
+
+Hisoblagichlar keshda (productionda Redis) saqlanadi, shuning uchun barcha
+gunicorn workerlar uchun umumiy. Joriy va oldingi oyna hisoblagichlari
+vaznli qo'shiladi (sliding window counter) - cache.incr() atomar bo'lgani
+uchun parallel so'rovlar limitni aylanib o'tolmaydi.
+
+DRF throttle'lari view.initial() da tekshiriladi, ya'ni rad etilgan so'rov
+serializer, baza yoki brokerga yetib bormaydi.
+"""
+import hashlib
+import math
+import re
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+
+THROTTLE_KEY = 'submission_throttle:{}:{}:{}:{}'
+
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+_RATE_RE = re.compile(r'^(\d+)/(\d*)([smhd])$')
+
+
+def get_client_ip(request):
+    """Mijoz IP manzili
+
+    X-Forwarded-For'ning chap qismini mijozning o'zi yozadi, shuning uchun
+    faqat TRUSTED_PROXY_COUNT ta ishonchli proksi qo'shgan o'ng tomondagi
+    yozuv olinadi. Sozlama 0 bo'lsa (standart) - REMOTE_ADDR.
+    """
+    proxies = getattr(settings, 'TRUSTED_PROXY_COUNT', 0)
+    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+    if proxies and x_forwarded_for:
+        addresses = [address.strip() for address in x_forwarded_for.split(',') if address.strip()]
+        if addresses:
+            return addresses[-min(proxies, len(addresses))]
+    return request.META.get('REMOTE_ADDR')
+
+
+def parse_rate(rate):
+    """'5/10m' -> (5, 600)"""
+    match = _RATE_RE.match(rate.replace(' ', ''))
+    if match is None:
+        raise ValueError(f"Noto'g'ri limit formati: {rate!r}")
+    limit, multiplier, unit = match.groups()
+    return int(limit), int(multiplier or 1) * PERIODS[unit]
+
+
+def _normalize_phone(phone):
+    return re.sub(r'\D', '', str(phone or ''))
+
+
+def hit(key, limit, window):
+    """So'rovni hisoblash; ruxsat berilsa 0, aks holda kutish kerak bo'lgan soniyalar"""
+    now = time.time()
+    index = int(now // window)
+    elapsed = now - index * window
+
+    current_key = f'{key}:{index}'
+    cache.add(current_key, 0, timeout=window * 2)
+    try:
+        current = cache.incr(current_key)
+    except ValueError:
+        cache.set(current_key, 1, timeout=window * 2)
+        current = 1
+    previous = cache.get(f'{key}:{index - 1}', 0)
+
+    remaining = (window - elapsed) / window
+    if previous * remaining + current <= limit:
+        return 0
+
+    # Keyingi so'rov (+1) sig'adigan vaqtgacha kutish
+    if current >= limit:
+        # Joriy oynaning o'zi to'lgan: keyingi oynada uning ulushi yetarlicha kamayguncha
+        return (window - elapsed) + window * (1 - (limit - 1) / current)
+    # Oldingi oyna ulushi yetarlicha kamayguncha
+    return (window - elapsed) - (limit - current - 1) * window / previous
+
+
+class SubmissionThrottle(BaseThrottle):
+    """IP va telefon raqami bo'yicha sliding-window limit (view.throttle_scope)"""
+    scope_attr = 'throttle_scope'
+
+    def get_budgets(self, view):
+        scope = getattr(view, self.scope_attr, None)
+        rates = getattr(settings, 'SUBMISSION_THROTTLE_RATES', {})
+        return scope, rates.get(scope) or {}
+
+    def get_identities(self, request, budgets):
+        identities = []
+        if 'ip' in budgets:
+            identities.append(('ip', get_client_ip(request) or 'unknown'))
+        if 'phone' in budgets:
+            phone = _normalize_phone(request.data.get('phone')) if hasattr(request.data, 'get') else ''
+            if phone:
+                identities.append(('phone', hashlib.sha1(phone.encode('ascii')).hexdigest()))
+        return identities
+
+    def allow_request(self, request, view):
+        self.wait_time = None
+        scope, budgets = self.get_budgets(view)
+        if not budgets:
+            return True
+
+        for kind, ident in self.get_identities(request, budgets):
+            limit, window = parse_rate(budgets[kind])
+            wait = hit(THROTTLE_KEY.format(scope, kind, window, ident), limit, window)
+            if wait:
+                self.wait_time = max(self.wait_time or 0, wait)
+
+        return self.wait_time is None
+
+    def wait(self):
+        if self.wait_time is None:
+            return None
+        return math.ceil(self.wait_time)
@@ -11,4 +11,8 @@ urlpatterns = [
 
     # Contact
     path('contact/', views.ContactMessageCreateView.as_view(), name='contact-create'),
+
+    # Export (admin)
+    path('export/reviews/', views.export_reviews, name='export-reviews'),
+    path('export/contacts/', views.export_contacts, name='export-contacts'),
 ]
\ No newline at end of file
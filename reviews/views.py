@@ -1,44 +1,56 @@
 # reviews/views.py
+from datetime import timedelta
+
 from django.conf import settings
-from django.db.models import Count, Avg
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 from rest_framework import generics, status
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, renderer_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 
-from .models import Review, ContactMessage
+from products.exports import EXPORT_RENDERER_CLASSES, streaming_export
+from products.models import Product
+from products.pagination import CatalogPagination
+
+from .exports import CONTACT_EXPORT_FIELDS, REVIEW_EXPORT_FIELDS, contact_records, review_records
+from .models import Review, ContactMessage, NotificationOutbox
+from .throttling import SubmissionThrottle, get_client_ip
+from .stats import DEFAULT_RANGE_DAYS, MAX_RANGE_DAYS, dashboard_stats as get_dashboard_stats
 from .serializers import (
     ReviewSerializer, ReviewCreateSerializer, ReviewListSerializer,
     ContactMessageSerializer
 )
 
-# Telegram task import (agar mavjud bo'lsa)
-try:
-    from .tasks import send_telegram_notification
-except ImportError:
-    def send_telegram_notification(*args, **kwargs):
-        pass
-
-
 # ============ REVIEW VIEWS ============
 
 class ProductReviewsView(generics.ListAPIView):
-    """Mahsulot sharhlari"""
+    """Mahsulot sharhlari (?pagination=cursor bilan keyset sahifalash)"""
     serializer_class = ReviewListSerializer
+    pagination_class = CatalogPagination
 
     def get_queryset(self):
-        product_slug = self.kwargs.get('slug')
+        # Avval slug -> id (unikal indeks), keyin JOIN'siz reviews_product_feed_idx bo'yicha
+        product_id = Product.objects.filter(
+            slug=self.kwargs.get('slug'),
+            is_active=True
+        ).values_list('pk', flat=True).first()
+        if product_id is None:
+            return Review.objects.none()
+
         return Review.objects.filter(
-            product__slug=product_slug,
-            product__is_active=True,
+            product_id=product_id,
             is_active=True
-        ).order_by('-created_at')
+        ).order_by('-created_at', '-id')
 
 
 class ReviewCreateView(generics.CreateAPIView):
     """Sharh yaratish"""
     queryset = Review.objects.all()
     serializer_class = ReviewCreateSerializer
+    throttle_classes = [SubmissionThrottle]
+    throttle_scope = 'review'
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -46,22 +58,17 @@ class ReviewCreateView(generics.CreateAPIView):
 
         # IP addressni saqlash
         ip_address = self.get_client_ip(request)
-        review = serializer.save(ip_address=ip_address)
-
-        # Telegram orqali xabar yuborish
-        try:
-            send_telegram_notification.delay(
-                message_type='review',
-                data={
-                    'name': review.name,
-                    'phone': review.phone,
-                    'product': review.product.name,
-                    'rating': review.rating,
-                    'comment': review.comment
-                }
-            )
-        except:
-            pass
+
+        # Sharh va Telegram xabari bitta tranzaksiyada (outbox relay yuboradi)
+        with transaction.atomic():
+            review = serializer.save(ip_address=ip_address)
+            NotificationOutbox.enqueue('review', review.pk, {
+                'name': review.name,
+                'phone': review.phone,
+                'product': review.product.name,
+                'rating': review.rating,
+                'comment': review.comment
+            })
 
         return Response(
             ReviewSerializer(review).data,
@@ -69,12 +76,7 @@ class ReviewCreateView(generics.CreateAPIView):
         )
 
     def get_client_ip(self, request):
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        return ip
+        return get_client_ip(request)
 
 
 class ReviewDeleteView(generics.DestroyAPIView):
@@ -87,7 +89,7 @@ class ReviewDeleteView(generics.DestroyAPIView):
 
         # Soft delete
         instance.is_active = False
-        instance.save(update_fields=['is_active'])
+        instance.save(update_fields=['is_active', 'updated_at'])
 
         return Response(
             {'message': 'Sharh muvaffaqiyatli o\'chirildi'},
@@ -137,6 +139,8 @@ class ContactMessageCreateView(generics.CreateAPIView):
     """Aloqa xabari yaratish"""
     queryset = ContactMessage.objects.all()
     serializer_class = ContactMessageSerializer
+    throttle_classes = [SubmissionThrottle]
+    throttle_scope = 'contact'
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -144,22 +148,17 @@ class ContactMessageCreateView(generics.CreateAPIView):
 
         # IP addressni saqlash
         ip_address = self.get_client_ip(request)
-        message = serializer.save(ip_address=ip_address)
-
-        # Telegram orqali xabar yuborish
-        try:
-            send_telegram_notification.delay(
-                message_type='contact',
-                data={
-                    'name': message.name,
-                    'phone': message.phone,
-                    'email': message.email,
-                    'subject': message.get_subject_display(),
-                    'message': message.message
-                }
-            )
-        except:
-            pass
+
+        # Xabar va Telegram bildirishnomasi bitta tranzaksiyada
+        with transaction.atomic():
+            message = serializer.save(ip_address=ip_address)
+            NotificationOutbox.enqueue('contact', message.pk, {
+                'name': message.name,
+                'phone': message.phone,
+                'email': message.email,
+                'subject': str(message.get_subject_display()),
+                'message': message.message
+            })
 
         return Response(
             serializer.data,
@@ -167,12 +166,7 @@ class ContactMessageCreateView(generics.CreateAPIView):
         )
 
     def get_client_ip(self, request):
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        return ip
+        return get_client_ip(request)
 
 
 class ContactMessageListView(generics.ListAPIView):
@@ -227,71 +221,81 @@ class ContactMessageDeleteView(generics.DestroyAPIView):
 
 @api_view(['GET'])
 def review_stats(request, slug):
-    """Mahsulot sharhlari statistikasi"""
-    reviews = Review.objects.filter(
-        product__slug=slug,
-        product__is_active=True,
-        is_active=True
-    )
-
-    stats = reviews.aggregate(
-        total_reviews=Count('id'),
-        average_rating=Avg('rating')
-    )
-
-    rating_breakdown = reviews.values('rating').annotate(
-        count=Count('rating')
-    ).order_by('-rating')
+    """Mahsulot sharhlari statistikasi (mahsulot qatoridagi hisoblagichlardan)"""
+    product = Product.objects.filter(slug=slug, is_active=True).only(
+        'reviews_count', 'rating', *Product.RATING_COUNT_FIELDS
+    ).first()
+    if product is None:
+        # Oldingi javob bilan mos: noma'lum mahsulot uchun bo'sh statistika
+        product = Product()
 
     return Response({
-        'total_reviews': stats['total_reviews'] or 0,
-        'average_rating': round(stats['average_rating'] or 0, 2),
-        'rating_breakdown': list(rating_breakdown)
+        'total_reviews': product.reviews_count,
+        'average_rating': round(float(product.rating), 2),
+        'rating_breakdown': product.rating_breakdown
     })
 
 
+def _date_param(request, name, default):
+    """YYYY-MM-DD parametri; noto'g'ri format bo'lsa None"""
+    value = request.query_params.get(name)
+    if not value:
+        return default
+    return parse_date(value)
+
+
 @api_view(['GET'])
 def dashboard_stats(request):
-    """Admin dashboard statistikalari"""
+    """Admin dashboard statistikalari (?from=YYYY-MM-DD&to=YYYY-MM-DD, standart - so'nggi 30 kun)"""
+    if not request.user.is_authenticated or not request.user.is_staff:
+        return Response(
+            {'error': 'Ruxsat berilmagan'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    try:
+        date_to = _date_param(request, 'to', timezone.localdate())
+        date_from = _date_param(request, 'from', date_to and date_to - timedelta(days=DEFAULT_RANGE_DAYS - 1))
+    except ValueError:
+        date_from = date_to = None
+    if date_from is None or date_to is None or date_from > date_to:
+        return Response(
+            {'error': 'from va to YYYY-MM-DD formatida va from <= to bo\'lishi kerak'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if (date_to - date_from).days > MAX_RANGE_DAYS:
+        return Response(
+            {'error': f'Davr {MAX_RANGE_DAYS} kundan oshmasligi kerak'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    return Response(get_dashboard_stats(date_from, date_to))
+
+
+@api_view(['GET'])
+@renderer_classes(EXPORT_RENDERER_CLASSES)
+def export_reviews(request):
+    """Sharhlar eksporti (CSV / NDJSON)"""
+    if not request.user.is_authenticated or not request.user.is_staff:
+        return Response(
+            {'error': 'Ruxsat berilmagan'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    return streaming_export(request, review_records(), REVIEW_EXPORT_FIELDS, 'reviews')
+
+
+@api_view(['GET'])
+@renderer_classes(EXPORT_RENDERER_CLASSES)
+def export_contacts(request):
+    """Aloqa xabarlari eksporti (CSV / NDJSON)"""
     if not request.user.is_authenticated or not request.user.is_staff:
         return Response(
             {'error': 'Ruxsat berilmagan'},
             status=status.HTTP_403_FORBIDDEN
         )
 
-    from datetime import datetime, timedelta
-
-    # So'nggi 30 kun ichidagi statistikalar
-    thirty_days_ago = datetime.now() - timedelta(days=30)
-
-    stats = {
-        'reviews': {
-            'total': Review.objects.filter(is_active=True).count(),
-            'recent': Review.objects.filter(
-                created_at__gte=thirty_days_ago,
-                is_active=True
-            ).count(),
-            'by_rating': list(
-                Review.objects.filter(is_active=True)
-                .values('rating')
-                .annotate(count=Count('rating'))
-                .order_by('-rating')
-            )
-        },
-        'contact_messages': {
-            'total': ContactMessage.objects.count(),
-            'recent': ContactMessage.objects.filter(
-                created_at__gte=thirty_days_ago
-            ).count(),
-            'by_subject': list(
-                ContactMessage.objects.values('subject')
-                .annotate(count=Count('subject'))
-                .order_by('-count')
-            )
-        }
-    }
-
-    return Response(stats)
+    return streaming_export(request, contact_records(), CONTACT_EXPORT_FIELDS, 'contacts')
 
 
 @api_view(['POST'])
@@ -314,7 +318,7 @@ def bulk_delete_reviews(request):
     updated_count = Review.objects.filter(
         id__in=review_ids,
         is_active=True
-    ).update(is_active=False)
+    ).set_active(False)
 
     return Response({
         'message': f'{updated_count} ta sharh o\'chirildi',
@@ -361,7 +365,7 @@ def toggle_review_status(request, pk):
     try:
         review = Review.objects.get(pk=pk)
         review.is_active = not review.is_active
-        review.save(update_fields=['is_active'])
+        review.save(update_fields=['is_active', 'updated_at'])
 
         return Response({
             'message': f'Sharh {"faollashtirildi" if review.is_active else "nofaollashtirildi"}',
@@ -39,6 +39,30 @@ function generateStars(rating) {
   return starsHtml
 }
 
+// <picture> with WebP/JPEG srcset, intrinsic size and LQIP placeholder
+// from the API's <field>, <field>_variants, <field>_width/_height, <field>_placeholder
+function responsiveImage(item, field, alt, className, sizes) {
+  const fallback = item[field] || "/static/images/no-image.jpg"
+  const variants = item[`${field}_variants`] || {}
+  const width = item[`${field}_width`]
+  const height = item[`${field}_height`]
+  const placeholder = item[`${field}_placeholder`]
+
+  const srcset = (items) => (items || []).map((variant) => `${variant.url} ${variant.width}w`).join(", ")
+  const webp = srcset(variants.webp)
+  const jpeg = srcset(variants.jpeg)
+  const style = placeholder ? `style="background: url('${placeholder}') center / cover no-repeat"` : ""
+
+  return `
+        <picture>
+            ${webp ? `<source type="image/webp" srcset="${webp}" sizes="${sizes}">` : ""}
+            <img src="${fallback}" ${jpeg ? `srcset="${jpeg}" sizes="${sizes}"` : ""}
+                 ${width && height ? `width="${width}" height="${height}"` : ""} ${style}
+                 class="${className}" alt="${alt}" loading="lazy" decoding="async">
+        </picture>
+    `
+}
+
 function debounce(func, wait) {
   let timeout
   return function executedFunction(...args) {
@@ -241,7 +265,7 @@ function initializeSearch() {
       "input",
       debounce(function () {
         const query = this.value.trim()
-        if (query.length >= 3) {
+        if (query.length >= 2) {
           performSearch(query)
         }
       }, 300),
@@ -251,7 +275,7 @@ function initializeSearch() {
 
 async function performSearch(query) {
   try {
-    const response = await fetch(`/api/products/products/search/?search=${encodeURIComponent(query)}`)
+    const response = await fetch(`/api/products/products/autocomplete/?q=${encodeURIComponent(query)}`)
     const results = await response.json()
     displaySearchResults(results)
   } catch (error) {
@@ -1,9 +1,176 @@
+"""Telegram Bot API mijozi
+
+Bitta jarayon uchun bitta requests.Session (keep-alive, ulanishlar puli)
+ishlatiladi. Yuborish tezligi keshdagi (productionda Redis) umumiy
+sliding-window limiti bilan cheklanadi, shuning uchun barcha gunicorn/celery
+workerlar birgalikda Telegram limitidan oshmaydi. 429 javobidagi retry_after
+TelegramRetryAfter sifatida qaytariladi - chaqiruvchi (Celery task yoki
+outbox relay) shuncha vaqtdan keyin qayta urinadi.
+
+API manzili TELEGRAM_API_URL sozlamasidan olinadi, shuning uchun mijozni
+lokal stub HTTP serverga qarshi sinash mumkin.
+"""
+import logging
+import math
+import threading
+import time
+
 import requests
 from django.conf import settings
-import logging
+from django.core.cache import cache
+from requests.adapters import HTTPAdapter
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_API_URL = 'https://api.telegram.org'
+DEFAULT_TIMEOUT = 10
+
+# Telegram bitta guruh chatiga daqiqasiga ~20 ta xabarga ruxsat beradi
+DEFAULT_RATE_LIMIT = 20
+DEFAULT_RATE_PERIOD = 60
+
+LIMITER_KEY = 'telegram_rate:{}:{}'
+# Sliding window aniqligi (soniya)
+SLOT_SECONDS = 1
+
+
+class TelegramError(Exception):
+    pass
+
+
+class TelegramRetryAfter(TelegramError):
+    """Telegram (yoki umumiy yuborish limiti) kutishni talab qildi"""
+
+    def __init__(self, retry_after, message=''):
+        self.retry_after = max(1, int(retry_after))
+        super().__init__(message or f"{self.retry_after} soniyadan keyin qayta urinish kerak")
+
+
+class RateLimiter:
+    """Keshdagi umumiy sliding-window limiti: istalgan `period` soniyalik oraliqda ko'pi bilan `capacity` ta
+
+    Oraliq SLOT_SECONDS soniyalik slotlarga bo'linadi (har biri alohida
+    kalit). So'rov avval o'z slotini cache.incr() bilan oshiradi, keyin
+    oxirgi `period` + bitta slot yig'indisini o'qiydi; limitdan oshsa o'z
+    hissasini qaytarib (decr) rad etiladi. Shuning uchun parallel workerlar
+    birgalikda ham limitdan oshmaydi (ko'pi bilan ikkalasi ham rad etiladi).
+    Qat'iy oynadagi hisoblagichdan farqli, oyna chegarasida 2 barobar
+    portlash bo'lmaydi.
+    """
+
+    def __init__(self, name, capacity, period):
+        self.name = name
+        self.capacity = capacity
+        self.period = period
+        self.slots = max(1, math.ceil(period / SLOT_SECONDS))
+
+    def _key(self, slot):
+        return LIMITER_KEY.format(self.name, slot)
+
+    def try_acquire(self):
+        """Ruxsat berilsa 0, aks holda eng eski yuborish oynadan chiqquncha qolgan soniyalar"""
+        now = time.time()
+        current = int(now // SLOT_SECONDS)
+        key = self._key(current)
+
+        cache.add(key, 0, timeout=self.period + 2 * SLOT_SECONDS)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Kalit shu orada chiqib ketgan - qayta yaratish
+            cache.set(key, 1, timeout=self.period + 2 * SLOT_SECONDS)
+
+        slots = range(current - self.slots, current + 1)
+        counts = cache.get_many([self._key(slot) for slot in slots])
+        if sum(counts.values()) <= self.capacity:
+            return 0
+
+        try:
+            cache.decr(key)
+        except ValueError:
+            pass
+        oldest = next(
+            (slot for slot in slots if counts.get(self._key(slot))), current
+        )
+        return max(SLOT_SECONDS, (oldest + self.slots + 1) * SLOT_SECONDS - now)
+
+    def acquire(self, max_wait=0):
+        """Ruxsat olish; max_wait soniyadan ko'p kutish kerak bo'lsa TelegramRetryAfter"""
+        deadline = time.monotonic() + max_wait
+        while True:
+            wait = self.try_acquire()
+            if not wait:
+                return
+            if time.monotonic() + wait > deadline:
+                raise TelegramRetryAfter(wait, "Telegram yuborish limiti tugadi")
+            time.sleep(wait)
+
+
+class TelegramClient:
+    def __init__(self, token=None, api_url=None, timeout=None, limiter=None):
+        self.token = token if token is not None else settings.TELEGRAM_BOT_TOKEN
+        self.api_url = (api_url or getattr(settings, 'TELEGRAM_API_URL', DEFAULT_API_URL)).rstrip('/')
+        self.timeout = timeout or DEFAULT_TIMEOUT
+        self.limiter = limiter or RateLimiter(
+            'default',
+            getattr(settings, 'TELEGRAM_RATE_LIMIT', DEFAULT_RATE_LIMIT),
+            getattr(settings, 'TELEGRAM_RATE_PERIOD', DEFAULT_RATE_PERIOD),
+        )
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def call(self, method, data, max_wait=0):
+        if not self.token:
+            raise TelegramError("Telegram bot token o'rnatilmagan")
+
+        self.limiter.acquire(max_wait)
+        url = f"{self.api_url}/bot{self.token}/{method}"
+        try:
+            response = self.session.post(url, data=data, timeout=self.timeout)
+        except requests.exceptions.RequestException as exc:
+            raise TelegramError(str(exc)) from exc
+
+        try:
+            result = response.json()
+        except ValueError:
+            result = {}
+
+        if response.status_code == 429:
+            retry_after = result.get('parameters', {}).get('retry_after') or response.headers.get('Retry-After', 1)
+            raise TelegramRetryAfter(retry_after, result.get('description', ''))
+        if response.status_code != 200 or not result.get('ok', False):
+            raise TelegramError(
+                f"Telegram {response.status_code}: {result.get('description') or response.text[:200]}"
+            )
+        return result.get('result')
+
+    def send_message(self, chat_id, text, max_wait=0):
+        return self.call('sendMessage', {
+            'chat_id': chat_id,
+            'text': text,
+            'parse_mode': 'HTML',
+            'disable_web_page_preview': 'true',
+        }, max_wait=max_wait)
+
+    def close(self):
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Jarayon uchun umumiy mijoz (celery prefork'da har bir bola jarayon o'zinikini yaratadi)"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = TelegramClient()
+    return _client
+
 
 def send_message_to_telegram(chat_id, message):
     """Telegram botga xabar yuborish"""
@@ -11,19 +178,12 @@ def send_message_to_telegram(chat_id, message):
         logger.warning("Telegram bot token o'rnatilmagan")
         return False
 
-    url = f"https://api.telegram.org/bot{settings.TELEGRAM_BOT_TOKEN}/sendMessage"
-    data = {
-        'chat_id': chat_id,
-        'text': message,
-        'parse_mode': 'HTML'
-    }
-
     try:
-        response = requests.post(url, data=data, timeout=10)
-        return response.status_code == 200
-    except Exception as e:
+        get_client().send_message(chat_id, message)
+    except TelegramError as e:
         logger.error(f"Telegram yuborishda xato: {e}")
         return False
+    return True
 
 
 def send_review_to_telegram(review):
@@ -58,5 +218,3 @@ Admin paneliga kirish: /admin/
     """
 
     return send_message_to_telegram(settings.ADMIN_CHAT_ID, message)
-
-